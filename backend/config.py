@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -11,6 +11,40 @@ class Settings(BaseSettings):
   default_symbol: str = "AAPL"
   initial_cash: float = 100_000.0
   default_units: int = 10
+  stream_interval: float = 1.0
+  stream_window: int = 1000
+  max_streams: int = 500
+  ws_send_queue_size: int = 256
+  ws_slow_consumer_policy: str = "coalesce"
+  # Returns behind the live portfolio's Sharpe/Sortino; None = since reset
+  portfolio_metrics_window: Optional[int] = 1000
+  sweep_max_combinations: int = 10_000
+  sweep_max_workers: Optional[int] = None
+  monte_carlo_max_simulations: int = 100_000
+  # Columnar market data store; defaults to ``data_dir / "store"``
+  store_dir: Optional[Path] = None
+  store_partition: str = "year"
+  market_cache_max_bytes: int = 512 * 1024 * 1024
+  market_cache_max_symbols: Optional[int] = None
+  # "yfinance", or "stub" for deterministic offline data
+  market_data_provider: str = "yfinance"
+  data_io_workers: int = 4
+  # Symbols loaded (with default indicators) at startup; None reads
+  # ``trading_config.supported_symbols`` from ``sample_config_path``
+  warmup_on_startup: bool = True
+  warmup_symbols: Optional[List[str]] = None
+  response_cache_max_bytes: int = 64 * 1024 * 1024
+  response_cache_ttl: float = 300.0
+  # Memoized backtest results; set a path to also persist them in SQLite
+  backtest_cache_max_bytes: int = 128 * 1024 * 1024
+  backtest_cache_path: Optional[Path] = None
+  # Background backtest/sweep jobs (/api/jobs) run on a pool of worker
+  # processes; finished jobs are kept in SQLite at ``job_store_path``,
+  # which defaults to ``data_dir / "jobs.db"``
+  job_max_workers: int = 2
+  job_max_pending: int = 100
+  job_store_path: Optional[Path] = None
+  sample_config_path: Path = Path(__file__).resolve().parent / "sample_config.json"
 
   class Config:
     env_prefix = "TRADER_"
@@ -1,21 +1,52 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 import asyncio
-from typing import List, Optional
+import json
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Union
 
 from .config import settings
-from .database import engine, get_db, Base
+from .database import engine, Base
 from .schemas import *
 from .services.market_data import MarketDataService
-from .services.backtesting import BacktestEngine
+from .services.backtest_cache import BacktestCache, create_engine, normalize_params
+from .services.backtesting import trade_columns
+from .services.jobs import JobManager, run_backtest_job, run_sweep_job
+from .services.portfolio_backtest import PortfolioBacktestEngine
+from .services.optimization import check_grid, expand_grid, run_sweep, walk_forward
+from .services.monte_carlo import monte_carlo
 from .services.websocket_manager import WebSocketManager
 from .services.portfolio import PortfolioManager
+from .services.response_cache import ResponseCache
+from .services.warmup import WarmupStatus, configured_symbols, warm_up
+from .services.wire_format import json_bytes, validate_encoding
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Algo Trading System", version="1.0.0")
+warmup_status = WarmupStatus()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the cache in the background so the server accepts requests meanwhile
+    warmup_task = None
+    if settings.warmup_on_startup:
+        warmup_task = asyncio.create_task(warm_up(configured_symbols(), warmup_status))
+    else:
+        warmup_status.state = "ready"
+    # Job progress goes to /ws connections subscribed to "job" messages
+    job_manager.start(asyncio.get_running_loop(), websocket_manager.publish)
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await websocket_manager.stop_streaming()
+    job_manager.shutdown()
+
+app = FastAPI(title="Algo Trading System", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -29,55 +60,483 @@ app.add_middleware(
 # Initialize services
 market_data_service = MarketDataService()
 websocket_manager = WebSocketManager()
-portfolio_manager = PortfolioManager()
+portfolio_manager = websocket_manager.portfolio_manager
+response_cache = ResponseCache()
+backtest_cache = BacktestCache()
+job_manager = JobManager()
 
 @app.get("/")
 async def root():
     return {"message": "Algo Trading System API"}
 
+@app.get("/api/health")
+async def health():
+    """Liveness plus warm-up progress and cache usage"""
+    return {
+        "status": "ok" if warmup_status.ready else "warming",
+        "warmup": warmup_status.to_dict(),
+        "cache": market_data_service.cache_stats(),
+        "streaming": websocket_manager.streaming_symbols,
+        "jobs": job_manager.stats(),
+    }
+
+@app.get("/api/health/ready")
+async def readiness():
+    """200 once the startup warm-up has finished, 503 until then"""
+    body = {"ready": warmup_status.ready, "warmup": warmup_status.to_dict()}
+    return JSONResponse(body, status_code=200 if warmup_status.ready else 503)
+
+HISTORICAL_FORMATS = ("rows", "columns")
+
 @app.get("/api/historical/{symbol}", response_model=HistoricalDataResponse)
-async def get_historical_data(symbol: str, days: int = 30):
-    """Get historical market data for a symbol"""
+async def get_historical_data(
+    request: Request,
+    symbol: str,
+    days: int = 30,
+    strategy: Optional[str] = None,
+    format: str = "rows",
+    validate: bool = False,
+):
+    """Get historical market data for a symbol, optionally with a strategy's
+    default indicators and signals.
+
+    ``format=columns`` returns one list per field instead of one object per
+    candle. Rows are serialized straight from the column arrays unless
+    ``validate=true`` asks for per-candle model validation. Responses carry
+    an ETag and are cached server-side; ``If-None-Match`` gets a 304.
+    """
+    if format not in HISTORICAL_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+
+    async def build() -> bytes:
+        start = await market_data_service.alatest_timestamp(symbol) - timedelta(days=days)
+        if strategy:
+            data = await market_data_service.aevaluate(symbol, strategy)
+            data = data.loc[start:]
+        else:
+            data = await market_data_service.aslice_dataframe(symbol, start=start)
+        if format == "columns":
+            return json_bytes({
+                'symbol': symbol,
+                'columns': market_data_service.to_candle_columns(data)
+            })
+        if validate:
+            return HistoricalDataResponse(
+                symbol=symbol,
+                data=market_data_service.to_candles(data)
+            ).model_dump_json().encode()
+        return json_bytes({
+            'symbol': symbol,
+            'data': market_data_service.to_candles(data, iso=True)
+        })
+
     try:
-        data = await market_data_service.get_historical_data(symbol, days)
-        return HistoricalDataResponse(
-            symbol=symbol,
-            data=[
-                CandleData(
-                    timestamp=row['timestamp'],
-                    open=row['open'],
-                    high=row['high'],
-                    low=row['low'],
-                    close=row['close'],
-                    volume=row['volume']
-                ) for _, row in data.iterrows()
-            ]
-        )
+        version = await market_data_service.adata_version(symbol)
+        key = ('historical', symbol, version, days, strategy, format, validate)
+        return await response_cache.respond(request, key, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def ndjson_chunks(frames: Iterable) -> Iterator[bytes]:
+    """One candle object per line, one chunk per batch"""
+    for frame in frames:
+        yield b"".join(json_bytes(candle) + b"\n" for candle in market_data_service.to_candles(frame, iso=True))
+
+def json_document_chunks(symbol: str, frames: Iterable) -> Iterator[bytes]:
+    """The /api/historical document, emitted a batch of candles at a time"""
+    yield b'{"symbol":' + json_bytes(symbol) + b',"data":['
+    separator = b""
+    for frame in frames:
+        if len(frame):
+            # Drop the list brackets so batches join into one array
+            yield separator + json_bytes(market_data_service.to_candles(frame, iso=True))[1:-1]
+            separator = b","
+    yield b"]}"
+
+@app.get("/api/historical/{symbol}/stream")
+async def stream_historical_data(
+    symbol: str,
+    start: Union[datetime, date, None] = None,
+    end: Union[datetime, date, None] = None,
+    days: Optional[int] = None,
+    format: str = "ndjson",
+    batch_size: int = Query(5000, ge=1, le=100_000),
+):
+    """Stream candles for a range as NDJSON (``format=ndjson``) or as one
+    chunked JSON document (``format=json``). Rows are read from storage in
+    ``batch_size`` batches, so memory stays bounded for multi-year ranges.
+    ``days`` counts back from the latest candle when ``start`` is omitted."""
+    if format not in ("ndjson", "json"):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    try:
+        # Fail before the response starts if the symbol can't be loaded
+        latest = await market_data_service.alatest_timestamp(symbol)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if start is None and days is not None:
+        start = latest - timedelta(days=days)
+
+    # Sync generators run in Starlette's thread pool, off the event loop
+    frames = market_data_service.iter_frames(symbol, start, end, batch_size)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_chunks(frames), media_type="application/x-ndjson")
+    return StreamingResponse(json_document_chunks(symbol, frames), media_type="application/json")
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters and memory use of the server-side caches"""
+    return {
+        "market_data": market_data_service.cache_stats(),
+        "responses": response_cache.stats(),
+        "backtests": backtest_cache.stats(),
+    }
+
+def backtest_metrics(initial_cash: float, index, result) -> BacktestMetrics:
+    final_equity = result.equity_curve[-1]['equity'] if len(result.equity_curve) else initial_cash
+    closed = result.winning_trades + result.losing_trades
+    span_days = (index[-1] - index[0]).days if len(index) > 1 else 0
+    if span_days > 0 and final_equity > 0:
+        annualized = ((final_equity / initial_cash) ** (365 / span_days) - 1) * 100
+    else:
+        annualized = result.total_return
+    return BacktestMetrics(
+        total_return_pct=result.total_return,
+        annualized_return_pct=annualized,
+        max_drawdown_pct=result.max_drawdown,
+        win_rate_pct=result.winning_trades / closed * 100 if closed else 0.0,
+        trades_executed=result.total_trades,
+        final_equity=final_equity,
+        sharpe_ratio=result.sharpe_ratio,
+        sortino_ratio=result.sortino_ratio,
+        max_drawdown_duration_bars=result.max_drawdown_duration,
+        exposure_pct=result.exposure,
+        profit_factor=result.profit_factor,
+    )
+
+def backtest_response(request: BacktestRequest, data, result) -> BacktestResponse:
+    return BacktestResponse(
+        symbol=request.symbol,
+        strategy=request.strategy,
+        metrics=backtest_metrics(request.initial_cash, data.index, result),
+        equity_curve=list(result.equity_curve.downsample(request.max_points, request.downsample)),
+        equity_points=len(result.equity_curve),
+        trades=result.trades,
+    )
+
+def backtest_key(request: BacktestRequest, version) -> tuple:
+    """Everything that determines a backtest's result"""
+    return (
+        request.symbol.upper(),
+        version,
+        request.start,
+        request.end,
+        request.days,
+        request.strategy,
+        request.initial_cash,
+        sorted(request.parameters.items()),
+        request.engine,
+        request.units,
+    )
+
+async def backtest_data(request: BacktestRequest):
+    """The request's resolved start and its slice of price data"""
+    start = request.start
+    if start is None and request.days is not None:
+        start = await market_data_service.alatest_timestamp(request.symbol) - timedelta(days=request.days)
+    return start, await market_data_service.aslice_dataframe(request.symbol, start, request.end)
+
+async def load_backtest(request: BacktestRequest, version):
+    """The request's price data and (memoized) backtest result"""
+    start, data = await backtest_data(request)
+    result = await asyncio.to_thread(
+        backtest_cache.run,
+        data,
+        request.symbol,
+        request.strategy,
+        request.parameters,
+        request.initial_cash,
+        data_version=version,
+        start=start,
+        end=request.end,
+        engine=request.engine,
+        trade_units=request.units,
+    )
+    return data, result
+
 @app.post("/api/backtest", response_model=BacktestResponse)
-async def run_backtest(request: BacktestRequest):
-    """Run backtest for a strategy"""
+async def run_backtest(request: BacktestRequest, http_request: Request):
+    """Run backtest for a strategy; cached and ETag'd like /api/historical.
+
+    ``max_points`` downsamples the equity curve for plotting (``downsample``
+    picks ``lttb`` or the drawdown-preserving ``minmax``).
+    """
+    async def build() -> bytes:
+        data, result = await load_backtest(request, version)
+        return backtest_response(request, data, result).model_dump_json().encode()
+
+    try:
+        version = await market_data_service.adata_version(request.symbol)
+        key = ('backtest', *backtest_key(request, version), request.max_points, request.downsample)
+        return await response_cache.respond(http_request, key, build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+EQUITY_FORMATS = {
+    "binary": "application/octet-stream",
+    "columns": "application/json",
+    "csv": "text/csv",
+}
+
+@app.post("/api/backtest/equity")
+async def download_equity_curve(request: BacktestRequest, http_request: Request, format: str = "binary"):
+    """Full-resolution equity curve of a backtest (``max_points`` is ignored).
+
+    ``binary`` is the little-endian columnar layout documented on
+    ``EquityCurve.to_bytes``; ``columns`` is JSON with one list per field,
+    trade log included; ``csv`` has one row per bar.
+    """
+    if format not in EQUITY_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+
+    async def build() -> bytes:
+        _, result = await load_backtest(request, version)
+        curve = result.equity_curve
+        if format == "binary":
+            return curve.to_bytes()
+        if format == "csv":
+            return (await asyncio.to_thread(curve.to_frame().to_csv)).encode()
+        return json_bytes({
+            'symbol': request.symbol,
+            'strategy': request.strategy,
+            'equity_curve': curve.to_columns(),
+            'trades': trade_columns(result.trades),
+        })
+
+    try:
+        version = await market_data_service.adata_version(request.symbol)
+        key = ('backtest_equity', *backtest_key(request, version), format)
+        return await response_cache.respond(http_request, key, build, media_type=EQUITY_FORMATS[format])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/backtest/portfolio", response_model=PortfolioBacktestResponse)
+async def run_portfolio_backtest(request: PortfolioBacktestRequest):
+    """Backtest a strategy over several symbols sharing one cash balance"""
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in request.symbols))
     try:
-        # Get historical data
-        data = await market_data_service.get_historical_data(request.symbol, request.days)
-        
-        # Run backtest
-        engine = BacktestEngine(request.initial_cash)
-        result = engine.run_backtest(
-            data, 
+        start = request.start
+        if start is None and request.days is not None:
+            latest = await asyncio.gather(*(market_data_service.alatest_timestamp(s) for s in symbols))
+            start = max(latest) - timedelta(days=request.days)
+        frames = await asyncio.gather(
+            *(market_data_service.aslice_dataframe(s, start, request.end) for s in symbols)
+        )
+        engine = PortfolioBacktestEngine(request.initial_cash, request.allocation)
+        result = await asyncio.to_thread(
+            engine.run_portfolio, dict(zip(symbols, frames)), request.strategy, **request.parameters
+        )
+        curve = result.equity_curve.downsample(request.max_points, request.downsample)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return PortfolioBacktestResponse(
+        symbols=symbols,
+        strategy=request.strategy,
+        allocation=request.allocation,
+        metrics=backtest_metrics(request.initial_cash, result.equity_curve.timestamps, result),
+        positions=result.final_positions(),
+        equity_curve=list(curve),
+        equity_points=len(result.equity_curve),
+        trades=result.trades,
+    )
+
+def parameter_grid(parameters) -> dict:
+    return {
+        name: spec.model_dump() if isinstance(spec, ParameterRange) else spec
+        for name, spec in parameters.items()
+    }
+
+@app.post("/api/backtest/sweep", response_model=SweepResponse)
+async def run_parameter_sweep(request: SweepRequest):
+    """Backtest every combination of the parameter ranges and rank the results"""
+    grid = parameter_grid(request.parameters)
+    try:
+        data = await market_data_service.aslice_dataframe(request.symbol, request.start, request.end)
+        # The sweep fans out to a process pool; keep the event loop free meanwhile
+        results = await asyncio.to_thread(
+            run_sweep,
+            data,
+            request.strategy,
+            grid,
+            request.initial_cash,
+            request.rank_by,
+            settings.sweep_max_workers,
+            request.top_n,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return SweepResponse(
+        symbol=request.symbol,
+        strategy=request.strategy,
+        combinations=len(expand_grid(grid)),
+        results=results
+    )
+
+@app.post("/api/backtest/walk-forward", response_model=WalkForwardResponse)
+async def run_walk_forward(request: WalkForwardRequest):
+    """Optimize on rolling training windows and score each winner on the next test window"""
+    try:
+        data = await market_data_service.aslice_dataframe(request.symbol, request.start, request.end)
+        result = await asyncio.to_thread(
+            walk_forward,
+            data,
             request.strategy,
-            **request.strategy_params
+            parameter_grid(request.parameters),
+            request.train_days,
+            request.test_days,
+            request.step_days,
+            request.anchored,
+            request.initial_cash,
+            request.rank_by,
+            settings.sweep_max_workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return WalkForwardResponse(symbol=request.symbol, strategy=request.strategy, **result)
+
+@app.post("/api/backtest/monte-carlo", response_model=MonteCarloResponse)
+async def run_monte_carlo(request: MonteCarloRequest):
+    """Resample a backtest's returns or trade order to see the spread of outcomes"""
+    try:
+        data = await market_data_service.aslice_dataframe(request.symbol, request.start, request.end)
+        version = await market_data_service.adata_version(request.symbol)
+        result = await asyncio.to_thread(
+            backtest_cache.run,
+            data,
+            request.symbol,
+            request.strategy,
+            request.parameters,
+            request.initial_cash,
+            data_version=version,
+            start=request.start,
+            end=request.end,
+        )
+        summary = await asyncio.to_thread(
+            monte_carlo,
+            result,
+            request.initial_cash,
+            request.method,
+            request.simulations,
+            request.seed,
+            settings.sweep_max_workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return MonteCarloResponse(symbol=request.symbol, strategy=request.strategy, **summary)
+
+@app.post("/api/jobs/backtest", response_model=JobInfo, status_code=202)
+async def submit_backtest_job(request: BacktestRequest):
+    """Queue a backtest on the job worker pool and return at once.
+
+    Poll /api/jobs/{id}, or subscribe to ``job`` messages on /ws, for
+    progress; the finished result is the /api/backtest response body.
+    """
+    try:
+        # Reject bad engines/strategies now rather than in the worker
+        create_engine(request.engine, request.initial_cash, request.units)
+        normalize_params(request.strategy, request.parameters)
+        _, data = await backtest_data(request)
+        # The first submit starts the worker pool, and every submit writes
+        # the job to SQLite; neither belongs on the event loop
+        job = await asyncio.to_thread(
+            job_manager.submit,
+            "backtest",
+            request.symbol,
+            request.model_dump(mode="json"),
+            run_backtest_job,
+            (data, request.strategy, request.parameters, request.initial_cash, request.engine, request.units),
+            lambda result: backtest_response(request, data, result).model_dump(mode="json"),
         )
-        
-        return BacktestResponse(
-            symbol=request.symbol,
-            strategy=request.strategy,
-            result=result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return job.to_dict()
+
+@app.post("/api/jobs/sweep", response_model=JobInfo, status_code=202)
+async def submit_sweep_job(request: SweepRequest):
+    """Queue a parameter sweep; while it runs the job's ``partial`` holds
+    the best rows so far. The result is the /api/backtest/sweep body."""
+    grid = parameter_grid(request.parameters)
+    try:
+        combinations = len(check_grid(request.strategy, grid, request.rank_by))
+        data = await market_data_service.aslice_dataframe(request.symbol, request.start, request.end)
+        job = await asyncio.to_thread(
+            job_manager.submit,
+            "sweep",
+            request.symbol,
+            request.model_dump(mode="json"),
+            run_sweep_job,
+            (data, request.strategy, grid, request.initial_cash, request.rank_by, request.top_n),
+            lambda rows: SweepResponse(
+                symbol=request.symbol,
+                strategy=request.strategy,
+                combinations=combinations,
+                results=rows,
+            ).model_dump(mode="json"),
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return job.to_dict()
+
+@app.get("/api/jobs", response_model=List[JobInfo])
+async def list_jobs(status: Optional[str] = None, limit: int = Query(50, ge=1, le=1000)):
+    """Most recent jobs first, optionally only those in one status"""
+    try:
+        jobs = await asyncio.to_thread(job_manager.list, status, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [job.to_dict() for job in jobs]
+
+@app.get("/api/jobs/{job_id}", response_model=JobDetail)
+async def get_job(job_id: str):
+    """A job's status, request and (once completed) result"""
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict(include_result=True)
+
+@app.post("/api/jobs/{job_id}/cancel", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next checkpoint"""
+    try:
+        job = await asyncio.to_thread(job_manager.cancel, job_id)
+        return job.to_dict()
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @app.get("/api/portfolio", response_model=Portfolio)
 async def get_portfolio():
@@ -106,7 +565,7 @@ async def execute_trade(request: TradeRequest):
             message=str(e)
         )
 
-@app.get("/api/trades", response_model=List[Trade])
+@app.get("/api/trades", response_model=List[PaperTrade])
 async def get_trades():
     """Get trade history"""
     return portfolio_manager.trades
@@ -119,18 +578,46 @@ async def reset_portfolio():
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time data streaming"""
-    await websocket_manager.connect(websocket)
+    """WebSocket endpoint for real-time data streaming.
+
+    Connect with ``?encoding=json|msgpack|binary|binary32`` to pick the wire format.
+    """
+    try:
+        encoding = validate_encoding(websocket.query_params.get('encoding', 'json'))
+    except (ValueError, RuntimeError):
+        await websocket.close(code=1003)
+        return
+    await websocket_manager.connect(websocket, encoding=encoding)
     try:
         while True:
             data = await websocket.receive_text()
-            message = eval(data)  # In production, use json.loads with proper validation
-            
-            if message.get('action') == 'start_streaming':
-                symbol = message.get('symbol', 'AAPL')
-                await websocket_manager.start_streaming(symbol)
-            elif message.get('action') == 'stop_streaming':
-                await websocket_manager.stop_streaming()
+            try:
+                message = json.loads(data)
+                action = message.get('action')
+                if action == 'start_streaming':
+                    symbol = message.get('symbol', settings.default_symbol)
+                    # The requesting client always receives the stream it started
+                    websocket_manager.subscribe(websocket, [symbol], message.get('types'))
+                    await websocket_manager.start_streaming(symbol)
+                elif action == 'stop_streaming':
+                    await websocket_manager.stop_streaming(message.get('symbol'))
+                elif action == 'subscribe':
+                    websocket_manager.subscribe(websocket, message['symbols'], message.get('types'))
+                elif action == 'unsubscribe':
+                    websocket_manager.unsubscribe(websocket, message.get('symbols'), message.get('types'))
+                elif action == 'configure':
+                    websocket_manager.configure(websocket, message.get('delta'), message.get('max_rate'))
+                else:
+                    raise ValueError(f"Unknown action: {action}")
+            except (ValueError, AttributeError, KeyError, TypeError) as e:
+                await websocket_manager.send_personal(websocket, {'type': 'error', 'message': str(e)})
+                continue
+
+            await websocket_manager.send_personal(websocket, {
+                'type': 'streaming_status',
+                'symbols': websocket_manager.streaming_symbols,
+                'subscriptions': websocket_manager.subscription_summary(websocket)
+            })
                 
     except WebSocketDisconnect:
         websocket_manager.disconnect(websocket)
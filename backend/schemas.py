@@ -1,7 +1,7 @@
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 
 class Candle(BaseModel):
@@ -12,6 +12,8 @@ class Candle(BaseModel):
   close: float
   volume: float
   indicators: Dict[str, Optional[float]] = Field(default_factory=dict)
+  signal: int = 0
+  signal_reason: str = ""
 
 
 class HistoricalResponse(BaseModel):
@@ -19,6 +21,11 @@ class HistoricalResponse(BaseModel):
   candles: List[Candle]
 
 
+class HistoricalDataResponse(BaseModel):
+  symbol: str
+  data: List[Candle]
+
+
 class StrategyInfo(BaseModel):
   name: str
   label: str
@@ -51,14 +58,64 @@ class PortfolioRead(BaseModel):
   unrealized_pnl: float
 
 
+class Position(BaseModel):
+  symbol: str
+  quantity: float
+  avg_price: float
+  current_price: float
+  unrealized_pnl: float = 0.0
+
+
+class Portfolio(BaseModel):
+  cash: float
+  total_value: float
+  total_pnl: float
+  positions: List[Position] = Field(default_factory=list)
+  metrics: Dict[str, Optional[float]] = Field(default_factory=dict)
+
+
+class PaperTrade(BaseModel):
+  symbol: str
+  action: str
+  quantity: float
+  price: float
+  commission: float = 0.0
+  timestamp: datetime
+
+
+class TradeRequest(BaseModel):
+  symbol: str
+  action: str
+  quantity: int
+  price: float
+
+
+class TradeResponse(BaseModel):
+  success: bool
+  trade: Optional[PaperTrade] = None
+  message: str = ""
+
+
 class BacktestRequest(BaseModel):
   symbol: str
   strategy: str
   start: Optional[date] = None
   end: Optional[date] = None
+  # Alternative to start: the last N days of data
+  days: Optional[int] = None
   initial_cash: float = 100_000
+  # Shares per signal; only used by the "event" engine
   units: int = 10
-  parameters: Dict[str, float] = Field(default_factory=dict)
+  # "vectorized" or "event" (live trading path with commission/slippage)
+  engine: str = "vectorized"
+  parameters: Dict[str, float] = Field(
+    default_factory=dict,
+    validation_alias=AliasChoices("parameters", "strategy_params"),
+  )
+  # Downsample equity_curve to at most this many points, by "lttb" or
+  # "minmax"; /api/backtest/equity serves the full resolution
+  max_points: Optional[int] = Field(default=None, ge=3)
+  downsample: str = "lttb"
 
 
 class BacktestMetrics(BaseModel):
@@ -68,11 +125,158 @@ class BacktestMetrics(BaseModel):
   win_rate_pct: float
   trades_executed: int
   final_equity: float
+  sharpe_ratio: float = 0.0
+  sortino_ratio: float = 0.0
+  max_drawdown_duration_bars: int = 0
+  exposure_pct: float = 0.0
+  profit_factor: Optional[float] = None
 
 
 class BacktestResponse(BaseModel):
   symbol: str
   strategy: str
   metrics: BacktestMetrics
-  equity_curve: List[Dict[str, float]]
+  equity_curve: List[Dict[str, object]]
+  # Bars in the full-resolution curve (equity_curve may be downsampled)
+  equity_points: int = 0
   trades: List[Dict[str, object]]
+
+
+class PortfolioBacktestRequest(BaseModel):
+  symbols: List[str]
+  strategy: str
+  start: Optional[date] = None
+  end: Optional[date] = None
+  days: Optional[int] = None
+  initial_cash: float = 100_000
+  # "equal_weight" or "cash_split"
+  allocation: str = "equal_weight"
+  parameters: Dict[str, float] = Field(
+    default_factory=dict,
+    validation_alias=AliasChoices("parameters", "strategy_params"),
+  )
+  max_points: Optional[int] = Field(default=None, ge=3)
+  downsample: str = "lttb"
+
+
+class PortfolioBacktestResponse(BaseModel):
+  symbols: List[str]
+  strategy: str
+  allocation: str
+  metrics: BacktestMetrics
+  positions: Dict[str, int]
+  equity_curve: List[Dict[str, object]]
+  equity_points: int = 0
+  trades: List[Dict[str, object]]
+
+
+class ParameterRange(BaseModel):
+  start: float
+  stop: float
+  step: float = 1
+
+
+class SweepRequest(BaseModel):
+  symbol: str
+  strategy: str
+  start: Optional[date] = None
+  end: Optional[date] = None
+  initial_cash: float = 100_000
+  parameters: Dict[str, Union[List[float], ParameterRange]]
+  rank_by: str = "total_return"
+  top_n: Optional[int] = None
+
+
+class SweepResult(BaseModel):
+  rank: int
+  parameters: Dict[str, float]
+  metrics: Dict[str, Optional[float]]
+
+
+class SweepResponse(BaseModel):
+  symbol: str
+  strategy: str
+  combinations: int
+  results: List[SweepResult]
+
+
+class WalkForwardRequest(BaseModel):
+  symbol: str
+  strategy: str
+  start: Optional[date] = None
+  end: Optional[date] = None
+  initial_cash: float = 100_000
+  parameters: Dict[str, Union[List[float], ParameterRange]]
+  train_days: int
+  test_days: int
+  # Defaults to test_days (non-overlapping test windows)
+  step_days: Optional[int] = None
+  # Train from the first bar every time instead of a rolling window
+  anchored: bool = False
+  rank_by: str = "total_return"
+
+
+class WalkForwardFold(BaseModel):
+  train_start: datetime
+  train_end: datetime
+  test_start: datetime
+  test_end: datetime
+  parameters: Dict[str, float]
+  in_sample: Dict[str, Optional[float]]
+  out_of_sample: Dict[str, Optional[float]]
+
+
+class WalkForwardResponse(BaseModel):
+  symbol: str
+  strategy: str
+  folds: List[WalkForwardFold]
+  summary: Dict[str, Optional[float]]
+
+
+class MonteCarloRequest(BaseModel):
+  symbol: str
+  strategy: str
+  start: Optional[date] = None
+  end: Optional[date] = None
+  initial_cash: float = 100_000
+  parameters: Dict[str, float] = Field(
+    default_factory=dict,
+    validation_alias=AliasChoices("parameters", "strategy_params"),
+  )
+  # "returns" (bootstrap bar returns) or "trades" (shuffle trade order)
+  method: str = "returns"
+  simulations: int = 1000
+  seed: Optional[int] = None
+
+
+class MonteCarloResponse(BaseModel):
+  symbol: str
+  strategy: str
+  method: str
+  simulations: int
+  baseline: Dict[str, float]
+  total_return: Dict[str, float]
+  max_drawdown: Dict[str, float]
+  probability_of_loss: float
+
+
+class JobInfo(BaseModel):
+  id: str
+  # "backtest" or "sweep"
+  kind: str
+  symbol: str
+  # "queued", "running", "completed", "failed" or "cancelled"
+  status: str
+  progress: float
+  created_at: datetime
+  started_at: Optional[datetime] = None
+  finished_at: Optional[datetime] = None
+  error: Optional[str] = None
+  # Best rows so far while a sweep is running
+  partial: Optional[Any] = None
+
+
+class JobDetail(JobInfo):
+  request: Dict[str, object]
+  # The BacktestResponse / SweepResponse body once completed
+  result: Optional[Dict[str, object]] = None
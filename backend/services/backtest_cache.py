@@ -0,0 +1,222 @@
+"""Memoized backtest results.
+
+Results are keyed on symbol, a data fingerprint, strategy, normalized
+parameters, starting cash and date range. They live in an in-process LRU
+and, when ``settings.backtest_cache_path`` is set, in a SQLite file that
+survives restarts.
+
+The fingerprint is either the store's data version for the symbol (the API
+path) or a hash of the frame's contents. Either way changed market data
+yields a new key, so stale results are never served; when a new store
+version is seen, persisted rows for older versions are deleted as well.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from .backtesting import BacktestEngine, BacktestResult
+from .event_backtest import EventDrivenBacktestEngine
+from .lru_cache import LRUCache
+from .strategies import StrategyFactory
+
+Bound = Union[date, datetime, pd.Timestamp, None]
+
+# "vectorized": all-in fills at the close, no costs. "event": the live
+# trading path with fixed units and the configured commission/slippage.
+ENGINES = ("vectorized", "event")
+
+
+def create_engine(
+  engine: str, initial_cash: float, trade_units: int = settings.default_units
+) -> BacktestEngine:
+  if engine == "vectorized":
+    return BacktestEngine(initial_cash)
+  if engine == "event":
+    return EventDrivenBacktestEngine(initial_cash, trade_units=trade_units)
+  raise ValueError(f"Unknown engine: {engine}; expected one of {', '.join(ENGINES)}")
+
+
+def engine_options(engine: BacktestEngine) -> Dict[str, Any]:
+  """Engine settings that change results and so belong in the cache key."""
+  if isinstance(engine, EventDrivenBacktestEngine):
+    return {"engine": "event", "trade_units": engine.trade_units, **engine.costs.to_dict()}
+  return {"engine": "vectorized"}
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+  """Content hash of a frame's timestamps and OHLCV values."""
+  digest = hashlib.blake2b(digest_size=16)
+  digest.update(pd.DatetimeIndex(df.index).asi8.tobytes())
+  for field in ("open", "high", "low", "close", "volume"):
+    digest.update(np.ascontiguousarray(df[field].to_numpy(dtype=np.float64)).tobytes())
+  return digest.hexdigest()
+
+
+def normalize_params(strategy_name: str, params: Optional[Dict[str, Any]]) -> Dict[str, float]:
+  """Defaults filled in and values as floats, so ``{}``, ``{"period": 14}``
+  and ``{"period": 14.0}`` all map to the same key."""
+  strategy_cls = StrategyFactory.get(strategy_name)
+  merged = {**strategy_cls.default_parameters, **(params or {})}
+  return {name: float(merged[name]) for name in sorted(merged)}
+
+
+def result_nbytes(result: BacktestResult) -> int:
+  curve = result.equity_curve
+  size = curve.equity.nbytes + curve.cash.nbytes + curve.position_value.nbytes + 8 * len(curve)
+  return size + 200 * len(result.trades)
+
+
+class BacktestCache:
+  def __init__(
+    self,
+    max_bytes: int = settings.backtest_cache_max_bytes,
+    path: Optional[Path] = settings.backtest_cache_path,
+  ):
+    self._memory: LRUCache[BacktestResult] = LRUCache(max_bytes=max_bytes, sizeof=result_nbytes)
+    self.path = Path(path) if path is not None else None
+    self._db_lock = threading.Lock()
+    self._versions: Dict[str, str] = {}
+    self.disk_hits = 0
+    if self.path is not None:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      with self._connect() as conn:
+        conn.execute(
+          """
+          CREATE TABLE IF NOT EXISTS backtest_results (
+            key TEXT PRIMARY KEY,
+            symbol TEXT NOT NULL,
+            data_version TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            payload BLOB NOT NULL
+          )
+          """
+        )
+        conn.execute(
+          "CREATE INDEX IF NOT EXISTS ix_backtest_results_symbol ON backtest_results (symbol)"
+        )
+
+  def _connect(self) -> sqlite3.Connection:
+    return sqlite3.connect(self.path, timeout=30)
+
+  @staticmethod
+  def make_key(
+    symbol: str,
+    fingerprint: str,
+    strategy_name: str,
+    params: Dict[str, float],
+    initial_cash: float,
+    start: Bound = None,
+    end: Bound = None,
+    options: Optional[Dict[str, Any]] = None,
+  ) -> str:
+    parts = [
+      symbol.upper(),
+      fingerprint,
+      strategy_name,
+      params,
+      float(initial_cash),
+      None if start is None else pd.Timestamp(start).isoformat(),
+      None if end is None else pd.Timestamp(end).isoformat(),
+      options or {},
+    ]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+  def get(self, key: str) -> Optional[BacktestResult]:
+    result = self._memory.get(key)
+    if result is not None or self.path is None:
+      return result
+    with self._db_lock, self._connect() as conn:
+      row = conn.execute("SELECT payload FROM backtest_results WHERE key = ?", (key,)).fetchone()
+    if row is None:
+      return None
+    # Only this process writes the file, so unpickling it is trusted
+    result = pickle.loads(row[0])
+    self.disk_hits += 1
+    self._memory.put(key, result)
+    return result
+
+  def put(
+    self,
+    key: str,
+    result: BacktestResult,
+    symbol: str,
+    fingerprint: str,
+    strategy_name: str,
+    versioned: bool = False,
+  ) -> None:
+    """Store a result; ``versioned`` marks ``fingerprint`` as the symbol's
+    store version, so persisted rows for any other version are purged."""
+    self._memory.put(key, result)
+    if self.path is None:
+      return
+    symbol = symbol.upper()
+    payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    with self._db_lock, self._connect() as conn:
+      if versioned and self._versions.get(symbol) != fingerprint:
+        conn.execute(
+          "DELETE FROM backtest_results WHERE symbol = ? AND data_version != ?",
+          (symbol, fingerprint),
+        )
+        self._versions[symbol] = fingerprint
+      conn.execute(
+        "INSERT OR REPLACE INTO backtest_results VALUES (?, ?, ?, ?, ?, ?)",
+        (key, symbol, fingerprint, strategy_name, time.time(), payload),
+      )
+
+  def run(
+    self,
+    data: pd.DataFrame,
+    symbol: str,
+    strategy_name: str,
+    params: Optional[Dict[str, Any]] = None,
+    initial_cash: float = settings.initial_cash,
+    data_version: Optional[str] = None,
+    start: Bound = None,
+    end: Bound = None,
+    engine: str = "vectorized",
+    trade_units: int = settings.default_units,
+  ) -> BacktestResult:
+    """``run_backtest`` of the named engine (see ``ENGINES``), memoized.
+
+    Pass the store's ``data_version`` (plus the ``start``/``end`` that
+    selected ``data``) to skip hashing the frame. Returned results may be
+    shared between callers and must be treated as read-only.
+    """
+    normalized = normalize_params(strategy_name, params)
+    backtester = create_engine(engine, initial_cash, trade_units)
+    versioned = data_version is not None
+    fingerprint = data_version if versioned else frame_fingerprint(data)
+    key = self.make_key(
+      symbol, fingerprint, strategy_name, normalized, initial_cash, start, end, engine_options(backtester)
+    )
+    result = self.get(key)
+    if result is None:
+      result = backtester.run_backtest(data, strategy_name, **normalized)
+      self.put(key, result, symbol, fingerprint, strategy_name, versioned=versioned)
+    return result
+
+  def clear(self) -> None:
+    self._memory.clear()
+    if self.path is not None:
+      with self._db_lock, self._connect() as conn:
+        conn.execute("DELETE FROM backtest_results")
+
+  def stats(self) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {**self._memory.stats(), "disk_hits": self.disk_hits}
+    if self.path is not None:
+      with self._db_lock, self._connect() as conn:
+        stats["disk_items"] = conn.execute("SELECT COUNT(*) FROM backtest_results").fetchone()[0]
+    return stats
@@ -1,59 +1,260 @@
 import pandas as pd
-from typing import Dict, List, Any
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 import numpy as np
 
-from ..models import Trade, BacktestResult
-from .strategies import SMAStrategy, RSIStrategy, BollingerBandsStrategy
+from . import metrics
+from .downsampling import check_method, downsample
+from .strategies import StrategyFactory
+
+EQUITY_FIELDS = ('equity', 'cash', 'position_value')
+# Binary equity curve: magic, point count, then the column arrays
+_EQUITY_HEADER = struct.Struct('<4sQ')
+EQUITY_MAGIC = b'EQC1'
+# Simulation loop iterations between calls of an engine's progress hook
+PROGRESS_EVERY = 10_000
+
+
+class EquityCurve(Sequence):
+    """Read-only list of equity points backed by arrays.
+
+    Each ``{'timestamp', 'equity', 'cash', 'position_value'}`` dict is only
+    built when it is accessed, so metrics and sweeps never pay for
+    per-bar Python objects.
+    """
+
+    def __init__(self, timestamps: pd.Index, equity: np.ndarray, cash: np.ndarray, position_value: np.ndarray):
+        self.timestamps = timestamps
+        self.equity = equity
+        self.cash = cash
+        self.position_value = position_value
+
+    def __len__(self) -> int:
+        return len(self.equity)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {
+            'timestamp': self.timestamps[index],
+            'equity': float(self.equity[index]),
+            'cash': float(self.cash[index]),
+            'position_value': float(self.position_value[index])
+        }
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return self[:]
+
+    @classmethod
+    def empty(cls) -> 'EquityCurve':
+        return cls(pd.DatetimeIndex([]), np.empty(0), np.empty(0), np.empty(0))
+
+    def take(self, positions: np.ndarray) -> 'EquityCurve':
+        return EquityCurve(
+            self.timestamps[positions],
+            self.equity[positions],
+            self.cash[positions],
+            self.position_value[positions]
+        )
+
+    def downsample(self, max_points: Optional[int], method: str = 'lttb') -> 'EquityCurve':
+        """At most ``max_points`` points chosen on the equity column (see
+        ``services.downsampling``); the curve itself when it already fits."""
+        check_method(method)
+        if max_points is None or len(self) <= max_points:
+            return self
+        x = self.epoch_ms().astype(np.float64) if len(self.timestamps) else None
+        return self.take(downsample(self.equity, max_points, method, x=x))
+
+    def epoch_ms(self) -> np.ndarray:
+        """Timestamps as int64 epoch milliseconds (naive times taken as UTC)"""
+        index = pd.DatetimeIndex(self.timestamps)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return index.to_numpy(dtype='datetime64[ms]').view(np.int64)
+
+    def to_columns(self) -> Dict[str, list]:
+        """One list per field, with ISO-8601 timestamps"""
+        index = pd.DatetimeIndex(self.timestamps)
+        columns: Dict[str, list] = {'timestamp': [value.isoformat() for value in index]}
+        for field in EQUITY_FIELDS:
+            columns[field] = np.asarray(getattr(self, field), dtype=np.float64).tolist()
+        return columns
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {field: getattr(self, field) for field in EQUITY_FIELDS},
+            index=pd.DatetimeIndex(self.timestamps, name='timestamp')
+        )
+
+    def to_bytes(self) -> bytes:
+        """Little-endian columnar encoding::
+
+            4s       magic b'EQC1'
+            Q        point count n
+            n x q    timestamps, epoch milliseconds
+            n x d    equity, then cash, then position_value
+        """
+        parts = [_EQUITY_HEADER.pack(EQUITY_MAGIC, len(self)), self.epoch_ms().astype('<i8').tobytes()]
+        for field in EQUITY_FIELDS:
+            parts.append(np.asarray(getattr(self, field), dtype='<f8').tobytes())
+        return b''.join(parts)
+
+
+def trade_columns(trades: List[Dict[str, Any]]) -> Dict[str, list]:
+    """The trade log as one list per field (missing fields are None)"""
+    fields: Dict[str, None] = {}
+    for trade in trades:
+        fields.update(dict.fromkeys(trade))
+    columns = {field: [trade.get(field) for trade in trades] for field in fields}
+    if 'timestamp' in columns:
+        columns['timestamp'] = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in columns['timestamp']
+        ]
+    return columns
+
+
+@dataclass
+class BacktestResult:
+    total_return: float
+    max_drawdown: float
+    sharpe_ratio: float
+    total_trades: int
+    winning_trades: int
+    losing_trades: int
+    equity_curve: EquityCurve
+    trades: List[Dict[str, Any]]
+    sortino_ratio: float = 0.0
+    # Longest stretch below a previous equity peak, in bars
+    max_drawdown_duration: int = 0
+    # Percent of bars holding a position
+    exposure: float = 0.0
+    profit_factor: Optional[float] = None
 
 
 class BacktestEngine:
-    def __init__(self, initial_cash: float = 100000.0):
+    def __init__(self, initial_cash: float = 100000.0, vectorized: bool = True):
         self.initial_cash = initial_cash
+        self.vectorized = vectorized
         self.cash = initial_cash
         self.position = 0
         self.trades: List[Dict[str, Any]] = []
-        self.equity_curve: List[Dict[str, Any]] = []
+        self.equity_curve = EquityCurve.empty()
+        self.equity = np.empty(0)
+        # Called with the fraction of bars simulated; may raise to stop the run
+        self.progress: Optional[Callable[[float], None]] = None
         
     def run_backtest(self, data: pd.DataFrame, strategy_name: str, **strategy_params) -> BacktestResult:
         """Run backtest for given strategy and data"""
         self.reset()
         
         # Initialize strategy
-        if strategy_name == "sma":
-            strategy = SMAStrategy(**strategy_params)
-        elif strategy_name == "rsi":
-            strategy = RSIStrategy(**strategy_params)
-        elif strategy_name == "bollinger":
-            strategy = BollingerBandsStrategy(**strategy_params)
-        else:
-            raise ValueError(f"Unknown strategy: {strategy_name}")
+        strategy = StrategyFactory.create(strategy_name, strategy_params)
         
         # Generate signals
-        signals = strategy.generate_signals(data)
+        signals = strategy.evaluate(data)
+        self._report(0.0)
+        
+        if self.vectorized:
+            return self.run_signals(data, signals['signal'].reindex(data.index, fill_value=0).to_numpy())
+        self._simulate_loop(data, signals)
         
-        # Execute trades based on signals
-        for i, row in data.iterrows():
+        # Calculate metrics
+        return self._calculate_metrics(data)
+
+    def run_signals(self, data: pd.DataFrame, signal: np.ndarray) -> BacktestResult:
+        """Run a backtest from a precomputed signal array aligned with ``data``
+        (e.g. one row of ``StrategyBase.evaluate_batch``)"""
+        self.reset()
+        self._simulate_vectorized(data, np.asarray(signal))
+        return self._calculate_metrics(data)
+
+    def _report(self, fraction: float):
+        if self.progress is not None:
+            self.progress(fraction)
+
+    def _simulate_loop(self, data: pd.DataFrame, signals: pd.DataFrame):
+        """Reference row-by-row simulation"""
+        n = len(data)
+        timestamps = []
+        cash = np.empty(n)
+        position_value = np.empty(n)
+        for k, (i, row) in enumerate(data.iterrows()):
+            if k % PROGRESS_EVERY == 0:
+                self._report(k / n)
             current_price = row['close']
             signal = signals.loc[i, 'signal'] if i in signals.index else 0
+            # MarketDataService frames carry the timestamp as their index
+            timestamp = row['timestamp'] if 'timestamp' in row else i
             
             # Execute trade based on signal
             if signal == 1 and self.position <= 0:  # Buy signal
-                self._execute_buy(i, current_price, row['timestamp'])
+                self._execute_buy(i, current_price, timestamp)
             elif signal == -1 and self.position > 0:  # Sell signal
-                self._execute_sell(i, current_price, row['timestamp'])
+                self._execute_sell(i, current_price, timestamp)
             
             # Record equity
-            current_equity = self.cash + (self.position * current_price)
-            self.equity_curve.append({
-                'timestamp': row['timestamp'],
-                'equity': current_equity,
-                'cash': self.cash,
-                'position_value': self.position * current_price
-            })
-        
-        # Calculate metrics
-        return self._calculate_metrics(data)
+            timestamps.append(timestamp)
+            cash[k] = self.cash
+            position_value[k] = self.position * current_price
+        self.equity = cash + position_value
+        self.equity_curve = EquityCurve(pd.Index(timestamps), self.equity, cash, position_value)
+
+    def _simulate_vectorized(self, data: pd.DataFrame, signal: np.ndarray):
+        """Array-based simulation producing the same trades and equity as the loop.
+
+        Only bars where the position can change are visited: runs of equal
+        signals collapse to the first bar that can actually fill (a buy needs
+        at least one affordable share). Cash and position are then
+        forward-filled from those fills across all bars in one pass.
+        """
+        n = len(data)
+        close = data['close'].to_numpy(dtype=float)
+        timestamps = pd.Index(data['timestamp']) if 'timestamp' in data.columns else data.index
+
+        candidates = np.flatnonzero(signal)
+        candidate_signals = signal[candidates]
+        # Start of each run of identical non-zero signals
+        run_starts = np.flatnonzero(np.diff(candidate_signals, prepend=0))
+        run_ends = np.r_[run_starts[1:], len(candidates)]
+
+        fill_bars: List[int] = []
+        cash_levels: List[float] = []
+        position_levels: List[int] = []
+        for run, (start, end) in enumerate(zip(run_starts, run_ends)):
+            if run % PROGRESS_EVERY == 0:
+                self._report(candidates[start] / n)
+            if candidate_signals[start] == 1:
+                if self.position > 0:
+                    continue
+                # First bar in the run whose price leaves room for one share
+                bars = candidates[start:end]
+                affordable = np.flatnonzero(close[bars] <= self.cash)
+                if len(affordable) == 0:
+                    continue
+                k = int(bars[affordable[0]])
+                self._execute_buy(k, close[k], timestamps[k])
+            else:
+                if self.position <= 0:
+                    continue
+                k = int(candidates[start])
+                self._execute_sell(k, close[k], timestamps[k])
+            fill_bars.append(k)
+            cash_levels.append(self.cash)
+            position_levels.append(self.position)
+
+        # State after the most recent fill at or before each bar
+        level = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(n), side='right') - 1
+        cash = np.r_[self.initial_cash, cash_levels][level + 1]
+        position = np.r_[0, position_levels][level + 1]
+        position_value = position * close
+        self.equity = cash + position_value
+
+        self.equity_curve = EquityCurve(timestamps, self.equity, cash, position_value)
     
     def _execute_buy(self, index: int, price: float, timestamp: datetime):
         """Execute buy order"""
@@ -89,7 +290,7 @@ class BacktestEngine:
     
     def _calculate_metrics(self, data: pd.DataFrame) -> BacktestResult:
         """Calculate backtest performance metrics"""
-        if not self.equity_curve:
+        if not len(self.equity):
             return BacktestResult(
                 total_return=0.0,
                 max_drawdown=0.0,
@@ -97,52 +298,29 @@ class BacktestEngine:
                 total_trades=0,
                 winning_trades=0,
                 losing_trades=0,
-                equity_curve=[],
+                equity_curve=EquityCurve.empty(),
                 trades=[]
             )
         
-        equity_df = pd.DataFrame(self.equity_curve)
-        
-        # Total return
-        final_equity = equity_df['equity'].iloc[-1]
-        total_return = (final_equity - self.initial_cash) / self.initial_cash * 100
-        
-        # Max drawdown
-        rolling_max = equity_df['equity'].expanding().max()
-        drawdown = (equity_df['equity'] - rolling_max) / rolling_max * 100
-        max_drawdown = drawdown.min()
-        
-        # Sharpe ratio (simplified)
-        returns = equity_df['equity'].pct_change().dropna()
-        if len(returns) > 1 and returns.std() > 0:
-            sharpe_ratio = returns.mean() / returns.std() * np.sqrt(252)  # Annualized
-        else:
-            sharpe_ratio = 0.0
-        
-        # Trade statistics
-        total_trades = len(self.trades)
-        buy_trades = [t for t in self.trades if t['type'] == 'BUY']
-        sell_trades = [t for t in self.trades if t['type'] == 'SELL']
-        
-        winning_trades = 0
-        losing_trades = 0
-        
-        for i in range(min(len(buy_trades), len(sell_trades))):
-            pnl = sell_trades[i]['value'] - buy_trades[i]['value']
-            if pnl > 0:
-                winning_trades += 1
-            else:
-                losing_trades += 1
+        equity = np.asarray(self.equity, dtype=float)
+        position_value = self.equity_curve.position_value
+        period_returns = metrics.returns(equity)
+        # Realized P&L per closing trade against average cost
+        pnls = metrics.round_trip_pnls(self.trades)
         
         return BacktestResult(
-            total_return=total_return,
-            max_drawdown=max_drawdown,
-            sharpe_ratio=sharpe_ratio,
-            total_trades=total_trades,
-            winning_trades=winning_trades,
-            losing_trades=losing_trades,
+            total_return=(equity[-1] - self.initial_cash) / self.initial_cash * 100,
+            max_drawdown=metrics.max_drawdown(equity),
+            sharpe_ratio=metrics.sharpe_ratio(period_returns),
+            total_trades=len(self.trades),
+            winning_trades=int(np.count_nonzero(pnls > 0)),
+            losing_trades=int(np.count_nonzero(pnls <= 0)),
             equity_curve=self.equity_curve,
-            trades=self.trades
+            trades=self.trades,
+            sortino_ratio=metrics.sortino_ratio(period_returns),
+            max_drawdown_duration=metrics.max_drawdown_duration(equity),
+            exposure=metrics.exposure(position_value),
+            profit_factor=metrics.profit_factor(pnls),
         )
     
     def reset(self):
@@ -150,4 +328,5 @@ class BacktestEngine:
         self.cash = self.initial_cash
         self.position = 0
         self.trades = []
-        self.equity_curve = []
+        self.equity_curve = EquityCurve.empty()
+        self.equity = np.empty(0)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+Timestamp = Union[datetime, pd.Timestamp, np.datetime64, int]
+
+
+class CandleRingBuffer:
+  """Fixed-capacity columnar OHLCV store for one symbol.
+
+  Every slot is written twice, at ``i`` and ``i + capacity``, so the most
+  recent ``len(self)`` candles always form one contiguous slice of the
+  backing arrays. ``view``/``column`` hand out NumPy views of that slice
+  without copying, and ``append`` only assigns into preallocated memory.
+  """
+
+  def __init__(self, capacity: int = 1000):
+    if capacity < 1:
+      raise ValueError("capacity must be >= 1")
+    self.capacity = capacity
+    self._timestamps = np.zeros(2 * capacity, dtype="datetime64[ns]")
+    self._values = np.zeros((len(PRICE_FIELDS), 2 * capacity), dtype=np.float64)
+    self._columns = {name: self._values[i] for i, name in enumerate(PRICE_FIELDS)}
+    self._count = 0
+
+  def __len__(self) -> int:
+    return min(self._count, self.capacity)
+
+  @property
+  def empty(self) -> bool:
+    return self._count == 0
+
+  def _window(self) -> slice:
+    size = len(self)
+    start = (self._count - size) % self.capacity
+    return slice(start, start + size)
+
+  def append(
+    self,
+    timestamp: Timestamp,
+    open: float,
+    high: float,
+    low: float,
+    close: float,
+    volume: float,
+  ) -> None:
+    pos = self._count % self.capacity
+    mirror = pos + self.capacity
+    if getattr(timestamp, "tzinfo", None) is not None:
+      # Stored as naive UTC, like the tz-aware frames extend_from_frame loads
+      timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    ts = np.datetime64(timestamp, "ns")
+    self._timestamps[pos] = ts
+    self._timestamps[mirror] = ts
+    values = self._values
+    values[0, pos] = values[0, mirror] = open
+    values[1, pos] = values[1, mirror] = high
+    values[2, pos] = values[2, mirror] = low
+    values[3, pos] = values[3, mirror] = close
+    values[4, pos] = values[4, mirror] = volume
+    self._count += 1
+
+  def extend_from_frame(self, df: pd.DataFrame) -> None:
+    """Bulk-load the newest ``capacity`` rows of an OHLCV frame."""
+    tail = df.iloc[-self.capacity:]
+    if "timestamp" in tail.columns:
+      timestamps = pd.to_datetime(tail["timestamp"]).to_numpy(dtype="datetime64[ns]")
+    else:
+      timestamps = pd.to_datetime(tail.index).to_numpy(dtype="datetime64[ns]")
+    for i, field in enumerate(PRICE_FIELDS):
+      self._write_block(self._values[i], tail[field].to_numpy(dtype=np.float64))
+    self._write_block(self._timestamps, timestamps)
+    self._count += len(tail)
+
+  def _write_block(self, target: np.ndarray, block: np.ndarray) -> None:
+    start = self._count % self.capacity
+    n = len(block)
+    first = min(n, self.capacity - start)
+    target[start:start + first] = block[:first]
+    target[start + self.capacity:start + self.capacity + first] = block[:first]
+    if n > first:
+      rest = n - first
+      target[:rest] = block[first:]
+      target[self.capacity:self.capacity + rest] = block[first:]
+
+  def column(self, name: str) -> np.ndarray:
+    """Zero-copy, read-only view of one column, oldest candle first."""
+    source = self._timestamps if name == "timestamp" else self._columns[name]
+    view = source[self._window()]
+    view.flags.writeable = False
+    return view
+
+  def view(self) -> Dict[str, np.ndarray]:
+    return {name: self.column(name) for name in ("timestamp", *PRICE_FIELDS)}
+
+  def last(self, name: str) -> float:
+    if self.empty:
+      raise IndexError("buffer is empty")
+    pos = (self._count - 1) % self.capacity
+    if name == "timestamp":
+      return self._timestamps[pos]
+    return float(self._columns[name][pos])
+
+  def latest(self) -> Dict[str, object]:
+    """The newest candle as a plain dict."""
+    pos = (self._count - 1) % self.capacity
+    candle: Dict[str, object] = {
+      "timestamp": pd.Timestamp(self._timestamps[pos]).to_pydatetime()
+    }
+    for name, column in self._columns.items():
+      candle[name] = float(column[pos])
+    return candle
+
+  def to_frame(self) -> pd.DataFrame:
+    """Copy the window into a DataFrame for vectorized ``evaluate`` calls."""
+    data = self.view()
+    return pd.DataFrame(data).set_index("timestamp")
+
+  def clear(self) -> None:
+    self._count = 0
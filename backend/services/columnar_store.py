@@ -0,0 +1,376 @@
+"""Columnar, memory-mapped OHLCV store partitioned by symbol and date.
+
+Layout::
+
+  {root}/{SYMBOL}/_manifest.json              partition list with row counts
+                                              and first/last timestamps
+  {root}/{SYMBOL}/{partition}/timestamp.npy   datetime64[ns], sorted, unique
+  {root}/{SYMBOL}/{partition}/open.npy, ...   float64, one file per column
+  {root}/{SYMBOL}/{partition}/_days.npy       epoch day of each day present
+  {root}/{SYMBOL}/{partition}/_day_offsets.npy  first row of each of those days
+
+A partition holds one calendar year (``"2024"``) or month (``"2024-03"``).
+Time ranges are resolved by ``TimeIndex``: the per-day offset tables pick
+the day, and a binary search over just that day's memory-mapped timestamps
+picks the row. Only the rows in the range are then read, so a time-range
+read costs O(window) no matter how long the history is.
+Timestamps are stored naive; timezone-aware input is converted to UTC.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .candle_buffer import PRICE_FIELDS
+
+COLUMNS = ("timestamp", *PRICE_FIELDS)
+PARTITION_UNITS = {"year": "Y", "month": "M"}
+MANIFEST = "_manifest.json"
+DAY_NS = 86_400 * 10**9
+
+TimeBound = Union[datetime, pd.Timestamp, np.datetime64, str, None]
+
+
+@dataclass
+class Partition:
+  key: str
+  rows: int
+  start: int  # first timestamp, epoch ns
+  end: int  # last timestamp, epoch ns
+
+
+@dataclass
+class TimeIndex:
+  """Row lookup tables for one symbol, over all partitions in order.
+
+  ``partition_starts`` holds the global first row of each partition plus
+  the total row count; ``days`` / ``day_starts`` hold every epoch day with
+  data and its global first row (again with the row count appended).
+  """
+
+  partition_keys: List[str]
+  partition_starts: np.ndarray
+  days: np.ndarray
+  day_starts: np.ndarray
+
+  @property
+  def rows(self) -> int:
+    return int(self.partition_starts[-1])
+
+  def partition_of(self, row: int) -> int:
+    return int(np.searchsorted(self.partition_starts, row, "right")) - 1
+
+
+def day_offsets(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  """Epoch days present in a sorted timestamp column and each day's first row."""
+  days = timestamps.view(np.int64) // DAY_NS
+  first = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.empty(0, np.int64)
+  return days[first], first
+
+
+def to_epoch_ns(value: TimeBound) -> Optional[int]:
+  if value is None:
+    return None
+  ts = pd.Timestamp(value)
+  if ts.tzinfo is not None:
+    ts = ts.tz_convert("UTC").tz_localize(None)
+  return int(ts.value)
+
+
+def _parse_timestamps(values) -> pd.DatetimeIndex:
+  parsed = pd.to_datetime(pd.Index(values))
+  if not isinstance(parsed, pd.DatetimeIndex):
+    # Mixed UTC offsets (e.g. across DST in a CSV) only parse as UTC
+    parsed = pd.to_datetime(pd.Index(values), utc=True)
+  return parsed
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+  """OHLCV frame indexed by naive, sorted, unique timestamps (last row wins)."""
+  values = df["timestamp"] if "timestamp" in df.columns else df.index
+  index = pd.DatetimeIndex(_parse_timestamps(values))
+  if index.tz is not None:
+    index = index.tz_convert("UTC").tz_localize(None)
+  frame = pd.DataFrame(
+    {field: df[field].to_numpy(dtype=np.float64) for field in PRICE_FIELDS},
+    index=index.rename("timestamp"),
+  )
+  frame = frame[~frame.index.duplicated(keep="last")]
+  return frame.sort_index()
+
+
+class ColumnarStore:
+  def __init__(self, root: Path, partition: str = "year"):
+    if partition not in PARTITION_UNITS:
+      raise ValueError(f"Unknown partition granularity: {partition}")
+    self.root = Path(root)
+    self.partition = partition
+    self._write_lock = threading.Lock()
+    # symbol -> (manifest stat, TimeIndex); rebuilt when the manifest changes
+    self._indexes: Dict[str, Tuple[Tuple[int, int], TimeIndex]] = {}
+
+  def _symbol_dir(self, symbol: str) -> Path:
+    return self.root / symbol.upper()
+
+  def symbols(self) -> List[str]:
+    if not self.root.exists():
+      return []
+    return sorted(path.name for path in self.root.iterdir() if (path / MANIFEST).exists())
+
+  def has(self, symbol: str) -> bool:
+    return (self._symbol_dir(symbol) / MANIFEST).exists()
+
+  def _manifest(self, symbol: str) -> Dict[str, object]:
+    path = self._symbol_dir(symbol) / MANIFEST
+    if not path.exists():
+      return {"partition": self.partition, "partitions": []}
+    return json.loads(path.read_text())
+
+  def partitions(self, symbol: str) -> List[Partition]:
+    return [Partition(**item) for item in self._manifest(symbol)["partitions"]]
+
+  def version(self, symbol: str) -> str:
+    """Changes whenever the symbol's stored data does (hash of the manifest)."""
+    path = self._symbol_dir(symbol) / MANIFEST
+    if not path.exists():
+      raise ValueError(f"No stored data for symbol {symbol.upper()}")
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:16]
+
+  def rows(self, symbol: str) -> int:
+    return sum(part.rows for part in self.partitions(symbol))
+
+  # -- writes ---------------------------------------------------------------
+
+  def write(self, symbol: str, df: pd.DataFrame) -> int:
+    """Upsert candles; rows with an existing timestamp are replaced.
+
+    Only the partitions the new rows fall into are rewritten, each one
+    atomically (written aside, then renamed into place).
+    """
+    frame = normalize_frame(df)
+    if frame.empty:
+      return 0
+    symbol = symbol.upper()
+    with self._write_lock:
+      manifest = self._manifest(symbol)
+      unit = PARTITION_UNITS[str(manifest["partition"])]
+      existing = {item["key"]: item for item in manifest["partitions"]}
+      keys = frame.index.to_numpy(dtype="datetime64[ns]").astype(f"datetime64[{unit}]").astype(str)
+      for key, chunk in frame.groupby(keys, sort=False):
+        if key in existing:
+          chunk = normalize_frame(pd.concat([self._read_partition(symbol, key), chunk]))
+        existing[key] = asdict(self._write_partition(symbol, key, chunk))
+      manifest["partitions"] = [existing[key] for key in sorted(existing)]
+      self._write_manifest(symbol, manifest)
+    return len(frame)
+
+  def _write_partition(self, symbol: str, key: str, frame: pd.DataFrame) -> Partition:
+    target = self._symbol_dir(symbol) / key
+    staging = target.with_name(f".{key}.tmp-{os.getpid()}-{threading.get_ident()}")
+    staging.mkdir(parents=True, exist_ok=True)
+    timestamps = frame.index.to_numpy(dtype="datetime64[ns]")
+    np.save(staging / "timestamp.npy", timestamps)
+    days, offsets = day_offsets(timestamps)
+    np.save(staging / "_days.npy", days)
+    np.save(staging / "_day_offsets.npy", offsets)
+    for field in PRICE_FIELDS:
+      np.save(staging / f"{field}.npy", frame[field].to_numpy(dtype=np.float64))
+
+    retired = target.with_name(f".{key}.old-{os.getpid()}-{threading.get_ident()}")
+    if target.exists():
+      # Open memory maps keep the old files readable until they are closed.
+      target.rename(retired)
+    staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+    return Partition(
+      key=key,
+      rows=len(frame),
+      start=int(timestamps[0].astype(np.int64)),
+      end=int(timestamps[-1].astype(np.int64)),
+    )
+
+  def _write_manifest(self, symbol: str, manifest: Dict[str, object]) -> None:
+    path = self._symbol_dir(symbol) / MANIFEST
+    staging = path.with_name(f".{MANIFEST}.tmp-{os.getpid()}-{threading.get_ident()}")
+    staging.write_text(json.dumps(manifest))
+    os.replace(staging, path)
+
+  def delete(self, symbol: str) -> None:
+    with self._write_lock:
+      shutil.rmtree(self._symbol_dir(symbol), ignore_errors=True)
+
+  # -- reads ----------------------------------------------------------------
+
+  def _load_column(self, symbol: str, key: str, column: str) -> np.ndarray:
+    return np.load(self._symbol_dir(symbol) / key / f"{column}.npy", mmap_mode="r")
+
+  def _read_partition(self, symbol: str, key: str) -> pd.DataFrame:
+    return pd.DataFrame(
+      {field: np.array(self._load_column(symbol, key, field)) for field in PRICE_FIELDS},
+      index=pd.DatetimeIndex(np.array(self._load_column(symbol, key, "timestamp"))),
+    )
+
+  def time_index(self, symbol: str) -> TimeIndex:
+    if not self.has(symbol):
+      raise ValueError(f"No stored data for symbol {symbol.upper()}")
+    symbol = symbol.upper()
+    stat = (self._symbol_dir(symbol) / MANIFEST).stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = self._indexes.get(symbol)
+    if cached is not None and cached[0] == version:
+      return cached[1]
+
+    parts = self.partitions(symbol)
+    starts = np.cumsum([0] + [part.rows for part in parts], dtype=np.int64)
+    days: List[np.ndarray] = []
+    day_starts: List[np.ndarray] = []
+    for part, start in zip(parts, starts):
+      part_dir = self._symbol_dir(symbol) / part.key
+      if (part_dir / "_days.npy").exists():
+        part_days = np.load(part_dir / "_days.npy")
+        offsets = np.load(part_dir / "_day_offsets.npy")
+      else:  # written before the offset tables existed
+        part_days, offsets = day_offsets(self._load_column(symbol, part.key, "timestamp"))
+      days.append(part_days)
+      day_starts.append(offsets + start)
+    index = TimeIndex(
+      partition_keys=[part.key for part in parts],
+      partition_starts=starts,
+      days=np.concatenate(days) if days else np.empty(0, np.int64),
+      day_starts=np.concatenate(day_starts + [starts[-1:]]),
+    )
+    self._indexes[symbol] = (version, index)
+    return index
+
+  def _bound(self, symbol: str, index: TimeIndex, ns: int, side: str) -> int:
+    """Global row where ``ns`` would be inserted (``side`` as in searchsorted)."""
+    day = ns // DAY_NS
+    d = int(np.searchsorted(index.days, day, "left"))
+    if d == len(index.days) or index.days[d] != day:
+      # No rows that day: every row of the next day present is later
+      return int(index.day_starts[d])
+    first, last = int(index.day_starts[d]), int(index.day_starts[d + 1])
+    p = index.partition_of(first)
+    base = int(index.partition_starts[p])
+    timestamps = self._load_column(symbol, index.partition_keys[p], "timestamp")
+    within = timestamps[first - base:last - base]
+    return first + int(np.searchsorted(within, np.datetime64(ns, "ns"), side))
+
+  def locate(self, symbol: str, start: TimeBound = None, end: TimeBound = None) -> Tuple[int, int]:
+    """Row range ``[first, last)`` of ``start <= timestamp <= end``."""
+    index = self.time_index(symbol)
+    lo, hi = to_epoch_ns(start), to_epoch_ns(end)
+    first = 0 if lo is None else self._bound(symbol, index, lo, "left")
+    last = index.rows if hi is None else self._bound(symbol, index, hi, "right")
+    return first, max(first, last)
+
+  def read_rows(
+    self,
+    symbol: str,
+    first: int,
+    last: int,
+    columns: Sequence[str] = COLUMNS,
+  ) -> Dict[str, np.ndarray]:
+    """Columns for global rows ``[first, last)``.
+
+    When the rows lie in a single partition the arrays are read-only slices
+    of the memory maps; otherwise the pieces are concatenated.
+    """
+    for column in columns:
+      if column not in COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    index = self.time_index(symbol)
+    pieces: Dict[str, List[np.ndarray]] = {column: [] for column in columns}
+    if first < last:
+      for p in range(index.partition_of(first), index.partition_of(last - 1) + 1):
+        base = int(index.partition_starts[p])
+        lo = max(first, base) - base
+        hi = min(last, int(index.partition_starts[p + 1])) - base
+        for column in columns:
+          pieces[column].append(self._load_column(symbol, index.partition_keys[p], column)[lo:hi])
+
+    arrays: Dict[str, np.ndarray] = {}
+    for column, chunks in pieces.items():
+      dtype = "datetime64[ns]" if column == "timestamp" else np.float64
+      if not chunks:
+        arrays[column] = np.empty(0, dtype=dtype)
+      elif len(chunks) == 1:
+        arrays[column] = chunks[0]
+      else:
+        arrays[column] = np.concatenate(chunks)
+    return arrays
+
+  def read_arrays(
+    self,
+    symbol: str,
+    start: TimeBound = None,
+    end: TimeBound = None,
+    columns: Sequence[str] = COLUMNS,
+  ) -> Dict[str, np.ndarray]:
+    """Columns for ``start <= timestamp <= end`` (both optional, inclusive)."""
+    first, last = self.locate(symbol, start, end)
+    return self.read_rows(symbol, first, last, columns)
+
+  def last_timestamp(self, symbol: str) -> pd.Timestamp:
+    parts = self.partitions(symbol)
+    if not parts:
+      raise ValueError(f"No stored data for symbol {symbol.upper()}")
+    return pd.Timestamp(parts[-1].end)
+
+  def read(
+    self,
+    symbol: str,
+    start: TimeBound = None,
+    end: TimeBound = None,
+  ) -> pd.DataFrame:
+    """OHLCV frame indexed by ``timestamp``, like ``MarketDataService`` frames."""
+    arrays = self.read_arrays(symbol, start, end)
+    index = pd.DatetimeIndex(arrays.pop("timestamp"), name="timestamp")
+    return pd.DataFrame({field: arrays[field] for field in PRICE_FIELDS}, index=index)
+
+
+# -- migration ----------------------------------------------------------------
+
+
+def import_csv_files(store: ColumnarStore, paths: Iterable[Path]) -> Dict[str, int]:
+  """Load ``{SYMBOL}.csv`` files (with a ``timestamp`` column) into the store."""
+  counts: Dict[str, int] = {}
+  for path in paths:
+    path = Path(path)
+    df = pd.read_csv(path, parse_dates=["timestamp"])
+    counts[path.stem.upper()] = store.write(path.stem, df)
+  return counts
+
+
+def import_sqlite(
+  store: ColumnarStore,
+  db_path: Path,
+  table: str = "market_data",
+) -> Dict[str, int]:
+  """Load the ``market_data`` table written by ``scripts/generate_sample_data.py``."""
+  if not table.isidentifier():
+    raise ValueError(f"Invalid table name: {table}")
+  counts: Dict[str, int] = {}
+  with sqlite3.connect(db_path) as conn:
+    symbols = [row[0] for row in conn.execute(f"SELECT DISTINCT symbol FROM {table}")]
+    for symbol in symbols:
+      df = pd.read_sql_query(
+        f"SELECT timestamp, open, high, low, close, volume FROM {table} "
+        "WHERE symbol = ? ORDER BY timestamp",
+        conn,
+        params=(symbol,),
+      )
+      df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="mixed")
+      counts[symbol.upper()] = counts.get(symbol.upper(), 0) + store.write(symbol, df)
+  return counts
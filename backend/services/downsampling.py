@@ -0,0 +1,87 @@
+"""Point selection for plotting long series at a bounded size.
+
+Both methods return sorted row positions, always including the first and
+last point, so every column of a curve can be sliced with the same indices.
+
+``lttb``
+  Largest-Triangle-Three-Buckets: one point per bucket, the one forming the
+  largest triangle with the previous pick and the next bucket's average.
+  Keeps the visual shape of the curve.
+``minmax``
+  The lowest and highest point of every bucket, so peaks and troughs (and
+  therefore drawdowns) survive exactly. Below 4 points there is no room
+  for a bucket's pair next to the end points, so it falls back to ``lttb``.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+  n = len(y)
+  if max_points >= n or max_points < 3:
+    return np.arange(n)
+  x = np.asarray(x, dtype=np.float64)
+  y = np.asarray(y, dtype=np.float64)
+  # Bounds of the max_points - 2 buckets between the fixed end points
+  edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+  selected = np.empty(max_points, dtype=np.int64)
+  selected[0], selected[-1] = 0, n - 1
+  previous = 0
+  for bucket in range(max_points - 2):
+    lo, hi = edges[bucket], edges[bucket + 1]
+    next_hi = edges[bucket + 2] if bucket + 2 < len(edges) else n
+    avg_x = x[hi:next_hi].mean()
+    avg_y = y[hi:next_hi].mean()
+    area = np.abs(
+      (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+      - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+    )
+    previous = lo + int(area.argmax())
+    selected[bucket + 1] = previous
+  return selected
+
+
+def min_max(y: np.ndarray, max_points: int) -> np.ndarray:
+  n = len(y)
+  if max_points >= n:
+    return np.arange(n)
+  if max_points < 4:
+    return lttb(np.arange(n), y, max_points)
+  y = np.asarray(y, dtype=np.float64)
+  buckets = (max_points - 2) // 2
+  edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+  bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+  # Sorted by bucket, then value: each bucket's first entry is its minimum
+  # and its last entry its maximum
+  order = np.lexsort((y, bucket_of))
+  picks = np.r_[0, order[edges[:-1]], order[edges[1:] - 1], n - 1]
+  return np.unique(picks)
+
+
+def check_method(method: str) -> str:
+  if method not in METHODS:
+    raise ValueError(f"Unknown downsampling method: {method}; expected one of {', '.join(METHODS)}")
+  return method
+
+
+def downsample(
+  y: np.ndarray,
+  max_points: Optional[int],
+  method: str = "lttb",
+  x: Optional[np.ndarray] = None,
+) -> np.ndarray:
+  """Row positions of at most ``max_points`` points of ``y`` (all rows when
+  ``max_points`` is None). ``x`` defaults to the row position."""
+  check_method(method)
+  if max_points is None:
+    return np.arange(len(y))
+  if max_points < 3:
+    raise ValueError("max_points must be at least 3")
+  if method == "minmax":
+    return min_max(y, max_points)
+  return lttb(np.arange(len(y)) if x is None else x, y, max_points)
@@ -0,0 +1,213 @@
+"""Event-driven backtest that trades like the live streaming path.
+
+``SymbolStream.tick`` takes each live candle through the strategy's
+``StrategyStream.update`` and ``PortfolioManager.apply_signal``. A replay
+makes the same trades: fixed ``trade_units`` per signal, partial position
+building, rejected orders when cash or shares run out. Commission and
+slippage default to ``backtest_settings`` in the sample config.
+
+``replay="stream"`` literally calls those two methods for every bar. That
+is the reference, but it is a per-bar Python loop. ``replay="fast"`` (the
+default) gets the same signals from the strategy's vectorized
+``evaluate_batch``; ``StrategyStream`` is specified to match ``evaluate``
+and both are checked by ``scripts/check_strategy_parity.py``. Only bars
+with a signal are visited in Python, where fills are settled with
+``PortfolioManager``'s own ``fill_terms``. Cash and position are then
+forward-filled across all bars. ``scripts/check_event_parity.py`` compares
+both replays with ``SymbolStream.tick`` trade for trade.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from .backtesting import PROGRESS_EVERY, BacktestEngine, BacktestResult, EquityCurve
+from .portfolio import SIGNAL_ACTIONS, PortfolioManager, fill_terms
+from .strategies import StrategyFactory
+
+logger = logging.getLogger(__name__)
+
+REPLAYS = ("fast", "stream")
+
+
+class CostModel:
+  """Commission as a fraction of trade value, slippage as a fraction of price."""
+
+  __slots__ = ("commission", "slippage")
+
+  def __init__(self, commission: float = 0.0, slippage: float = 0.0):
+    if commission < 0 or slippage < 0:
+      raise ValueError("commission and slippage must be non-negative")
+    self.commission = float(commission)
+    self.slippage = float(slippage)
+
+  @classmethod
+  def from_config(cls, path: Path = settings.sample_config_path) -> "CostModel":
+    try:
+      config = json.loads(Path(path).read_text())["backtest_settings"]
+    except (OSError, ValueError, KeyError) as exc:
+      logger.warning("No backtest_settings in %s, trading without costs: %s", path, exc)
+      return cls()
+    return cls(config.get("commission", 0.0), config.get("slippage", 0.0))
+
+  def to_dict(self) -> Dict[str, float]:
+    return {"commission": self.commission, "slippage": self.slippage}
+
+
+class BarEvent:
+  __slots__ = ("symbol", "timestamp", "open", "high", "low", "close", "volume")
+
+  def __init__(self, symbol: str, timestamp: datetime, open: float, high: float, low: float, close: float, volume: float):
+    self.symbol = symbol
+    self.timestamp = timestamp
+    self.open = open
+    self.high = high
+    self.low = low
+    self.close = close
+    self.volume = volume
+
+  def __getitem__(self, field: str) -> Any:
+    # Strategy streams read candles by key, as they get dicts live
+    return getattr(self, field)
+
+
+class FillEvent:
+  __slots__ = ("symbol", "timestamp", "side", "quantity", "price", "commission")
+
+  def __init__(self, symbol: str, timestamp: datetime, side: str, quantity: float, price: float, commission: float):
+    self.symbol = symbol
+    self.timestamp = timestamp
+    self.side = side
+    self.quantity = quantity
+    self.price = price
+    self.commission = commission
+
+  def to_trade(self) -> Dict[str, Any]:
+    """The trade dict shape ``BacktestEngine`` reports, plus the commission."""
+    return {
+      "timestamp": self.timestamp,
+      "type": self.side,
+      "price": self.price,
+      "quantity": self.quantity,
+      "value": self.quantity * self.price,
+      "commission": self.commission,
+    }
+
+
+class EventDrivenBacktestEngine(BacktestEngine):
+  def __init__(
+    self,
+    initial_cash: float = 100000.0,
+    costs: Optional[CostModel] = None,
+    trade_units: int = settings.default_units,
+    symbol: str = settings.default_symbol,
+    replay: str = "fast",
+  ):
+    if replay not in REPLAYS:
+      raise ValueError(f"Unknown replay: {replay}; expected one of {', '.join(REPLAYS)}")
+    super().__init__(initial_cash, vectorized=False)
+    self.costs = costs if costs is not None else CostModel.from_config()
+    self.trade_units = trade_units
+    self.symbol = symbol
+    self.replay = replay
+    self.fills: List[FillEvent] = []
+    self.portfolio = PortfolioManager(initial_cash, self.costs.commission, self.costs.slippage)
+
+  def run_backtest(self, data: pd.DataFrame, strategy_name: str, **strategy_params) -> BacktestResult:
+    self.reset()
+    index = pd.DatetimeIndex(data["timestamp"] if "timestamp" in data.columns else data.index)
+    if self.replay == "stream":
+      cash, position_value = self._replay_stream(data, index, strategy_name, strategy_params)
+    else:
+      cash, position_value = self._replay_fast(data, index, strategy_name, strategy_params)
+    self.trades = [fill.to_trade() for fill in self.fills]
+    self.equity = cash + position_value
+    self.equity_curve = EquityCurve(index, self.equity, cash, position_value)
+    return self._calculate_metrics(data)
+
+  def _replay_stream(
+    self, data: pd.DataFrame, index: pd.DatetimeIndex, strategy_name: str, strategy_params: Dict[str, Any]
+  ):
+    """Reference replay: every bar through ``StrategyStream.update`` and
+    ``PortfolioManager.apply_signal``"""
+    stream = StrategyFactory.create(strategy_name, strategy_params).stream()
+    portfolio, symbol, units = self.portfolio, self.symbol, self.trade_units
+
+    timestamps = index.to_pydatetime()
+    columns = [data[field].to_numpy(dtype=float).tolist() for field in ("open", "high", "low", "close", "volume")]
+    cash = np.empty(len(data))
+    position_value = np.empty(len(data))
+
+    for bar, (timestamp, open_, high, low, close, volume) in enumerate(zip(timestamps, *columns)):
+      if bar % PROGRESS_EVERY == 0:
+        self._report(bar / len(data))
+      event = BarEvent(symbol, timestamp, open_, high, low, close, volume)
+      signal = stream.update(event)["signal"]
+      trade = portfolio.apply_signal(symbol, signal, units, close, timestamp)
+      if trade is not None:
+        self.fills.append(
+          FillEvent(symbol, timestamp, trade.action, trade.quantity, trade.price, trade.commission)
+        )
+      position = portfolio.positions.get(symbol)
+      cash[bar] = portfolio.cash
+      position_value[bar] = position.quantity * close if position is not None else 0.0
+
+    self.cash = portfolio.cash
+    return cash, position_value
+
+  def _replay_fast(
+    self, data: pd.DataFrame, index: pd.DatetimeIndex, strategy_name: str, strategy_params: Dict[str, Any]
+  ):
+    """Vectorized signals, Python only on signal bars, state forward-filled"""
+    signal = StrategyFactory.get(strategy_name).evaluate_batch(data, [strategy_params])[0]
+    self._report(0.0)
+    close = data["close"].to_numpy(dtype=float)
+    commission, slippage = self.costs.commission, self.costs.slippage
+    # Positions hold float quantities, as the pydantic Position does live
+    units = float(self.trade_units)
+    cash, position = self.initial_cash, 0.0
+
+    fill_bars: List[int] = []
+    cash_levels: List[float] = []
+    position_levels: List[float] = []
+    for fill_index, bar in enumerate(np.flatnonzero(signal).tolist()):
+      if fill_index % PROGRESS_EVERY == 0:
+        self._report(bar / len(close))
+      action = SIGNAL_ACTIONS[int(signal[bar])]
+      price, trade_value, fee = fill_terms(action, units, float(close[bar]), commission, slippage)
+      # Same acceptance rules as PortfolioManager.execute_trade
+      if action == "BUY":
+        if cash < trade_value + fee:
+          continue
+        cash -= trade_value + fee
+        position += units
+      else:
+        if position < units:
+          continue
+        cash += trade_value - fee
+        position -= units
+      self.fills.append(
+        FillEvent(self.symbol, index[bar].to_pydatetime(), action, units, price, fee)
+      )
+      fill_bars.append(bar)
+      cash_levels.append(cash)
+      position_levels.append(position)
+
+    # State after the most recent fill at or before each bar
+    level = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(len(close)), side="right")
+    cash_by_bar = np.r_[self.initial_cash, cash_levels][level]
+    position_value = np.r_[0.0, position_levels][level] * close
+    self.cash = cash
+    return cash_by_bar, position_value
+
+  def reset(self):
+    super().reset()
+    self.fills = []
+    self.portfolio.reset()
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+from fastapi import WebSocket
+
+from .wire_format import encode
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class _Pending:
+  __slots__ = ("payload", "key", "delta_symbol", "complete")
+
+  def __init__(
+    self,
+    payload: Any,
+    key: Optional[Hashable],
+    delta_symbol: Optional[str] = None,
+    complete: bool = False,
+  ):
+    self.payload = payload
+    self.key = key
+    self.delta_symbol = delta_symbol
+    # Encodes the full snapshot (see ``fan_out``), not a slimmed message
+    self.complete = complete
+
+
+def merge_market(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+  """Fold a newer market message into a pending one.
+
+  A full ``market_data`` update replaces whatever is pending; a
+  ``market_delta`` overrides the candle and merges signal/portfolio fields,
+  keeping the pending message's type (full + delta is still full).
+  """
+  if update["type"] == "market_data":
+    return update
+  merged = dict(base)
+  merged["candle"] = update["candle"]
+  for field in ("signals", "portfolio"):
+    if field in update:
+      merged[field] = {**base.get(field, {}), **update[field]}
+  return merged
+
+
+class ClientConnection:
+  """Bounded outbound queue plus a writer task for one WebSocket.
+
+  Producers call ``enqueue`` with an already-serialized payload, which never
+  awaits the socket, so a slow client only ever fills its own queue. When
+  the queue is full the slow-consumer policy decides what happens:
+
+  * ``drop_oldest`` discards the oldest pending frame;
+  * ``coalesce`` replaces a pending frame that has the same coalesce key
+    (e.g. the previous candle for a symbol; a replaced full snapshot is
+    only ever replaced by another, see ``fan_out``) and otherwise drops
+    the oldest;
+  * ``disconnect`` closes the connection.
+
+  Market data can additionally be thinned per client with ``configure``:
+  ``delta`` sends ``market_delta`` messages holding only changed fields
+  (after one full ``market_data`` per symbol), and ``max_rate`` caps
+  updates per symbol per second, merging the ticks in between on the
+  server. Those clients get per-connection frames; everyone else shares the
+  frames encoded once in ``fan_out``.
+  """
+
+  def __init__(
+    self,
+    websocket: WebSocket,
+    max_queue: int = 256,
+    policy: str = "coalesce",
+    on_close: Optional[Callable[[WebSocket], None]] = None,
+    encoding: str = "json",
+  ):
+    if policy not in SLOW_CONSUMER_POLICIES:
+      raise ValueError(f"Unknown slow consumer policy: {policy}")
+    self.websocket = websocket
+    self.max_queue = max_queue
+    self.policy = policy
+    self.on_close = on_close
+    self.encoding = encoding
+    self.dropped = 0
+    self.closed = False
+    self._queue: Deque[_Pending] = deque()
+    self._by_key: Dict[Hashable, _Pending] = {}
+    self._ready = asyncio.Event()
+    self._writer: Optional[asyncio.Task] = None
+    self.delta = False
+    self.max_rate: Optional[float] = None
+    self._market: Dict[str, Dict[str, Any]] = {}
+    self._primed: Set[str] = set()
+    self._last_flush: Dict[str, float] = {}
+    self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+
+  def configure(self, delta: Optional[bool] = None, max_rate: Optional[float] = None) -> None:
+    if delta is not None:
+      self.delta = bool(delta)
+      self._primed.clear()
+    if max_rate is not None:
+      if max_rate < 0:
+        raise ValueError("max_rate must be >= 0")
+      self.max_rate = float(max_rate) or None
+
+  @property
+  def shares_market_frames(self) -> bool:
+    """True when market data can use the shared, encode-once frames."""
+    return not self.delta and not self.max_rate
+
+  def start(self) -> None:
+    self._writer = asyncio.create_task(self._write_loop())
+
+  @property
+  def pending(self) -> int:
+    return len(self._queue)
+
+  def pending_complete(self, key: Hashable) -> bool:
+    """True when a frame queued under ``key`` would be coalesced away and it
+    carries the full snapshot, so its replacement must carry one too."""
+    if self.policy != "coalesce":
+      return False
+    existing = self._by_key.get(key)
+    return existing is not None and existing.complete
+
+  def enqueue(
+    self,
+    payload: Any,
+    key: Optional[Hashable] = None,
+    delta_symbol: Optional[str] = None,
+    complete: bool = False,
+  ) -> bool:
+    """Queue a serialized frame; returns False if it was not accepted."""
+    if self.closed:
+      return False
+
+    if self.policy == "coalesce" and key is not None:
+      existing = self._by_key.get(key)
+      if existing is not None:
+        existing.payload = payload
+        existing.complete = complete
+        self.dropped += 1
+        return True
+
+    if len(self._queue) >= self.max_queue:
+      if self.policy == "disconnect":
+        logger.warning("Disconnecting slow WebSocket client (%d frames pending)", len(self._queue))
+        self.close()
+        asyncio.ensure_future(self._close_socket())
+        return False
+      dropped = self._pop_oldest()
+      self.dropped += 1
+      if dropped.delta_symbol is not None:
+        # The client missed a delta, so resend full state next time
+        self._primed.discard(dropped.delta_symbol)
+
+    entry = _Pending(payload, key, delta_symbol, complete)
+    self._queue.append(entry)
+    if key is not None and self.policy == "coalesce":
+      self._by_key[key] = entry
+    self._ready.set()
+    return True
+
+  def offer_market(
+    self,
+    symbol: str,
+    full: Dict[str, Any],
+    delta: Dict[str, Any],
+    frames: Optional[Dict[Any, Any]] = None,
+  ) -> None:
+    """Merge a market update into this client's pending state and flush it
+    now or when its ``max_rate`` allows."""
+    if self.closed:
+      return
+    update = delta if self.delta and symbol in self._primed else full
+    pending = self._market.get(symbol)
+    self._market[symbol] = update if pending is None else merge_market(pending, update)
+
+    if not self.max_rate:
+      self._flush(symbol, frames)
+      return
+    loop = asyncio.get_running_loop()
+    due = self._last_flush.get(symbol, float("-inf")) + 1.0 / self.max_rate
+    if loop.time() >= due:
+      self._flush(symbol, frames)
+    elif symbol not in self._flush_handles:
+      self._flush_handles[symbol] = loop.call_at(due, self._flush, symbol)
+
+  def _flush(self, symbol: str, frames: Optional[Dict[Any, Any]] = None) -> None:
+    self._flush_handles.pop(symbol, None)
+    message = self._market.pop(symbol, None)
+    if message is None or self.closed:
+      return
+    self._last_flush[symbol] = asyncio.get_running_loop().time()
+
+    # Unmerged messages are the shared objects, so their frames can be shared
+    # too; the cache keeps each message alive so its id cannot be reused.
+    cache_key = (id(message), self.encoding)
+    cached = frames.get(cache_key) if frames is not None else None
+    if cached is not None and cached[0] is message:
+      frame = cached[1]
+    else:
+      frame = encode(message, self.encoding)
+      if frames is not None:
+        frames[cache_key] = (message, frame)
+
+    is_delta = message["type"] == "market_delta"
+    if self.enqueue(frame, delta_symbol=symbol if is_delta else None) and not is_delta:
+      self._primed.add(symbol)
+
+  def _pop_oldest(self) -> _Pending:
+    entry = self._queue.popleft()
+    if entry.key is not None and self._by_key.get(entry.key) is entry:
+      del self._by_key[entry.key]
+    return entry
+
+  async def _write_loop(self) -> None:
+    try:
+      while True:
+        await self._ready.wait()
+        while self._queue:
+          payload = self._pop_oldest().payload
+          if isinstance(payload, bytes):
+            await self.websocket.send_bytes(payload)
+          else:
+            await self.websocket.send_text(payload)
+        self._ready.clear()
+    except asyncio.CancelledError:
+      raise
+    except Exception:  # noqa: BLE001 - any send failure means the client is gone
+      self.close()
+
+  def close(self) -> None:
+    if self.closed:
+      return
+    self.closed = True
+    self._queue.clear()
+    self._by_key.clear()
+    self._market.clear()
+    for handle in self._flush_handles.values():
+      handle.cancel()
+    self._flush_handles.clear()
+    if self._writer is not None and self._writer is not asyncio.current_task():
+      self._writer.cancel()
+    if self.on_close is not None:
+      self.on_close(self.websocket)
+
+  async def _close_socket(self) -> None:
+    try:
+      await self.websocket.close(code=1013)  # try again later
+    except Exception:  # noqa: BLE001 - socket may already be gone
+      pass
+
+
+def fan_out(
+  connections: List[ClientConnection],
+  message: Dict[str, Any],
+  key: Optional[Hashable] = None,
+  full: Optional[Dict[str, Any]] = None,
+) -> int:
+  """Encode ``message`` once per wire encoding and share each frame by reference.
+
+  ``full`` is the complete snapshot that ``message`` may be a slimmed form
+  of (market data leaves out an unchanged portfolio). A connection about to
+  coalesce over a queued complete frame gets ``full`` instead, so fields
+  that only the replaced frame carried still reach the client.
+
+  Returns how many connections accepted the frame.
+  """
+  frames: Dict[Any, Any] = {}
+  accepted = 0
+  for connection in connections:
+    source = message
+    if full is not None and key is not None and connection.pending_complete(key):
+      source = full
+    cache_key = (source is full, connection.encoding)
+    frame = frames.get(cache_key)
+    if frame is None:
+      frame = frames[cache_key] = encode(source, connection.encoding)
+    if connection.enqueue(frame, key, complete=full is not None and source is full):
+      accepted += 1
+  return accepted
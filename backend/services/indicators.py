@@ -0,0 +1,292 @@
+"""Technical indicators shared by the strategies.
+
+The classes are incremental: each keeps just enough running state to fold
+in one new value in constant time, and reproduces the matching pandas
+expression used by the vectorized strategy ``evaluate`` paths. The
+``*_matrix`` functions at the bottom compute many window/span variants of
+one series at once as 2-D arrays for batched strategy evaluation.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+class RollingSum:
+  """Fixed-window running sum with Kahan compensation to limit drift.
+
+  Like pandas' ``roll_mean`` it reports the repeated value exactly when the
+  whole window holds one value, so flat stretches never pick up residue.
+  """
+
+  __slots__ = (
+    "window",
+    "_values",
+    "_sum",
+    "_comp",
+    "_nan_count",
+    "_same_value",
+    "_same_count",
+  )
+
+  def __init__(self, window: int):
+    if window < 1:
+      raise ValueError("window must be >= 1")
+    self.window = window
+    self._values: Deque[float] = deque()
+    self._sum = 0.0
+    self._comp = 0.0
+    self._nan_count = 0
+    self._same_value = NAN
+    self._same_count = 0
+
+  def _add(self, value: float) -> None:
+    y = value - self._comp
+    t = self._sum + y
+    self._comp = (t - self._sum) - y
+    self._sum = t
+
+  def update(self, value: float) -> None:
+    self._values.append(value)
+    if value == self._same_value:
+      self._same_count += 1
+    else:
+      self._same_value = value
+      self._same_count = 1
+    if math.isnan(value):
+      self._nan_count += 1
+    else:
+      self._add(value)
+    if len(self._values) > self.window:
+      old = self._values.popleft()
+      if math.isnan(old):
+        self._nan_count -= 1
+      else:
+        self._add(-old)
+
+  @property
+  def ready(self) -> bool:
+    return len(self._values) == self.window and self._nan_count == 0
+
+  @property
+  def total(self) -> float:
+    return self._sum
+
+  @property
+  def mean(self) -> float:
+    if not self.ready:
+      return NAN
+    if self._same_count >= self.window:
+      return self._same_value
+    return self._sum / self.window
+
+
+class Sma:
+  """Equivalent to ``series.rolling(window).mean()``."""
+
+  __slots__ = ("window", "_sum", "value")
+
+  def __init__(self, window: int):
+    self.window = int(window)
+    self._sum = RollingSum(self.window)
+    self.value = NAN
+
+  def update(self, value: float) -> float:
+    self._sum.update(value)
+    self.value = self._sum.mean
+    return self.value
+
+
+class Ema:
+  """Equivalent to ``series.ewm(span=span, adjust=False).mean()``."""
+
+  __slots__ = ("span", "alpha", "value")
+
+  def __init__(self, span: int):
+    self.span = int(span)
+    self.alpha = 2.0 / (self.span + 1.0)
+    self.value = NAN
+
+  def update(self, value: float) -> float:
+    if math.isnan(value):
+      return self.value
+    if math.isnan(self.value):
+      self.value = value
+    else:
+      self.value = self.value + self.alpha * (value - self.value)
+    return self.value
+
+
+class Rsi:
+  """Relative strength index over close-to-close changes.
+
+  ``method="simple"`` matches the rolling-mean RSI used by
+  ``RsiMomentumStrategy`` (including the forward fill applied when the
+  average loss is zero); ``method="wilder"`` uses Wilder's smoothing seeded
+  with the simple average of the first ``period`` changes.
+  """
+
+  __slots__ = (
+    "period",
+    "method",
+    "_prev",
+    "_gains",
+    "_losses",
+    "_count",
+    "_avg_gain",
+    "_avg_loss",
+    "value",
+  )
+
+  def __init__(self, period: int, method: str = "simple"):
+    if method not in ("simple", "wilder"):
+      raise ValueError(f"Unknown RSI method: {method}")
+    self.period = int(period)
+    self.method = method
+    self._prev: Optional[float] = None
+    self._gains = RollingSum(self.period)
+    self._losses = RollingSum(self.period)
+    self._count = 0
+    self._avg_gain = NAN
+    self._avg_loss = NAN
+    self.value = NAN
+
+  def update(self, close: float) -> float:
+    prev, self._prev = self._prev, close
+    if prev is None:
+      return self.value
+
+    delta = close - prev
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+    self._count += 1
+
+    if self.method == "simple":
+      self._gains.update(gain)
+      self._losses.update(loss)
+      if not self._gains.ready:
+        return self.value
+      avg_gain = self._gains.mean
+      avg_loss = self._losses.mean
+    else:
+      if self._count <= self.period:
+        self._gains.update(gain)
+        self._losses.update(loss)
+        if self._count < self.period:
+          return self.value
+        self._avg_gain = self._gains.mean
+        self._avg_loss = self._losses.mean
+      else:
+        self._avg_gain += (gain - self._avg_gain) / self.period
+        self._avg_loss += (loss - self._avg_loss) / self.period
+      avg_gain, avg_loss = self._avg_gain, self._avg_loss
+
+    if avg_loss != 0:
+      self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+    return self.value
+
+
+class Bollinger:
+  """Rolling mean and sample standard deviation (``ddof=1``) of a window.
+
+  Uses the same add/remove Welford updates as pandas' ``roll_var``.
+  """
+
+  __slots__ = ("window", "num_std", "_values", "_mean", "_ssqdm", "mean", "std")
+
+  def __init__(self, window: int, num_std: float = 2.0):
+    self.window = int(window)
+    self.num_std = float(num_std)
+    self._values: Deque[float] = deque()
+    self._mean = 0.0
+    self._ssqdm = 0.0
+    self.mean = NAN
+    self.std = NAN
+
+  def update(self, value: float) -> float:
+    self._values.append(value)
+    n = len(self._values)
+    delta = value - self._mean
+    self._mean += delta / n
+    self._ssqdm += delta * (value - self._mean)
+
+    if n > self.window:
+      old = self._values.popleft()
+      n -= 1
+      delta = old - self._mean
+      self._mean -= delta / n
+      self._ssqdm -= delta * (old - self._mean)
+
+    if n < self.window:
+      self.mean = self.std = NAN
+      return self.mean
+
+    self.mean = self._mean
+    if n < 2:
+      self.std = NAN
+    else:
+      self.std = math.sqrt(max(self._ssqdm, 0.0) / (n - 1))
+    return self.mean
+
+  @property
+  def upper(self) -> float:
+    return self.mean + self.num_std * self.std
+
+  @property
+  def lower(self) -> float:
+    return self.mean - self.num_std * self.std
+
+
+def rolling_mean_matrix(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+  """``rolling(w).mean()`` of ``values`` for each window, shape ``(len(windows), n)``.
+
+  Each row comes from pandas' own rolling kernel over one shared Series. It
+  keeps a compensated running sum, which plain prefix-sum differences only
+  approximate, so rows are bit-identical to the per-strategy ``evaluate``.
+  """
+  series = pd.Series(np.asarray(values, dtype=np.float64))
+  out = np.full((len(windows), len(series)), np.nan)
+  for row, window in enumerate(windows):
+    out[row] = series.rolling(int(window)).mean().to_numpy()
+  return out
+
+
+def ema_matrix(values: np.ndarray, spans: Sequence[int]) -> np.ndarray:
+  """``ewm(span, adjust=False).mean()`` of ``values`` for each span."""
+  series = pd.Series(np.asarray(values, dtype=np.float64))
+  return np.vstack(
+    [series.ewm(span=int(span), adjust=False).mean().to_numpy() for span in spans]
+  ) if len(spans) else np.empty((0, len(series)))
+
+
+def ffill_matrix(matrix: np.ndarray) -> np.ndarray:
+  """Forward-fill NaNs along each row."""
+  valid = ~np.isnan(matrix)
+  index = np.where(valid, np.arange(matrix.shape[1]), 0)
+  np.maximum.accumulate(index, axis=1, out=index)
+  filled = np.take_along_axis(matrix, index, axis=1)
+  # Leading NaNs have nothing to fill from
+  filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+  return filled
+
+
+def rsi_matrix(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+  """Simple (rolling-mean) RSI for each period, forward-filled like
+  ``RsiMomentumStrategy``. Price changes and gains/losses are shared."""
+  # Same expressions as ``RsiMomentumStrategy.evaluate`` (down to the -0.0
+  # losses of rising bars), so the rolling sums match bit for bit
+  delta = pd.Series(np.asarray(close, dtype=np.float64)).diff()
+  gain = delta.clip(lower=0).to_numpy()
+  loss = (-delta.clip(upper=0)).to_numpy()
+  avg_gain = rolling_mean_matrix(gain, periods)
+  avg_loss = rolling_mean_matrix(loss, periods)
+  avg_loss[avg_loss == 0] = np.nan
+  with np.errstate(divide="ignore", invalid="ignore"):
+    rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+  return ffill_matrix(rsi)
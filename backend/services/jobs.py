@@ -0,0 +1,427 @@
+"""Background backtest and sweep jobs.
+
+Jobs run on a bounded pool of worker processes, so long runs never hold up
+the event loop or the live streams. A job function receives a
+``JobContext`` to report progress (plus optional partial results) and to
+check for cancellation; the manager forwards every update to a callback
+on the event loop (``/ws`` publishes them as ``job`` messages).
+
+Each job is recorded in SQLite when it is submitted and again when it
+finishes, with its request and final result, so finished jobs outlive a
+restart. Jobs still queued or running when the server stopped are marked
+failed on the next start.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from ..config import settings
+from .backtest_cache import create_engine, normalize_params
+from .optimization import _chunks, _run_chunk, check_grid, rank_rows
+from .wire_format import json_bytes
+
+KINDS = ("backtest", "sweep")
+STATES = ("queued", "running", "completed", "failed", "cancelled")
+ACTIVE_STATES = ("queued", "running")
+# Minimum seconds between progress messages from one job
+PROGRESS_INTERVAL = 0.25
+# Rows shown as a running sweep's partial result
+PARTIAL_ROWS = 10
+
+
+class JobCancelled(Exception):
+  """Raised inside a job function once its job has been cancelled."""
+
+
+class JobContext:
+  """Worker-side handle of one job: progress reports and cancellation checks."""
+
+  def __init__(self, job_id: str, updates: Any, cancelled: Any):
+    self.job_id = job_id
+    self._updates = updates
+    self._cancelled = cancelled
+    self._last_report = 0.0
+
+  def progress(self, fraction: float, partial: Any = None, force: bool = False) -> None:
+    """Report ``fraction`` done (0-1); throttled to one message per
+    ``PROGRESS_INTERVAL`` unless ``force`` or finished."""
+    now = time.monotonic()
+    if force or fraction >= 1 or now - self._last_report >= PROGRESS_INTERVAL:
+      self._last_report = now
+      self._updates.put((self.job_id, float(fraction), partial))
+
+  def check(self) -> None:
+    """Raise ``JobCancelled`` if the job was cancelled."""
+    if self.job_id in self._cancelled:
+      raise JobCancelled(self.job_id)
+
+  def checkpoint(self, fraction: float) -> None:
+    """``check`` then ``progress``; fits a backtest engine's progress hook."""
+    self.check()
+    self.progress(fraction)
+
+
+def run_backtest_job(
+  ctx: JobContext,
+  data: pd.DataFrame,
+  strategy_name: str,
+  params: Dict[str, float],
+  initial_cash: float,
+  engine: str = "vectorized",
+  trade_units: int = settings.default_units,
+):
+  backtester = create_engine(engine, initial_cash, trade_units)
+  # Lets a cancel stop the run between chunks of simulated bars
+  backtester.progress = ctx.checkpoint
+  result = backtester.run_backtest(data, strategy_name, **normalize_params(strategy_name, params))
+  ctx.progress(1.0)
+  return result
+
+
+def run_sweep_job(
+  ctx: JobContext,
+  data: pd.DataFrame,
+  strategy_name: str,
+  grid: Dict[str, Any],
+  initial_cash: float,
+  rank_by: str = "total_return",
+  top_n: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+  """``run_sweep`` in one worker, a chunk at a time, with the best rows so
+  far as the partial result."""
+  param_sets = check_grid(strategy_name, grid, rank_by)
+  rows: List[Dict[str, Any]] = []
+  for chunk in _chunks(param_sets, max(1, len(param_sets) // 50)):
+    ctx.check()
+    rows.extend(_run_chunk(strategy_name, initial_cash, chunk, data))
+    ctx.progress(len(rows) / len(param_sets), partial=rank_rows(rows, rank_by, PARTIAL_ROWS))
+  return rank_rows(rows, rank_by, top_n)
+
+
+def _execute(ctx: JobContext, function: Callable[..., Any], args: tuple) -> Any:
+  ctx.check()
+  ctx.progress(0.0, force=True)  # marks the job as running
+  return function(ctx, *args)
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+  return None if value is None else datetime.fromtimestamp(value, timezone.utc)
+
+
+@dataclass
+class Job:
+  id: str
+  kind: str
+  symbol: str
+  request: Dict[str, Any]
+  status: str = "queued"
+  progress: float = 0.0
+  created_at: float = field(default_factory=time.time)
+  started_at: Optional[float] = None
+  finished_at: Optional[float] = None
+  partial: Any = None
+  result: Optional[Dict[str, Any]] = None
+  error: Optional[str] = None
+
+  @property
+  def finished(self) -> bool:
+    return self.status not in ACTIVE_STATES
+
+  def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+    info = {
+      "id": self.id,
+      "kind": self.kind,
+      "symbol": self.symbol,
+      "status": self.status,
+      "progress": self.progress,
+      "created_at": _timestamp(self.created_at),
+      "started_at": _timestamp(self.started_at),
+      "finished_at": _timestamp(self.finished_at),
+      "error": self.error,
+      "partial": self.partial,
+    }
+    if include_result:
+      info["request"] = self.request
+      info["result"] = self.result
+    return info
+
+
+class JobStore:
+  """SQLite table of jobs: written on submit and on completion."""
+
+  COLUMNS = (
+    "id", "kind", "symbol", "status", "progress", "created_at", "started_at",
+    "finished_at", "request", "result", "error",
+  )
+
+  def __init__(self, path: Path):
+    self.path = Path(path)
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._lock = threading.Lock()
+    with self._lock, self._connect() as conn:
+      conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+          id TEXT PRIMARY KEY,
+          kind TEXT NOT NULL,
+          symbol TEXT NOT NULL,
+          status TEXT NOT NULL,
+          progress REAL NOT NULL,
+          created_at REAL NOT NULL,
+          started_at REAL,
+          finished_at REAL,
+          request TEXT NOT NULL,
+          result TEXT,
+          error TEXT
+        )
+        """
+      )
+      conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at)")
+
+  def _connect(self) -> sqlite3.Connection:
+    return sqlite3.connect(self.path, timeout=30)
+
+  def save(self, job: Job) -> None:
+    row = (
+      job.id, job.kind, job.symbol, job.status, job.progress, job.created_at, job.started_at,
+      job.finished_at, json_bytes(job.request).decode(),
+      None if job.result is None else json_bytes(job.result).decode(), job.error,
+    )
+    with self._lock, self._connect() as conn:
+      conn.execute(f"INSERT OR REPLACE INTO jobs VALUES ({', '.join('?' * len(row))})", row)
+
+  def _job(self, row: tuple) -> Job:
+    values = dict(zip(self.COLUMNS, row))
+    values["request"] = json.loads(values["request"])
+    if values["result"] is not None:
+      values["result"] = json.loads(values["result"])
+    return Job(**values)
+
+  def get(self, job_id: str) -> Optional[Job]:
+    with self._lock, self._connect() as conn:
+      row = conn.execute(
+        f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+      ).fetchone()
+    return None if row is None else self._job(row)
+
+  def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    # The result column can be large; listings leave it out
+    columns = ", ".join("NULL" if name == "result" else name for name in self.COLUMNS)
+    query = f"SELECT {columns} FROM jobs"
+    params: tuple = ()
+    if status is not None:
+      query += " WHERE status = ?"
+      params = (status,)
+    query += " ORDER BY created_at DESC LIMIT ?"
+    with self._lock, self._connect() as conn:
+      rows = conn.execute(query, params + (limit,)).fetchall()
+    return [self._job(row) for row in rows]
+
+  def fail_interrupted(self) -> int:
+    """Mark jobs left queued or running by a previous process as failed."""
+    with self._lock, self._connect() as conn:
+      cursor = conn.execute(
+        "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? "
+        "WHERE status IN ('queued', 'running')",
+        (time.time(), "Interrupted by a server restart"),
+      )
+      return cursor.rowcount
+
+
+class JobManager:
+  """Queue of background jobs on a bounded process pool.
+
+  ``submit`` returns at once with a queued ``Job``; ``finalize`` turns the
+  worker's return value into the JSON-ready result that is stored and
+  served. Updates go to ``on_update`` on the loop passed to ``start``.
+  """
+
+  def __init__(
+    self,
+    max_workers: int = settings.job_max_workers,
+    max_pending: int = settings.job_max_pending,
+    path: Optional[Path] = settings.job_store_path,
+  ):
+    self.max_workers = max_workers
+    self.max_pending = max_pending
+    self.store = JobStore(path or settings.data_dir / "jobs.db")
+    self.store.fail_interrupted()
+    self._jobs: Dict[str, Job] = {}  # unfinished jobs only
+    self._futures: Dict[str, Future] = {}
+    self._lock = threading.Lock()
+    self._pool: Optional[ProcessPoolExecutor] = None
+    self._manager = None
+    self._updates = None
+    self._cancelled = None
+    self._listener: Optional[threading.Thread] = None
+    self._stopping = False
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._on_update: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+
+  def start(
+    self,
+    loop: asyncio.AbstractEventLoop,
+    on_update: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+  ) -> None:
+    self._loop = loop
+    self._on_update = on_update
+
+  def _ensure_pool(self) -> None:
+    if self._pool is not None:
+      return
+    # Manager proxies can be pickled into tasks, unlike plain queues
+    self._manager = multiprocessing.Manager()
+    self._updates = self._manager.Queue()
+    self._cancelled = self._manager.dict()
+    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+    self._listener = threading.Thread(target=self._listen, name="job-updates", daemon=True)
+    self._listener.start()
+
+  def submit(
+    self,
+    kind: str,
+    symbol: str,
+    request: Dict[str, Any],
+    function: Callable[..., Any],
+    args: tuple,
+    finalize: Callable[[Any], Dict[str, Any]],
+  ) -> Job:
+    """Queue ``function(ctx, *args)``; raises RuntimeError when the queue is full."""
+    if kind not in KINDS:
+      raise ValueError(f"Unknown job kind: {kind}; expected one of {', '.join(KINDS)}")
+    with self._lock:
+      if len(self._jobs) >= self.max_pending:
+        raise RuntimeError(f"Job queue is full ({self.max_pending} unfinished jobs)")
+      self._ensure_pool()
+      job = Job(id=uuid.uuid4().hex, kind=kind, symbol=symbol.upper(), request=request)
+      self._jobs[job.id] = job
+      self.store.save(job)
+      ctx = JobContext(job.id, self._updates, self._cancelled)
+      future = self._pool.submit(_execute, ctx, function, args)
+      self._futures[job.id] = future
+    future.add_done_callback(lambda done: self._finish(job, done, finalize))
+    self._publish(job)
+    return job
+
+  def _listen(self) -> None:
+    while True:
+      update = self._updates.get()
+      if update is None:
+        return
+      job_id, fraction, partial = update
+      with self._lock:
+        job = self._jobs.get(job_id)
+        # Updates can trail the job's completion; those are dropped
+        if job is None or job.finished:
+          continue
+        if job.status == "queued":
+          job.status = "running"
+          job.started_at = time.time()
+        job.progress = fraction
+        if partial is not None:
+          job.partial = partial
+      self._publish(job)
+
+  def _finish(self, job: Job, future: Future, finalize: Callable[[Any], Dict[str, Any]]) -> None:
+    if self._stopping:
+      # Left queued/running in the store; the next start marks it failed
+      return
+    if future.cancelled():
+      status, result, error = "cancelled", None, None
+    elif isinstance(future.exception(), JobCancelled):
+      status, result, error = "cancelled", None, None
+    elif future.exception() is not None:
+      status, result, error = "failed", None, str(future.exception()) or type(future.exception()).__name__
+    else:
+      try:
+        status, result, error = "completed", finalize(future.result()), None
+      except Exception as exc:
+        status, result, error = "failed", None, str(exc)
+
+    with self._lock:
+      job.status = status
+      job.result = result
+      job.error = error
+      job.finished_at = time.time()
+      if status == "completed":
+        job.progress = 1.0
+        job.partial = None
+      self._jobs.pop(job.id, None)
+      self._futures.pop(job.id, None)
+      if self._cancelled is not None:
+        self._cancelled.pop(job.id, None)
+    self.store.save(job)
+    self._publish(job)
+
+  def cancel(self, job_id: str) -> Job:
+    """Cancel a queued job at once, or a running one at its next check.
+
+    Raises KeyError for unknown jobs and ValueError for finished ones.
+    """
+    with self._lock:
+      job = self._jobs.get(job_id)
+      future = self._futures.get(job_id)
+    if job is None or future is None:
+      job = self.store.get(job_id)
+      if job is None:
+        raise KeyError(job_id)
+      raise ValueError(f"Job {job_id} already {job.status}")
+    # A successful cancel() runs _finish right here, so not under the lock
+    if not future.cancel() and not future.done():
+      self._cancelled[job_id] = True
+    return job
+
+  def get(self, job_id: str) -> Optional[Job]:
+    with self._lock:
+      job = self._jobs.get(job_id)
+    return job if job is not None else self.store.get(job_id)
+
+  def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    if status is not None and status not in STATES:
+      raise ValueError(f"Unknown status: {status}; expected one of {', '.join(STATES)}")
+    jobs = self.store.list(status, limit)
+    with self._lock:
+      # The store only sees state changes; live progress is held in memory
+      return [self._jobs.get(job.id, job) for job in jobs]
+
+  def _publish(self, job: Job) -> None:
+    if self._loop is None or self._on_update is None or self._loop.is_closed():
+      return
+    message = {"type": "job", "symbol": job.symbol, "job": job.to_dict()}
+    self._loop.call_soon_threadsafe(lambda: self._loop.create_task(self._on_update(message)))
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      statuses = [job.status for job in self._jobs.values()]
+    return {
+      "workers": self.max_workers,
+      "queued": statuses.count("queued"),
+      "running": statuses.count("running"),
+    }
+
+  def shutdown(self) -> None:
+    """Stop the pool; unfinished jobs are marked failed on the next start."""
+    if self._pool is None:
+      return
+    self._stopping = True
+    with self._lock:
+      for job_id in self._jobs:
+        self._cancelled[job_id] = True
+    self._pool.shutdown(wait=False, cancel_futures=True)
+    self._updates.put(None)
+    self._listener.join(timeout=5)
+    self._manager.shutdown()
+    self._pool = None
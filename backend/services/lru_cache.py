@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+  """Thread-safe LRU cache bounded by total size and/or entry count.
+
+  ``sizeof`` reports each value's cost in bytes; least recently used
+  entries are evicted until both limits hold again. A value larger than
+  ``max_bytes`` on its own is not cached at all. With ``ttl`` set, entries
+  older than ``ttl`` seconds are treated as misses and dropped.
+  """
+
+  def __init__(
+    self,
+    max_bytes: Optional[int] = None,
+    max_items: Optional[int] = None,
+    sizeof: Callable[[V], int] = sys.getsizeof,
+    ttl: Optional[float] = None,
+  ):
+    self.max_bytes = max_bytes
+    self.max_items = max_items
+    self.sizeof = sizeof
+    self.ttl = ttl
+    # key -> (value, size, expiry on the monotonic clock or None)
+    self._entries: "OrderedDict[Hashable, Tuple[V, int, Optional[float]]]" = OrderedDict()
+    self._bytes = 0
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def __contains__(self, key: Hashable) -> bool:
+    entry = self._entries.get(key)
+    return entry is not None and not self._expired(entry)
+
+  @staticmethod
+  def _expired(entry: Tuple[V, int, Optional[float]]) -> bool:
+    return entry[2] is not None and time.monotonic() >= entry[2]
+
+  @property
+  def nbytes(self) -> int:
+    return self._bytes
+
+  def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and self._expired(entry):
+        self._discard(key)
+        self.expirations += 1
+        entry = None
+      if entry is None:
+        self.misses += 1
+        return default
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[0]
+
+  def put(self, key: Hashable, value: V) -> bool:
+    """Insert or replace ``key``; returns False if the value is too large."""
+    size = int(self.sizeof(value))
+    with self._lock:
+      self._discard(key)
+      if self.max_bytes is not None and size > self.max_bytes:
+        return False
+      expires = None if self.ttl is None else time.monotonic() + self.ttl
+      self._entries[key] = (value, size, expires)
+      self._bytes += size
+      while self._over_budget():
+        oldest = next(iter(self._entries))
+        self._discard(oldest)
+        self.evictions += 1
+      return True
+
+  def _over_budget(self) -> bool:
+    if self.max_bytes is not None and self._bytes > self.max_bytes:
+      return True
+    return self.max_items is not None and len(self._entries) > self.max_items
+
+  def _discard(self, key: Hashable) -> None:
+    entry = self._entries.pop(key, None)
+    if entry is not None:
+      self._bytes -= entry[1]
+
+  def pop(self, key: Hashable) -> None:
+    with self._lock:
+      self._discard(key)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._bytes = 0
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "items": len(self._entries),
+      "bytes": self._bytes,
+      "max_bytes": self.max_bytes,
+      "max_items": self.max_items,
+      "ttl": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "expirations": self.expirations,
+    }
@@ -1,70 +1,266 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TypeVar
 
+import numpy as np
 import pandas as pd
 
 from ..config import settings
+from .columnar_store import ColumnarStore
+from .lru_cache import LRUCache
+from .providers import get_provider
+from .strategies import StrategyFactory
+
+T = TypeVar("T")
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+  return int(df.memory_usage(index=True).sum())
+
+
+def frozen_frame(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+  """Frame over read-only column arrays: in-place writes raise ValueError.
+
+  Memory-mapped columns are copied to the heap first so cached frames
+  don't pin open file mappings.
+  """
+  columns = {}
+  for name, values in arrays.items():
+    if isinstance(values, np.memmap):
+      values = np.array(values)
+    values.flags.writeable = False
+    columns[name] = values
+  index = pd.DatetimeIndex(columns.pop("timestamp"), name="timestamp")
+  return pd.DataFrame(columns, index=index, copy=False)
+
+
+def read_only_copy(df: pd.DataFrame) -> pd.DataFrame:
+  """Copy ``df`` into per-column arrays that reject in-place writes."""
+  columns = {}
+  for name in df.columns:
+    values = np.array(df[name].to_numpy())
+    values.flags.writeable = False
+    columns[name] = values
+  return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+class SingleFlight:
+  """Collapse concurrent awaits for the same key into one execution.
+
+  Every caller awaits the same task through ``asyncio.shield``, so a caller
+  that is cancelled (e.g. a client disconnect) doesn't cancel the load for
+  the others.
+  """
+
+  def __init__(self):
+    self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+  def __len__(self) -> int:
+    return len(self._inflight)
+
+  async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+    future = self._inflight.get(key)
+    if future is None:
+      future = asyncio.ensure_future(fn())
+      self._inflight[key] = future
+      future.add_done_callback(lambda done: self._forget(key, done))
+    return await asyncio.shield(future)
+
+  def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+    if self._inflight.get(key) is future:
+      del self._inflight[key]
 
 
 class MarketDataService:
-  _cache: Dict[str, pd.DataFrame] = {}
+  """Market data access backed by the columnar store.
+
+  Whole-history frames are kept in a process-wide LRU cache bounded by
+  ``settings.market_cache_max_bytes`` (and optionally a symbol count).
+  Frames handed out share the cached, read-only column arrays: adding
+  columns to them is fine, but changing values in place raises, so call
+  ``.copy()`` first when you need a mutable frame.
+
+  The ``a*`` coroutines are for async handlers: cache hits return inline,
+  anything touching disk or the network runs on a dedicated thread pool,
+  and concurrent requests for the same symbol share one load.
+  """
+
+  _cache: LRUCache[pd.DataFrame] = LRUCache(
+    max_bytes=settings.market_cache_max_bytes,
+    max_items=settings.market_cache_max_symbols,
+    sizeof=frame_nbytes,
+  )
+  _store: Optional[ColumnarStore] = None
+  _executor: Optional[ThreadPoolExecutor] = None
+  _flights = SingleFlight()
+  _locks_guard = threading.Lock()
+  _symbol_locks: Dict[str, threading.Lock] = {}
 
   @staticmethod
   def _symbol_path(symbol: str) -> Path:
     return settings.data_dir / f"{symbol.upper()}.csv"
 
+  @classmethod
+  def store(cls) -> ColumnarStore:
+    if cls._store is None:
+      cls._store = ColumnarStore(
+        settings.store_dir or settings.data_dir / "store",
+        partition=settings.store_partition,
+      )
+    return cls._store
+
   @classmethod
   def available_symbols(cls) -> List[str]:
     files = settings.data_dir.glob("*.csv")
-    return sorted(path.stem.upper() for path in files)
+    return sorted(set(cls.store().symbols()) | {path.stem.upper() for path in files})
 
   @classmethod
-  def load_dataframe(cls, symbol: str) -> pd.DataFrame:
-    norm_symbol = symbol.upper()
-    if norm_symbol in cls._cache:
-      return cls._cache[norm_symbol].copy()
+  def _symbol_lock(cls, symbol: str) -> threading.Lock:
+    with cls._locks_guard:
+      return cls._symbol_locks.setdefault(symbol, threading.Lock())
 
-    path = cls._symbol_path(norm_symbol)
-    if not path.exists():
-      df = cls._download_symbol(norm_symbol)
-    else:
-      df = pd.read_csv(path, parse_dates=["timestamp"])
+  @classmethod
+  def _ensure_stored(cls, symbol: str) -> None:
+    """Import a legacy CSV (or download) into the columnar store on first use."""
+    store = cls.store()
+    if store.has(symbol):
+      return
+    with cls._symbol_lock(symbol):
+      if store.has(symbol):  # another thread imported it while we waited
+        return
+      path = cls._symbol_path(symbol)
+      if path.exists():
+        df = pd.read_csv(path, parse_dates=["timestamp"])
+      else:
+        df = cls._download_symbol(symbol)
+      store.write(symbol, df)
 
-    df.set_index("timestamp", inplace=True)
-    df.sort_index(inplace=True)
-    cls._cache[norm_symbol] = df
-    return df.copy()
+  @classmethod
+  def load_dataframe(cls, symbol: str) -> pd.DataFrame:
+    norm_symbol = symbol.upper()
+    df = cls._cache.get(norm_symbol)
+    if df is None:
+      cls._ensure_stored(norm_symbol)
+      with cls._symbol_lock(norm_symbol):
+        df = cls._cache.get(norm_symbol)
+        if df is None:
+          df = frozen_frame(cls.store().read_arrays(norm_symbol))
+          cls._cache.put(norm_symbol, df)
+    # Shallow copy: new columns stay private to the caller, data is shared
+    return df.copy(deep=False)
 
   @staticmethod
   def _download_symbol(symbol: str) -> pd.DataFrame:
-    try:
-      import yfinance as yf
-    except ImportError as exc:
-      raise RuntimeError(
-        "yfinance is required to download data; install backend requirements."
-      ) from exc
-
-    data = yf.download(symbol, period="6mo", interval="1d")
-    if data.empty:
-      raise ValueError(f"No data received for symbol {symbol}")
-
-    data = data.reset_index().rename(
-      columns={
-        "Date": "timestamp",
-        "Open": "open",
-        "High": "high",
-        "Low": "low",
-        "Close": "close",
-        "Volume": "volume",
-      }
+    return get_provider(settings.market_data_provider)(symbol)
+
+  @staticmethod
+  def _evaluation_key(
+    symbol: str, strategy_name: str, params: Optional[Dict[str, float]]
+  ) -> tuple:
+    return ("evaluate", symbol, strategy_name, tuple(sorted((params or {}).items())))
+
+  @classmethod
+  def evaluate(
+    cls,
+    symbol: str,
+    strategy_name: str,
+    params: Optional[Dict[str, float]] = None,
+  ) -> pd.DataFrame:
+    """Full history with the strategy's indicator and signal columns.
+
+    Results share the LRU cache (and its memory budget) with raw frames and
+    are returned read-only like ``load_dataframe``.
+    """
+    norm_symbol = symbol.upper()
+    key = cls._evaluation_key(norm_symbol, strategy_name, params)
+    df = cls._cache.get(key)
+    if df is None:
+      strategy = StrategyFactory.create(strategy_name, params)
+      df = read_only_copy(strategy.evaluate(cls.load_dataframe(norm_symbol)))
+      cls._cache.put(key, df)
+    return df.copy(deep=False)
+
+  # -- async ----------------------------------------------------------------
+
+  @classmethod
+  def _run(cls, fn: Callable[..., T], *args) -> Awaitable[T]:
+    if cls._executor is None:
+      cls._executor = ThreadPoolExecutor(
+        max_workers=settings.data_io_workers, thread_name_prefix="market-data"
+      )
+    return asyncio.get_running_loop().run_in_executor(cls._executor, fn, *args)
+
+  @classmethod
+  async def _aensure_stored(cls, symbol: str) -> None:
+    if not cls.store().has(symbol):
+      await cls._flights.do(("store", symbol), lambda: cls._run(cls._ensure_stored, symbol))
+
+  @classmethod
+  async def aload_dataframe(cls, symbol: str) -> pd.DataFrame:
+    norm_symbol = symbol.upper()
+    if norm_symbol in cls._cache:
+      return cls.load_dataframe(norm_symbol)
+    await cls._aensure_stored(norm_symbol)
+    df = await cls._flights.do(
+      ("load", norm_symbol), lambda: cls._run(cls.load_dataframe, norm_symbol)
+    )
+    # Waiters share the leader's frame; give each its own shallow copy
+    return df.copy(deep=False)
+
+  @classmethod
+  async def aevaluate(
+    cls,
+    symbol: str,
+    strategy_name: str,
+    params: Optional[Dict[str, float]] = None,
+  ) -> pd.DataFrame:
+    norm_symbol = symbol.upper()
+    key = cls._evaluation_key(norm_symbol, strategy_name, params)
+    if key in cls._cache:
+      return cls.evaluate(norm_symbol, strategy_name, params)
+    await cls.aload_dataframe(norm_symbol)
+    df = await cls._flights.do(
+      key, lambda: cls._run(cls.evaluate, norm_symbol, strategy_name, params)
     )
-    data["timestamp"] = pd.to_datetime(data["timestamp"])
-    settings.data_dir.mkdir(parents=True, exist_ok=True)
-    data.to_csv(settings.data_dir / f"{symbol}.csv", index=False)
-    return data
+    return df.copy(deep=False)
+
+  @classmethod
+  async def aslice_dataframe(
+    cls,
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+  ) -> pd.DataFrame:
+    norm_symbol = symbol.upper()
+    if norm_symbol in cls._cache:
+      return cls.slice_dataframe(norm_symbol, start, end)
+    await cls._aensure_stored(norm_symbol)
+    return await cls._run(cls.slice_dataframe, norm_symbol, start, end)
+
+  @classmethod
+  async def adata_version(cls, symbol: str) -> str:
+    """Identifier of the symbol's stored data, for cache keys and ETags."""
+    norm_symbol = symbol.upper()
+    await cls._aensure_stored(norm_symbol)
+    return cls.store().version(norm_symbol)
+
+  @classmethod
+  async def alatest_timestamp(cls, symbol: str) -> pd.Timestamp:
+    norm_symbol = symbol.upper()
+    await cls._aensure_stored(norm_symbol)
+    return cls.store().last_timestamp(norm_symbol)
+
+  @classmethod
+  def latest_timestamp(cls, symbol: str) -> pd.Timestamp:
+    norm_symbol = symbol.upper()
+    cls._ensure_stored(norm_symbol)
+    return cls.store().last_timestamp(norm_symbol)
 
   @classmethod
   def slice_dataframe(
@@ -73,7 +269,12 @@ class MarketDataService:
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
   ) -> pd.DataFrame:
-    df = cls.load_dataframe(symbol)
+    norm_symbol = symbol.upper()
+    if norm_symbol not in cls._cache:
+      # Resolve the range with the store's time index and read only that window
+      cls._ensure_stored(norm_symbol)
+      return frozen_frame(cls.store().read_arrays(norm_symbol, start, end))
+    df = cls.load_dataframe(norm_symbol)
     if start:
       df = df.loc[start:]
     if end:
@@ -81,28 +282,96 @@ class MarketDataService:
     return df
 
   @classmethod
-  def to_candles(cls, df: pd.DataFrame) -> List[Dict[str, object]]:
-    candles: List[Dict[str, object]] = []
-    for ts, row in df.iterrows():
-      indicators = {
-        k: float(row[k])
-        for k in row.index
-        if k.startswith("indicator_") and pd.notna(row[k])
+  def iter_frames(
+    cls,
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 5000,
+  ) -> Iterator[pd.DataFrame]:
+    """Yield ``start <= timestamp <= end`` in frames of at most ``batch_size``
+    rows read straight from the store, so memory stays O(batch_size)
+    whatever the range. Bypasses the cache."""
+    if batch_size < 1:
+      raise ValueError("batch_size must be >= 1")
+    norm_symbol = symbol.upper()
+    cls._ensure_stored(norm_symbol)
+    store = cls.store()
+    first, last = store.locate(norm_symbol, start, end)
+    for lo in range(first, last, batch_size):
+      arrays = store.read_rows(norm_symbol, lo, min(lo + batch_size, last))
+      index = pd.DatetimeIndex(arrays.pop("timestamp"), name="timestamp")
+      yield pd.DataFrame(arrays, index=index)
+
+  @staticmethod
+  def _timestamp_strings(index: pd.Index) -> List[str]:
+    """ISO-8601 strings for a whole index at once (seconds, or microseconds
+    when any timestamp has a fraction), matching ``datetime.isoformat``."""
+    values = pd.DatetimeIndex(index).tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    fractional = bool((values.view(np.int64) % 1_000_000_000).any())
+    return np.datetime_as_string(values, unit="us" if fractional else "s").tolist()
+
+  @classmethod
+  def to_candle_columns(cls, df: pd.DataFrame, iso: bool = True) -> Dict[str, object]:
+    """Column-oriented candles: one list per field, built from the column
+    arrays without touching rows. Missing indicator values are ``None``."""
+    columns: Dict[str, object] = {
+      "timestamp": cls._timestamp_strings(df.index) if iso else list(df.index.to_pydatetime()),
+    }
+    for field in ("open", "high", "low", "close", "volume"):
+      columns[field] = df[field].to_numpy(dtype=np.float64).tolist()
+    indicators: Dict[str, List[Optional[float]]] = {}
+    for name in df.columns:
+      if name.startswith("indicator_"):
+        values = df[name].to_numpy(dtype=np.float64)
+        indicators[name] = np.where(np.isnan(values), None, values).tolist()
+    columns["indicators"] = indicators
+    columns["signal"] = (
+      df["signal"].to_numpy(dtype=np.int64).tolist() if "signal" in df.columns else [0] * len(df)
+    )
+    columns["signal_reason"] = (
+      df["signal_reason"].tolist() if "signal_reason" in df.columns else [""] * len(df)
+    )
+    return columns
+
+  @classmethod
+  def to_candles(cls, df: pd.DataFrame, iso: bool = False) -> List[Dict[str, object]]:
+    """Row-oriented candles assembled in one pass over the column lists.
+
+    ``iso=True`` gives JSON-ready timestamp strings instead of datetimes.
+    """
+    columns = cls.to_candle_columns(df, iso=iso)
+    indicators = columns["indicators"]
+    names = list(indicators)
+    rows = zip(
+      columns["timestamp"],
+      columns["open"],
+      columns["high"],
+      columns["low"],
+      columns["close"],
+      columns["volume"],
+      zip(*indicators.values()) if names else itertools.repeat(()),
+      columns["signal"],
+      columns["signal_reason"],
+    )
+    return [
+      {
+        "timestamp": ts,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "indicators": {k: v for k, v in zip(names, values) if v is not None},
+        "signal": signal,
+        "signal_reason": reason,
       }
-      candles.append(
-        {
-          "timestamp": ts.to_pydatetime(),
-          "open": float(row["open"]),
-          "high": float(row["high"]),
-          "low": float(row["low"]),
-          "close": float(row["close"]),
-          "volume": float(row["volume"]),
-          "indicators": indicators,
-          "signal": int(row["signal"]) if "signal" in row else 0,
-          "signal_reason": row.get("signal_reason", ""),
-        }
-      )
-    return candles
+      for ts, open_, high, low, close, volume, values, signal, reason in rows
+    ]
+
+  @classmethod
+  def cache_stats(cls) -> Dict[str, object]:
+    return cls._cache.stats()
 
   @classmethod
   def reset_cache(cls) -> None:
@@ -0,0 +1,246 @@
+"""Backtest and portfolio performance metrics.
+
+The functions work on NumPy equity / position-value arrays and on the trade
+dicts the engines record. ``StreamingMetrics`` maintains the same figures
+one observation at a time in constant time, for live portfolios.
+
+Conventions match ``BacktestResult``: returns and drawdowns are percentages
+(drawdowns negative), ratios are annualized by ``periods_per_year`` (None
+leaves them per period), and sample standard deviations use ``ddof=1``.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+PERIODS_PER_YEAR = 252
+
+
+def _annualize(periods_per_year: Optional[float]) -> float:
+  return 1.0 if periods_per_year is None else math.sqrt(periods_per_year)
+
+
+def returns(equity: np.ndarray) -> np.ndarray:
+  equity = np.asarray(equity, dtype=np.float64)
+  if len(equity) < 2:
+    return np.empty(0)
+  return equity[1:] / equity[:-1] - 1
+
+
+def sharpe_ratio(period_returns: np.ndarray, periods_per_year: Optional[float] = PERIODS_PER_YEAR) -> float:
+  if len(period_returns) < 2:
+    return 0.0
+  std = period_returns.std(ddof=1)
+  if not std > 0:
+    return 0.0
+  return float(period_returns.mean() / std * _annualize(periods_per_year))
+
+
+def sortino_ratio(period_returns: np.ndarray, periods_per_year: Optional[float] = PERIODS_PER_YEAR) -> float:
+  """Mean return over downside deviation (root mean square of negative returns)."""
+  if len(period_returns) < 2:
+    return 0.0
+  downside = math.sqrt(np.mean(np.minimum(period_returns, 0.0) ** 2))
+  if not downside > 0:
+    return 0.0
+  return float(period_returns.mean() / downside * _annualize(periods_per_year))
+
+
+def drawdowns(equity: np.ndarray) -> np.ndarray:
+  """Percent below the running peak at each bar (0 at new highs)."""
+  equity = np.asarray(equity, dtype=np.float64)
+  peaks = np.maximum.accumulate(equity)
+  return (equity - peaks) / peaks * 100
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+  return float(drawdowns(equity).min()) if len(equity) else 0.0
+
+
+def max_drawdown_duration(equity: np.ndarray) -> int:
+  """Longest run of bars spent below a previous peak."""
+  equity = np.asarray(equity, dtype=np.float64)
+  if not len(equity):
+    return 0
+  at_peak = np.flatnonzero(equity >= np.maximum.accumulate(equity))
+  # Gaps between consecutive peak bars, plus the open stretch after the last
+  gaps = np.diff(np.r_[at_peak, len(equity)]) - 1
+  return int(gaps.max())
+
+
+def exposure(position_value: np.ndarray) -> float:
+  """Percent of bars with an open position."""
+  position_value = np.asarray(position_value)
+  return float(np.count_nonzero(position_value) / len(position_value) * 100) if len(position_value) else 0.0
+
+
+def round_trip_pnls(trades: Sequence[Dict[str, Any]]) -> np.ndarray:
+  """Realized P&L of every SELL against the average cost of the shares it
+  closes (per symbol), net of any recorded commission."""
+  pnls: List[float] = []
+  books: Dict[Any, List[float]] = {}  # symbol -> [shares, cost basis]
+  for trade in trades:
+    book = books.setdefault(trade.get("symbol"), [0.0, 0.0])
+    fee = trade.get("commission", 0.0)
+    if trade["type"] == "BUY":
+      book[0] += trade["quantity"]
+      book[1] += trade["value"] + fee
+    elif book[0] > 0:
+      quantity = min(trade["quantity"], book[0])
+      cost = book[1] * quantity / book[0]
+      pnls.append(trade["value"] * quantity / trade["quantity"] - fee - cost)
+      book[0] -= quantity
+      book[1] -= cost
+  return np.asarray(pnls, dtype=np.float64)
+
+
+def win_rate(pnls: np.ndarray) -> float:
+  return float(np.count_nonzero(pnls > 0) / len(pnls) * 100) if len(pnls) else 0.0
+
+
+def profit_factor(pnls: np.ndarray) -> Optional[float]:
+  """Gross profit over gross loss; None when nothing was lost."""
+  gross_loss = -pnls[pnls < 0].sum()
+  if not gross_loss > 0:
+    return None
+  return float(pnls[pnls > 0].sum() / gross_loss)
+
+
+def summarize(
+  equity: np.ndarray,
+  position_value: Optional[np.ndarray] = None,
+  pnls: Optional[np.ndarray] = None,
+  periods_per_year: Optional[float] = PERIODS_PER_YEAR,
+) -> Dict[str, Any]:
+  period_returns = returns(equity)
+  pnls = np.empty(0) if pnls is None else pnls
+  return {
+    "total_return": float((equity[-1] / equity[0] - 1) * 100) if len(equity) else 0.0,
+    "sharpe_ratio": sharpe_ratio(period_returns, periods_per_year),
+    "sortino_ratio": sortino_ratio(period_returns, periods_per_year),
+    "max_drawdown": max_drawdown(equity),
+    "max_drawdown_duration": max_drawdown_duration(equity),
+    "exposure": exposure(position_value) if position_value is not None else None,
+    "trades": len(pnls),
+    "winning_trades": int(np.count_nonzero(pnls > 0)),
+    "losing_trades": int(np.count_nonzero(pnls <= 0)),
+    "win_rate": win_rate(pnls),
+    "profit_factor": profit_factor(pnls),
+  }
+
+
+class StreamingMetrics:
+  """The ``summarize`` figures, updated one equity observation at a time.
+
+  Every ``update`` and ``record_trade`` is O(1). With ``window`` set,
+  Sharpe and Sortino cover only the last ``window`` returns (running sums
+  are adjusted as returns leave the window); drawdowns, exposure and trade
+  statistics always cover everything seen since the last ``reset``.
+  """
+
+  def __init__(self, window: Optional[int] = None, periods_per_year: Optional[float] = PERIODS_PER_YEAR):
+    if window is not None and window < 2:
+      raise ValueError("window must be at least 2")
+    self.window = window
+    self.periods_per_year = periods_per_year
+    self.reset()
+
+  def reset(self) -> None:
+    self.bars = 0
+    self.first_equity: Optional[float] = None
+    self.last_equity: Optional[float] = None
+    self.peak = -math.inf
+    self.max_drawdown = 0.0
+    self.drawdown_bars = 0
+    self.max_drawdown_duration = 0
+    self.exposed_bars = 0
+    # Returns inside the window (only kept when ``window`` is set)
+    self._window: Deque[float] = deque()
+    self._count = 0
+    self._sum = 0.0
+    self._sum_sq = 0.0
+    self._downside_sq = 0.0
+    self.trades = 0
+    self.winning_trades = 0
+    self.gross_profit = 0.0
+    self.gross_loss = 0.0
+
+  def update(self, equity: float, position_value: float = 0.0) -> None:
+    if self.last_equity is not None and self.last_equity != 0:
+      self._add_return(equity / self.last_equity - 1)
+    if self.first_equity is None:
+      self.first_equity = equity
+    self.last_equity = equity
+    self.bars += 1
+    if position_value:
+      self.exposed_bars += 1
+
+    if equity >= self.peak:
+      self.peak = equity
+      self.drawdown_bars = 0
+    else:
+      self.drawdown_bars += 1
+      self.max_drawdown_duration = max(self.max_drawdown_duration, self.drawdown_bars)
+      self.max_drawdown = min(self.max_drawdown, (equity - self.peak) / self.peak * 100)
+
+  def _add_return(self, value: float) -> None:
+    self._count += 1
+    self._sum += value
+    self._sum_sq += value * value
+    self._downside_sq += min(value, 0.0) ** 2
+    if self.window is None:
+      return
+    self._window.append(value)
+    if len(self._window) > self.window:
+      old = self._window.popleft()
+      self._count -= 1
+      self._sum -= old
+      self._sum_sq -= old * old
+      self._downside_sq -= min(old, 0.0) ** 2
+
+  def record_trade(self, pnl: float) -> None:
+    """Add one closed trade's realized P&L."""
+    self.trades += 1
+    if pnl > 0:
+      self.winning_trades += 1
+      self.gross_profit += pnl
+    else:
+      self.gross_loss -= pnl
+
+  def sharpe_ratio(self) -> float:
+    n = self._count
+    if n < 2:
+      return 0.0
+    mean = self._sum / n
+    variance = max((self._sum_sq - n * mean * mean) / (n - 1), 0.0)
+    if not variance > 0:
+      return 0.0
+    return mean / math.sqrt(variance) * _annualize(self.periods_per_year)
+
+  def sortino_ratio(self) -> float:
+    n = self._count
+    if n < 2 or not self._downside_sq > 0:
+      return 0.0
+    return (self._sum / n) / math.sqrt(self._downside_sq / n) * _annualize(self.periods_per_year)
+
+  def snapshot(self) -> Dict[str, Any]:
+    total_return = 0.0
+    if self.first_equity:
+      total_return = (self.last_equity / self.first_equity - 1) * 100
+    return {
+      "bars": self.bars,
+      "total_return": total_return,
+      "sharpe_ratio": self.sharpe_ratio(),
+      "sortino_ratio": self.sortino_ratio(),
+      "max_drawdown": self.max_drawdown,
+      "max_drawdown_duration": self.max_drawdown_duration,
+      "exposure": self.exposed_bars / self.bars * 100 if self.bars else 0.0,
+      "trades": self.trades,
+      "winning_trades": self.winning_trades,
+      "losing_trades": self.trades - self.winning_trades,
+      "win_rate": self.winning_trades / self.trades * 100 if self.trades else 0.0,
+      "profit_factor": self.gross_profit / self.gross_loss if self.gross_loss > 0 else None,
+    }
@@ -0,0 +1,124 @@
+"""Monte Carlo robustness checks for a finished backtest.
+
+``returns`` bootstraps the per-bar equity returns (with replacement), which
+tests how much the result depends on the exact sequence of market moves.
+``trades`` reshuffles the order of round-trip P&Ls, which keeps the final
+return but shows the range of drawdowns the same trades could produce.
+
+Simulations run in fixed-size chunks, each seeded from one
+``SeedSequence``, so a seed gives the same answer on any number of workers.
+The resampled series is shared with workers through shared memory.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..config import settings
+from .backtesting import BacktestResult
+from .metrics import returns, round_trip_pnls
+from .shared_frames import SharedArrays, SharedSpec, attach_arrays
+
+METHODS = ("returns", "trades")
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIMULATIONS = 256
+# Upper bound on cells in one (simulation x step) path matrix
+MAX_CELLS = 20_000_000
+
+
+def _drawdowns(paths: np.ndarray, start: float) -> np.ndarray:
+  """Most negative percent drawdown per row, counting ``start`` as the first peak."""
+  peaks = np.maximum(np.maximum.accumulate(paths, axis=1), start)
+  return ((paths - peaks) / peaks).min(axis=1) * 100
+
+
+def _simulate_chunk(
+  method: str,
+  initial_cash: float,
+  count: int,
+  seed: np.random.SeedSequence,
+  values: Optional[np.ndarray] = None,
+  shared: Optional[SharedSpec] = None,
+) -> np.ndarray:
+  """``(count, 2)`` array of total return % and max drawdown % per simulation."""
+  if values is None:
+    values = attach_arrays(shared)["values"]
+  rng = np.random.default_rng(seed)
+  n = len(values)
+  out = np.empty((count, 2))
+  block = max(1, MAX_CELLS // max(n, 1))
+  for first in range(0, count, block):
+    rows = min(block, count - first)
+    if method == "returns":
+      paths = initial_cash * np.cumprod(1 + values[rng.integers(0, n, (rows, n))], axis=1)
+    else:
+      paths = initial_cash + np.cumsum(rng.permuted(np.tile(values, (rows, 1)), axis=1), axis=1)
+    out[first:first + rows, 0] = (paths[:, -1] / initial_cash - 1) * 100
+    out[first:first + rows, 1] = _drawdowns(paths, initial_cash)
+  return out
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+  summary = {f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+  summary["mean"] = float(values.mean())
+  return summary
+
+
+def monte_carlo(
+  result: BacktestResult,
+  initial_cash: float,
+  method: str = "returns",
+  simulations: int = 1000,
+  seed: Optional[int] = None,
+  max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+  """Distribution of total return and max drawdown over resampled paths of ``result``."""
+  if method not in METHODS:
+    raise ValueError(f"Unknown method: {method}; expected one of {', '.join(METHODS)}")
+  if simulations <= 0:
+    raise ValueError("simulations must be positive")
+  if simulations > settings.monte_carlo_max_simulations:
+    raise ValueError(
+      f"{simulations} simulations exceeds the limit of {settings.monte_carlo_max_simulations}"
+    )
+  if method == "returns":
+    values = returns(result.equity_curve.equity)
+  else:
+    values = round_trip_pnls(result.trades)
+  if not len(values):
+    raise ValueError(f"Nothing to resample: the backtest has no {method}")
+
+  counts = [
+    min(CHUNK_SIMULATIONS, simulations - first)
+    for first in range(0, simulations, CHUNK_SIMULATIONS)
+  ]
+  seeds = np.random.SeedSequence(seed).spawn(len(counts))
+  workers = min(max_workers or os.cpu_count() or 1, len(counts))
+  if workers <= 1:
+    chunks = [
+      _simulate_chunk(method, initial_cash, count, chunk_seed, values=values)
+      for count, chunk_seed in zip(counts, seeds)
+    ]
+  else:
+    with SharedArrays({"values": values}) as shared, ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [
+        pool.submit(_simulate_chunk, method, initial_cash, count, chunk_seed, shared=shared.spec)
+        for count, chunk_seed in zip(counts, seeds)
+      ]
+      chunks = [future.result() for future in futures]
+
+  outcomes = np.vstack(chunks)
+  return {
+    "method": method,
+    "simulations": simulations,
+    "baseline": {
+      "total_return": float(result.total_return),
+      "max_drawdown": float(result.max_drawdown),
+    },
+    "total_return": _distribution(outcomes[:, 0]),
+    "max_drawdown": _distribution(outcomes[:, 1]),
+    "probability_of_loss": float((outcomes[:, 0] < 0).mean()),
+  }
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from .backtesting import BacktestEngine
+from .shared_frames import SharedSpec, attach_frame, share_frame
+from .strategies import StrategyFactory
+
+ParameterSpec = Union[Sequence[float], Dict[str, float]]
+
+METRIC_FIELDS = (
+  "total_return",
+  "max_drawdown",
+  "sharpe_ratio",
+  "total_trades",
+  "winning_trades",
+  "losing_trades",
+  "sortino_ratio",
+  "max_drawdown_duration",
+  "exposure",
+  "profit_factor",
+)
+
+# Per-worker copy of the price history, set once by the pool initializer so
+# each task only ships its parameter sets.
+_worker_data: Optional[pd.DataFrame] = None
+
+
+def expand_values(spec: ParameterSpec) -> List[float]:
+  """Turn ``[v1, v2, ...]`` or ``{"start", "stop", "step"}`` (stop inclusive)
+  into a list of parameter values."""
+  if isinstance(spec, dict):
+    start, stop = float(spec["start"]), float(spec["stop"])
+    step = float(spec.get("step", 1))
+    if step <= 0:
+      raise ValueError("step must be positive")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return [start + i * step for i in range(max(count, 0))]
+  return [float(v) for v in spec]
+
+
+def expand_grid(grid: Dict[str, ParameterSpec]) -> List[Dict[str, float]]:
+  names = list(grid)
+  values = [expand_values(grid[name]) for name in names]
+  return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def _init_worker(data: pd.DataFrame) -> None:
+  global _worker_data
+  _worker_data = data
+
+
+def _run_chunk(
+  strategy_name: str,
+  initial_cash: float,
+  param_sets: List[Dict[str, float]],
+  data: Optional[pd.DataFrame] = None,
+) -> List[Dict[str, Any]]:
+  frame = _worker_data if data is None else data
+  engine = BacktestEngine(initial_cash)
+  # One batched indicator pass for the whole chunk, then one simulation per row
+  signals = StrategyFactory.get(strategy_name).evaluate_batch(frame, param_sets)
+  rows: List[Dict[str, Any]] = []
+  for params, signal in zip(param_sets, signals):
+    result = engine.run_signals(frame, signal)
+    rows.append(
+      {
+        "parameters": params,
+        "metrics": {field: _metric(getattr(result, field)) for field in METRIC_FIELDS},
+      }
+    )
+  return rows
+
+
+def _metric(value: Any) -> Optional[float]:
+  if value is None:
+    return None
+  value = float(value)
+  return None if np.isnan(value) else value
+
+
+def _rank_value(value: Optional[float]) -> float:
+  return float("-inf") if value is None else value
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+  for start in range(0, len(items), size):
+    yield items[start:start + size]
+
+
+def check_grid(strategy_name: str, grid: Dict[str, ParameterSpec], rank_by: str) -> List[Dict[str, float]]:
+  StrategyFactory.get(strategy_name)  # fail fast on unknown strategies
+  if rank_by not in METRIC_FIELDS:
+    raise ValueError(f"Unknown metric: {rank_by}")
+  param_sets = expand_grid(grid)
+  if len(param_sets) > settings.sweep_max_combinations:
+    raise ValueError(
+      f"{len(param_sets)} combinations exceeds the limit of {settings.sweep_max_combinations}"
+    )
+  return param_sets
+
+
+def run_sweep(
+  data: pd.DataFrame,
+  strategy_name: str,
+  grid: Dict[str, ParameterSpec],
+  initial_cash: float = settings.initial_cash,
+  rank_by: str = "total_return",
+  max_workers: Optional[int] = None,
+  top_n: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+  """Backtest every parameter combination and return rows ranked by ``rank_by``.
+
+  Combinations are split into chunks and run on a process pool; the price
+  history is sent to each worker once via the pool initializer.
+  """
+  param_sets = check_grid(strategy_name, grid, rank_by)
+  if not param_sets:
+    return []
+
+  workers = max_workers or os.cpu_count() or 1
+  workers = min(workers, len(param_sets))
+  if workers <= 1:
+    rows = _run_chunk(strategy_name, initial_cash, param_sets, data)
+  else:
+    # A few chunks per worker keeps cores busy when run times differ.
+    size = max(1, len(param_sets) // (workers * 4))
+    with ProcessPoolExecutor(
+      max_workers=workers, initializer=_init_worker, initargs=(data,)
+    ) as pool:
+      futures = [
+        pool.submit(_run_chunk, strategy_name, initial_cash, chunk)
+        for chunk in _chunks(param_sets, size)
+      ]
+      rows = [row for future in futures for row in future.result()]
+
+  return rank_rows(rows, rank_by, top_n)
+
+
+def rank_rows(rows: List[Dict[str, Any]], rank_by: str, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+  """Sort sweep rows best first by ``rank_by`` and number them."""
+  rows = sorted(rows, key=lambda row: _rank_value(row["metrics"][rank_by]), reverse=True)
+  for rank, row in enumerate(rows, start=1):
+    row["rank"] = rank
+  return rows[:top_n] if top_n else rows
+
+
+def walk_forward_windows(
+  index: pd.Index,
+  train_days: int,
+  test_days: int,
+  step_days: Optional[int] = None,
+  anchored: bool = False,
+) -> List[Tuple[int, int, int]]:
+  """``(train_start, test_start, test_end)`` row positions of each fold.
+
+  Folds advance by ``step_days`` (default ``test_days``). Rolling folds
+  train on the ``train_days`` before each test window; anchored folds
+  always train from the first bar. The last test window may be partial.
+  """
+  if train_days <= 0 or test_days <= 0 or (step_days is not None and step_days <= 0):
+    raise ValueError("train_days, test_days and step_days must be positive")
+  timestamps = pd.DatetimeIndex(index)
+  if not len(timestamps):
+    return []
+  origin = timestamps[0]
+  step = pd.Timedelta(days=step_days or test_days)
+  folds: List[Tuple[int, int, int]] = []
+  for fold in itertools.count():
+    test_from = origin + pd.Timedelta(days=train_days) + fold * step
+    train_from = origin if anchored else test_from - pd.Timedelta(days=train_days)
+    train_start, test_start, test_end = timestamps.searchsorted(
+      [train_from, test_from, test_from + pd.Timedelta(days=test_days)]
+    )
+    if test_start >= len(timestamps):
+      return folds
+    if train_start < test_start < test_end:
+      folds.append((int(train_start), int(test_start), int(test_end)))
+
+
+def _run_fold(
+  strategy_name: str,
+  initial_cash: float,
+  param_sets: List[Dict[str, float]],
+  bounds: Tuple[int, int, int],
+  rank_by: str,
+  data: Optional[pd.DataFrame] = None,
+  shared: Optional[SharedSpec] = None,
+) -> Dict[str, Any]:
+  """Optimize on the fold's training rows, then trade its test rows with the winner."""
+  frame = data if data is not None else attach_frame(shared)
+  train_start, test_start, test_end = bounds
+  rows = _run_chunk(strategy_name, initial_cash, param_sets, frame.iloc[train_start:test_start])
+  best = max(rows, key=lambda row: _rank_value(row["metrics"][rank_by]))
+
+  # Signals come from the whole fold so indicators are warm when testing starts
+  window = frame.iloc[train_start:test_end]
+  signal = StrategyFactory.get(strategy_name).evaluate_batch(window, [best["parameters"]])[0]
+  result = BacktestEngine(initial_cash).run_signals(
+    frame.iloc[test_start:test_end], signal[test_start - train_start:]
+  )
+  return {
+    "train_start": frame.index[train_start],
+    "train_end": frame.index[test_start - 1],
+    "test_start": frame.index[test_start],
+    "test_end": frame.index[test_end - 1],
+    "parameters": best["parameters"],
+    "in_sample": best["metrics"],
+    "out_of_sample": {field: _metric(getattr(result, field)) for field in METRIC_FIELDS},
+  }
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+  present = [value for value in values if value is not None]
+  return float(np.mean(present)) if present else None
+
+
+def walk_forward(
+  data: pd.DataFrame,
+  strategy_name: str,
+  grid: Dict[str, ParameterSpec],
+  train_days: int,
+  test_days: int,
+  step_days: Optional[int] = None,
+  anchored: bool = False,
+  initial_cash: float = settings.initial_cash,
+  rank_by: str = "total_return",
+  max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+  """Walk-forward optimization: a sweep per training window, scored on the
+  following test window.
+
+  Folds run in parallel on a process pool; the price history is placed in
+  shared memory once and every worker reads it from there.
+  """
+  param_sets = check_grid(strategy_name, grid, rank_by)
+  if not param_sets:
+    raise ValueError("The parameter grid is empty")
+  windows = walk_forward_windows(data.index, train_days, test_days, step_days, anchored)
+  if not windows:
+    raise ValueError("Not enough data for one training and test window")
+
+  workers = min(max_workers or os.cpu_count() or 1, len(windows))
+  if workers <= 1:
+    folds = [
+      _run_fold(strategy_name, initial_cash, param_sets, bounds, rank_by, data=data)
+      for bounds in windows
+    ]
+  else:
+    with share_frame(data) as shared, ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [
+        pool.submit(_run_fold, strategy_name, initial_cash, param_sets, bounds, rank_by, shared=shared.spec)
+        for bounds in windows
+      ]
+      folds = [future.result() for future in futures]
+
+  in_sample = [fold["in_sample"]["total_return"] for fold in folds]
+  out_of_sample = [fold["out_of_sample"]["total_return"] for fold in folds]
+  compounded = np.prod([1 + value / 100 for value in out_of_sample if value is not None])
+  mean_in, mean_out = _mean(in_sample), _mean(out_of_sample)
+  # Walk-forward efficiency: the share of the in-sample edge that survives
+  efficiency = None
+  if mean_in is not None and mean_in > 0 and mean_out is not None:
+    efficiency = mean_out / mean_in
+  drawdowns = [fold["out_of_sample"]["max_drawdown"] for fold in folds]
+  return {
+    "folds": folds,
+    "summary": {
+      "folds": len(folds),
+      "out_of_sample_return": float(compounded - 1) * 100,
+      "mean_in_sample_return": mean_in,
+      "mean_out_of_sample_return": mean_out,
+      "efficiency": efficiency,
+      "worst_out_of_sample_drawdown": min(
+        (value for value in drawdowns if value is not None), default=None
+      ),
+    },
+  }
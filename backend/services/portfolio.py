@@ -1,17 +1,41 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 import asyncio
-from ..models import Portfolio, Position, Trade
-from ..database import get_db
-from sqlalchemy.orm import Session
+from ..config import settings
+from ..schemas import PaperTrade as Trade, Portfolio, Position
+from .metrics import StreamingMetrics
+
+SIGNAL_ACTIONS = {1: "BUY", -1: "SELL"}
+
+
+def fill_terms(action: str, quantity: float, price: float, commission: float = 0.0, slippage: float = 0.0):
+    """Fill price, trade value and fee of an order at ``price``.
+
+    Shared by ``PortfolioManager.execute_trade`` and the event-driven
+    backtest's fast replay so both settle fills with identical arithmetic.
+    """
+    side = 1 if action == "BUY" else -1
+    price = price * (1 + side * slippage)
+    trade_value = quantity * price
+    return price, trade_value, trade_value * commission
 
 
 class PortfolioManager:
-    def __init__(self, initial_cash: float = 100000.0):
+    def __init__(self, initial_cash: float = 100000.0, commission: float = 0.0, slippage: float = 0.0):
+        """``commission`` is charged as a fraction of each trade's value;
+        ``slippage`` moves fills against the trader by that fraction of price."""
         self.cash = initial_cash
         self.initial_cash = initial_cash
+        self.commission = commission
+        self.slippage = slippage
         self.positions: Dict[str, Position] = {}
+        # Cost of each open position including buy fees, so realized P&L
+        # matches metrics.round_trip_pnls in backtests
+        self._cost_basis: Dict[str, float] = {}
         self.trades: List[Trade] = []
+        self.total_commission = 0.0
+        # Live marks have no fixed period, so ratios are left unannualized
+        self.metrics = StreamingMetrics(window=settings.portfolio_metrics_window, periods_per_year=None)
         
     def get_portfolio_summary(self) -> Portfolio:
         """Get current portfolio summary"""
@@ -27,16 +51,20 @@ class PortfolioManager:
             cash=self.cash,
             total_value=total_value,
             total_pnl=total_pnl,
-            positions=list(self.positions.values())
+            positions=list(self.positions.values()),
+            metrics=self.metrics.snapshot()
         )
     
-    def execute_trade(self, symbol: str, action: str, quantity: int, price: float) -> Trade:
+    def execute_trade(
+        self, symbol: str, action: str, quantity: int, price: float, timestamp: Optional[datetime] = None
+    ) -> Trade:
         """Execute a trade and update portfolio"""
-        trade_value = quantity * price
+        price, trade_value, fee = fill_terms(action.upper(), quantity, price, self.commission, self.slippage)
         
         if action.upper() == "BUY":
-            if self.cash >= trade_value:
-                self.cash -= trade_value
+            if self.cash >= trade_value + fee:
+                self.cash -= trade_value + fee
+                self._cost_basis[symbol] = self._cost_basis.get(symbol, 0.0) + trade_value + fee
                 
                 if symbol in self.positions:
                     # Update existing position
@@ -60,36 +88,67 @@ class PortfolioManager:
                     action=action.upper(),
                     quantity=quantity,
                     price=price,
-                    timestamp=datetime.now()
+                    commission=fee,
+                    timestamp=timestamp or datetime.now()
                 )
                 self.trades.append(trade)
+                self.total_commission += fee
                 return trade
             else:
                 raise ValueError("Insufficient cash for purchase")
                 
         elif action.upper() == "SELL":
             if symbol in self.positions and self.positions[symbol].quantity >= quantity:
-                self.cash += trade_value
+                self.cash += trade_value - fee
                 pos = self.positions[symbol]
+                cost = self._cost_basis.get(symbol, 0.0) * quantity / pos.quantity
+                self.metrics.record_trade(trade_value - fee - cost)
+                self._cost_basis[symbol] = self._cost_basis.get(symbol, 0.0) - cost
                 pos.quantity -= quantity
                 
                 if pos.quantity == 0:
                     del self.positions[symbol]
+                    del self._cost_basis[symbol]
                 
                 trade = Trade(
                     symbol=symbol,
                     action=action.upper(),
                     quantity=quantity,
                     price=price,
-                    timestamp=datetime.now()
+                    commission=fee,
+                    timestamp=timestamp or datetime.now()
                 )
                 self.trades.append(trade)
+                self.total_commission += fee
                 return trade
             else:
                 raise ValueError("Insufficient shares to sell")
         
         raise ValueError(f"Invalid action: {action}")
     
+    def record_equity(self, summary: Optional[Portfolio] = None) -> Dict[str, Any]:
+        """Feed the current valuation into the running metrics and return them"""
+        summary = summary or self.get_portfolio_summary()
+        self.metrics.update(summary.total_value, summary.total_value - summary.cash)
+        return self.metrics.snapshot()
+    
+    def apply_signal(
+        self, symbol: str, signal: int, quantity: int, price: float, timestamp: Optional[datetime] = None
+    ) -> Optional[Trade]:
+        """Mark ``symbol`` at ``price`` and trade ``quantity`` on a +1/-1 signal.
+
+        This is the per-candle trading step shared by live streams and the
+        event-driven backtest; returns None when nothing was filled.
+        """
+        self.update_position_prices({symbol: price})
+        action = SIGNAL_ACTIONS.get(signal)
+        if action is None:
+            return None
+        try:
+            return self.execute_trade(symbol, action, quantity, price, timestamp)
+        except ValueError:
+            return None  # Insufficient funds or shares
+    
     def update_position_prices(self, price_updates: Dict[str, float]):
         """Update current prices for positions"""
         for symbol, price in price_updates.items():
@@ -102,4 +161,7 @@ class PortfolioManager:
         """Reset portfolio to initial state"""
         self.cash = self.initial_cash
         self.positions = {}
+        self._cost_basis = {}
         self.trades = []
+        self.total_commission = 0.0
+        self.metrics.reset()
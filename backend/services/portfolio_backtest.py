@@ -0,0 +1,161 @@
+"""Backtest one strategy across many symbols sharing a single cash balance.
+
+Symbols are aligned on the union of their timestamps (a close panel with
+one column per symbol). The simulation only visits bars where some symbol
+has a signal and handles every symbol on such a bar with array operations:
+sells are filled first, then the freed cash is allocated across that bar's
+buys. Holdings are forward-filled from those fills and valued against the
+panel in one pass, so cost grows with the number of signal bars rather
+than bars times symbols.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import BacktestEngine, BacktestResult, EquityCurve
+from .strategies import StrategyFactory
+
+# equal_weight: each buy targets equity / number of symbols, capped by cash.
+# cash_split: the cash on hand is split evenly across the bar's buys, which
+# for a single symbol matches BacktestEngine's all-in buys.
+ALLOCATIONS = ("equal_weight", "cash_split")
+
+
+@dataclass
+class PortfolioBacktestResult(BacktestResult):
+  symbols: List[str] = field(default_factory=list)
+  # Shares held per bar (rows) and symbol (columns)
+  positions: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.int64))
+
+  def final_positions(self) -> Dict[str, int]:
+    if not len(self.positions):
+      return {symbol: 0 for symbol in self.symbols}
+    return {symbol: int(shares) for symbol, shares in zip(self.symbols, self.positions[-1])}
+
+
+def close_panel(frames: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+  """Closes with one column per symbol on the union of all timestamps;
+  bars a symbol does not have are NaN."""
+  return pd.concat({symbol: frame["close"] for symbol, frame in frames.items()}, axis=1).sort_index()
+
+
+def signal_panel(
+  frames: Mapping[str, pd.DataFrame],
+  index: pd.Index,
+  strategy_name: str,
+  params: Dict[str, float],
+) -> np.ndarray:
+  """Each symbol's signals, computed on its own bars, placed on ``index``."""
+  strategy_cls = StrategyFactory.get(strategy_name)
+  signals = np.zeros((len(index), len(frames)), dtype=np.int8)
+  for column, frame in enumerate(frames.values()):
+    if len(frame):
+      signals[index.get_indexer(frame.index), column] = strategy_cls.evaluate_batch(frame, [params])[0]
+  return signals
+
+
+class PortfolioBacktestEngine(BacktestEngine):
+  def __init__(self, initial_cash: float = 100000.0, allocation: str = "equal_weight"):
+    if allocation not in ALLOCATIONS:
+      raise ValueError(f"Unknown allocation: {allocation}; expected one of {', '.join(ALLOCATIONS)}")
+    super().__init__(initial_cash)
+    self.allocation = allocation
+    self.positions = np.zeros((0, 0), dtype=np.int64)
+
+  def run_portfolio(
+    self, frames: Mapping[str, pd.DataFrame], strategy_name: str, **strategy_params
+  ) -> PortfolioBacktestResult:
+    if not frames:
+      raise ValueError("A portfolio backtest needs at least one symbol")
+    close = close_panel(frames)
+    signals = signal_panel(frames, close.index, strategy_name, strategy_params)
+    return self.run_panel(close, signals)
+
+  def run_panel(self, close: pd.DataFrame, signals: np.ndarray) -> PortfolioBacktestResult:
+    """Simulate from a close panel and a same-shaped signal array."""
+    self.reset()
+    symbols = [str(column) for column in close.columns]
+    prices = close.to_numpy(dtype=np.float64)
+    # Holdings are valued at their last known close
+    marks = close.ffill().fillna(0.0).to_numpy(dtype=np.float64)
+    signals = np.asarray(signals)
+    positions = np.zeros(len(symbols), dtype=np.int64)
+
+    fill_bars: List[int] = []
+    cash_levels: List[float] = []
+    position_levels: List[np.ndarray] = []
+    for bar in np.flatnonzero((signals != 0).any(axis=1)):
+      signal, price = signals[bar], prices[bar]
+      tradable = np.isfinite(price) & (price > 0)
+      sells = np.flatnonzero((signal == -1) & (positions > 0) & tradable)
+      buys = np.flatnonzero((signal == 1) & (positions <= 0) & tradable)
+      if not len(sells) and not len(buys):
+        continue
+      timestamp = close.index[bar]
+
+      if len(sells):
+        proceeds = positions[sells] * price[sells]
+        self.cash += float(proceeds.sum())
+        self._record(timestamp, "SELL", symbols, sells, price, positions[sells], proceeds)
+        positions[sells] = 0
+
+      if len(buys):
+        quantity = (self._budgets(buys, positions, marks[bar]) // price[buys]).astype(np.int64)
+        filled = quantity > 0
+        buys, quantity = buys[filled], quantity[filled]
+        cost = quantity * price[buys]
+        self.cash -= float(cost.sum())
+        self._record(timestamp, "BUY", symbols, buys, price, quantity, cost)
+        positions[buys] += quantity
+
+      fill_bars.append(bar)
+      cash_levels.append(self.cash)
+      position_levels.append(positions.copy())
+
+    # State after the most recent fill at or before each bar; 0 = initial
+    level = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(len(close)), side="right")
+    cash = np.r_[self.initial_cash, cash_levels][level]
+    self.positions = np.vstack([np.zeros((1, len(symbols)), dtype=np.int64), *position_levels])[level]
+    position_value = np.einsum("ij,ij->i", self.positions, marks)
+    self.equity = cash + position_value
+    self.equity_curve = EquityCurve(close.index, self.equity, cash, position_value)
+
+    result = self._calculate_metrics(close)
+    return PortfolioBacktestResult(**vars(result), symbols=symbols, positions=self.positions)
+
+  def _budgets(self, buys: np.ndarray, positions: np.ndarray, marks: np.ndarray) -> np.ndarray:
+    """Cash to spend on each buying symbol; never more than the cash on hand."""
+    even_split = self.cash / len(buys)
+    if self.allocation == "cash_split":
+      return np.full(len(buys), even_split)
+    equity = self.cash + float(positions @ marks)
+    return np.full(len(buys), min(equity / len(positions), even_split))
+
+  def _record(
+    self,
+    timestamp,
+    side: str,
+    symbols: List[str],
+    columns: np.ndarray,
+    price: np.ndarray,
+    quantity: np.ndarray,
+    value: np.ndarray,
+  ) -> None:
+    for column, shares, amount in zip(columns, quantity, value):
+      self.trades.append({
+        "timestamp": timestamp,
+        "symbol": symbols[column],
+        "type": side,
+        "price": float(price[column]),
+        "quantity": int(shares),
+        "value": float(amount),
+      })
+
+  def reset(self):
+    super().reset()
+    self.positions = np.zeros((0, 0), dtype=np.int64)
+
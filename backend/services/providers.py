@@ -0,0 +1,75 @@
+"""Sources of historical candles for symbols that are not stored locally.
+
+``settings.market_data_provider`` picks one: ``yfinance`` downloads from
+Yahoo Finance, ``stub`` generates a deterministic random walk per symbol so
+the API and streams work offline and in tests.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+
+Provider = Callable[[str], pd.DataFrame]
+
+
+def yfinance_provider(symbol: str) -> pd.DataFrame:
+  try:
+    import yfinance as yf
+  except ImportError as exc:
+    raise RuntimeError(
+      "yfinance is required to download data; install backend requirements."
+    ) from exc
+
+  data = yf.download(symbol, period="6mo", interval="1d")
+  if data.empty:
+    raise ValueError(f"No data received for symbol {symbol}")
+
+  data = data.reset_index().rename(
+    columns={
+      "Date": "timestamp",
+      "Open": "open",
+      "High": "high",
+      "Low": "low",
+      "Close": "close",
+      "Volume": "volume",
+    }
+  )
+  data["timestamp"] = pd.to_datetime(data["timestamp"])
+  return data
+
+
+def stub_provider(symbol: str, periods: int = 126) -> pd.DataFrame:
+  """About six months of daily candles ending today; same symbol, same prices."""
+  rng = np.random.default_rng(zlib.crc32(symbol.upper().encode()))
+  timestamps = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=periods)
+  close = 50 + 150 * rng.random() * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+  open_ = np.r_[close[0], close[:-1]]
+  spread = np.abs(rng.normal(0, 0.01, periods)) * close
+  return pd.DataFrame(
+    {
+      "timestamp": timestamps,
+      "open": open_,
+      "high": np.maximum(open_, close) + spread,
+      "low": np.minimum(open_, close) - spread,
+      "close": close,
+      "volume": rng.integers(500_000, 2_000_000, periods).astype(float),
+    }
+  )
+
+
+PROVIDERS: Dict[str, Provider] = {
+  "yfinance": yfinance_provider,
+  "stub": stub_provider,
+}
+
+
+def get_provider(name: str = settings.market_data_provider) -> Provider:
+  try:
+    return PROVIDERS[name]
+  except KeyError as exc:
+    raise ValueError(f"Unknown market data provider: {name}") from exc
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..config import settings
+from .lru_cache import LRUCache
+from .market_data import SingleFlight
+from .wire_format import json_bytes
+
+
+def make_etag(*parts: Any) -> str:
+  """Strong ETag hashed from everything that determines a response body."""
+  return '"' + hashlib.sha256(json_bytes(parts)).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  if not if_none_match:
+    return False
+  candidates = {tag.strip() for tag in if_none_match.split(",")}
+  return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+  """Conditional GET/POST support plus a TTL'd, size-bounded body cache.
+
+  Callers describe a response by its key parts (endpoint, symbol, data
+  version, range, strategy, parameters, ...). Their hash is the ETag, so an
+  ``If-None-Match`` hit is answered with 304 before anything is loaded or
+  computed; otherwise the encoded body is served from the cache or built
+  once (concurrent identical misses share one build).
+  """
+
+  def __init__(
+    self,
+    max_bytes: int = settings.response_cache_max_bytes,
+    ttl: Optional[float] = settings.response_cache_ttl,
+  ):
+    self._bodies: LRUCache[bytes] = LRUCache(max_bytes=max_bytes, sizeof=len, ttl=ttl)
+    self._flights = SingleFlight()
+    self.not_modified = 0
+
+  async def respond(
+    self,
+    request: Request,
+    key: tuple,
+    build: Callable[[], Awaitable[bytes]],
+    media_type: str = "application/json",
+  ) -> Response:
+    etag = make_etag(*key)
+    # Let clients keep the body but revalidate it on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+      self.not_modified += 1
+      return Response(status_code=304, headers=headers)
+
+    body = self._bodies.get(etag)
+    if body is None:
+      body = await self._flights.do(etag, lambda: self._build(etag, build))
+    return Response(content=body, media_type=media_type, headers=headers)
+
+  async def _build(self, etag: str, build: Callable[[], Awaitable[bytes]]) -> bytes:
+    body = await build()
+    self._bodies.put(etag, body)
+    return body
+
+  def clear(self) -> None:
+    self._bodies.clear()
+
+  def stats(self) -> Dict[str, Any]:
+    return {**self._bodies.stats(), "not_modified": self.not_modified}
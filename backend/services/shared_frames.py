@@ -0,0 +1,90 @@
+"""Arrays handed to worker processes through shared memory instead of pickles.
+
+The parent packs named arrays into one ``SharedMemory`` block and sends
+workers only the small ``SharedSpec`` describing it. Each worker attaches
+once and caches read-only views, so every task on that worker reuses the
+same pages without copying the price history.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .market_data import frozen_frame
+
+ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class SharedSpec:
+  name: str
+  # (key, dtype string, shape, byte offset) per array
+  arrays: Tuple[Tuple[str, str, Tuple[int, ...], int], ...]
+
+
+class SharedArrays:
+  """Owner of a shared block; use as a context manager so it is unlinked."""
+
+  def __init__(self, arrays: Mapping[str, np.ndarray]):
+    layout = []
+    size = 0
+    for key, values in arrays.items():
+      values = np.ascontiguousarray(values)
+      layout.append((key, values.dtype.str, values.shape, size))
+      size += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    self._shm = SharedMemory(create=True, size=max(size, 1))
+    for (key, dtype, shape, offset), values in zip(layout, arrays.values()):
+      np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)[...] = values
+    self.spec = SharedSpec(self._shm.name, tuple(layout))
+
+  def close(self) -> None:
+    self._shm.close()
+    self._shm.unlink()
+
+  def __enter__(self) -> "SharedArrays":
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
+
+
+def share_frame(df: pd.DataFrame) -> SharedArrays:
+  """Share a market data frame's timestamps and numeric columns."""
+  arrays = {"timestamp": pd.DatetimeIndex(df.index).values}
+  for name in df.columns:
+    if pd.api.types.is_numeric_dtype(df[name]):
+      arrays[name] = df[name].to_numpy()
+  return SharedArrays(arrays)
+
+
+# Worker side: spec name -> (handle, views, frame built from them)
+_attached: Dict[str, Tuple[SharedMemory, Dict[str, np.ndarray], pd.DataFrame]] = {}
+
+
+def _attach(spec: SharedSpec) -> Tuple[SharedMemory, Dict[str, np.ndarray], pd.DataFrame]:
+  entry = _attached.get(spec.name)
+  if entry is None:
+    # Pool workers share the parent's resource tracker, so attaching adds
+    # no registration of its own; the creating process unlinks the block
+    shm = SharedMemory(name=spec.name)
+    views = {}
+    for key, dtype, shape, offset in spec.arrays:
+      values = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+      values.flags.writeable = False
+      views[key] = values
+    frame = frozen_frame(dict(views)) if "timestamp" in views else pd.DataFrame()
+    entry = _attached[spec.name] = (shm, views, frame)
+  return entry
+
+
+def attach_arrays(spec: SharedSpec) -> Dict[str, np.ndarray]:
+  return _attach(spec)[1]
+
+
+def attach_frame(spec: SharedSpec) -> pd.DataFrame:
+  """The frame shared with ``share_frame``; read-only and cached per worker."""
+  return _attach(spec)[2]
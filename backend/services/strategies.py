@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Type
+from typing import Any, Dict, List, Mapping, Sequence, Type
 
 import numpy as np
 import pandas as pd
 
+from .indicators import Ema, Rsi, Sma, ema_matrix, rolling_mean_matrix, rsi_matrix
+
+# Upper bound on cells in one (parameter set x row) float matrix built by
+# ``evaluate_batch``; larger batches are processed in blocks of rows.
+BATCH_MAX_CELLS = 20_000_000
+
 
 @dataclass
 class StrategyDefinition:
@@ -27,6 +33,54 @@ class StrategyBase:
   def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
     raise NotImplementedError
 
+  def stream(self) -> "StrategyStream":
+    """Return fresh incremental state producing the same signals as ``evaluate``."""
+    raise NotImplementedError
+
+  @classmethod
+  def evaluate_batch(
+    cls, df: pd.DataFrame, param_sets: Sequence[Dict[str, float]]
+  ) -> np.ndarray:
+    """Signals for many parameter sets at once.
+
+    Returns an int8 matrix of shape ``(len(param_sets), len(df))`` whose rows
+    equal ``cls(params).evaluate(df)["signal"]``. Subclasses override this to
+    share indicator work across parameter sets; the default evaluates each
+    set in turn.
+    """
+    signals = np.zeros((len(param_sets), len(df)), dtype=np.int8)
+    for row, params in enumerate(param_sets):
+      signals[row] = cls(params).evaluate(df)["signal"].to_numpy()
+    return signals
+
+  @classmethod
+  def _batch_params(
+    cls, param_sets: Sequence[Dict[str, float]], *names: str
+  ) -> List[np.ndarray]:
+    """One array per parameter name, defaults filled in."""
+    merged = [{**cls.default_parameters, **params} for params in param_sets]
+    return [np.array([float(params[name]) for params in merged]) for name in names]
+
+  @staticmethod
+  def _batch_blocks(n_sets: int, n_rows: int) -> List[slice]:
+    size = max(1, BATCH_MAX_CELLS // max(n_rows, 1))
+    return [slice(start, start + size) for start in range(0, n_sets, size)]
+
+  @staticmethod
+  def _crossings(
+    signals: np.ndarray, current: np.ndarray, buy: np.ndarray, sell: np.ndarray
+  ) -> None:
+    """Write +1/-1 where ``current`` rises through ``buy`` / falls through ``sell``.
+
+    Matches the ``evaluate`` masks: sells are assigned after buys, so they win.
+    """
+    previous = np.empty_like(current)
+    previous[:, 0] = np.nan
+    previous[:, 1:] = current[:, :-1]
+    with np.errstate(invalid="ignore"):
+      signals[(current >= buy) & (previous < buy)] = 1
+      signals[(current <= sell) & (previous > sell)] = -1
+
   @staticmethod
   def build_signal_payload(value: int, reason: str) -> Dict[str, str] | None:
     if value == 1:
@@ -40,6 +94,78 @@ class StrategyBase:
     return self.build_signal_payload(signal_value, row.get("signal_reason", ""))
 
 
+class StrategyStream:
+  """Running indicator state for one strategy on one symbol.
+
+  ``update`` folds in a single candle in constant time and returns the same
+  ``indicators`` / ``signal`` / ``signal_reason`` values that ``evaluate``
+  would produce for that row.
+  """
+
+  def __init__(self, strategy: StrategyBase):
+    self.strategy = strategy
+
+  def update(self, candle: Mapping[str, Any]) -> Dict[str, Any]:
+    raise NotImplementedError
+
+  def warm(self, df: pd.DataFrame) -> Dict[str, Any] | None:
+    latest = None
+    for close in df["close"].to_numpy(dtype=float):
+      latest = self.update({"close": close})
+    return latest
+
+  @staticmethod
+  def _result(indicators: Dict[str, float], signal: int, reason: str) -> Dict[str, Any]:
+    return {
+      "indicators": {k: (None if np.isnan(v) else v) for k, v in indicators.items()},
+      "signal": signal,
+      "signal_reason": reason,
+    }
+
+
+class SmaEmaStream(StrategyStream):
+  def __init__(self, strategy: StrategyBase):
+    super().__init__(strategy)
+    self.sma = Sma(int(strategy.params["short_window"]))
+    self.ema = Ema(int(strategy.params["long_window"]))
+    self._prev_sma = np.nan
+    self._prev_ema = np.nan
+
+  def update(self, candle: Mapping[str, Any]) -> Dict[str, Any]:
+    close = float(candle["close"])
+    sma = self.sma.update(close)
+    ema = self.ema.update(close)
+    prev_sma, prev_ema = self._prev_sma, self._prev_ema
+    self._prev_sma, self._prev_ema = sma, ema
+
+    signal, reason = 0, ""
+    if sma <= ema and prev_sma > prev_ema:
+      signal, reason = -1, "SMA crossed below EMA"
+    elif sma >= ema and prev_sma < prev_ema:
+      signal, reason = 1, "SMA crossed above EMA"
+    return self._result({"indicator_sma": sma, "indicator_ema": ema}, signal, reason)
+
+
+class RsiMomentumStream(StrategyStream):
+  def __init__(self, strategy: StrategyBase):
+    super().__init__(strategy)
+    self.rsi = Rsi(int(strategy.params["period"]), method="simple")
+    self.oversold = float(strategy.params["oversold"])
+    self.overbought = float(strategy.params["overbought"])
+    self._prev_rsi = np.nan
+
+  def update(self, candle: Mapping[str, Any]) -> Dict[str, Any]:
+    rsi = self.rsi.update(float(candle["close"]))
+    prev_rsi, self._prev_rsi = self._prev_rsi, rsi
+
+    signal, reason = 0, ""
+    if rsi <= self.overbought and prev_rsi > self.overbought:
+      signal, reason = -1, "RSI exited overbought zone"
+    elif rsi >= self.oversold and prev_rsi < self.oversold:
+      signal, reason = 1, "RSI exited oversold zone"
+    return self._result({"indicator_rsi": rsi}, signal, reason)
+
+
 class SmaEmaStrategy(StrategyBase):
   name = "sma_ema"
   label = "SMA / EMA Crossover"
@@ -70,6 +196,30 @@ class SmaEmaStrategy(StrategyBase):
     data.loc[sell_mask, "signal_reason"] = "SMA crossed below EMA"
     return data
 
+  def stream(self) -> StrategyStream:
+    return SmaEmaStream(self)
+
+  @classmethod
+  def evaluate_batch(
+    cls, df: pd.DataFrame, param_sets: Sequence[Dict[str, float]]
+  ) -> np.ndarray:
+    """Each distinct SMA window and EMA span is computed once and shared by
+    every parameter set that uses it."""
+    short, long = cls._batch_params(param_sets, "short_window", "long_window")
+    short, long = short.astype(int), long.astype(int)
+    close = df["close"].to_numpy(dtype=np.float64)
+    windows, short_rows = np.unique(short, return_inverse=True)
+    spans, long_rows = np.unique(long, return_inverse=True)
+    sma = rolling_mean_matrix(close, windows)
+    ema = ema_matrix(close, spans)
+
+    signals = np.zeros((len(param_sets), len(close)), dtype=np.int8)
+    for block in cls._batch_blocks(len(param_sets), len(close)):
+      # sma >= ema  <=>  sma - ema >= 0, so crossings of the spread against 0
+      spread = sma[short_rows[block]] - ema[long_rows[block]]
+      cls._crossings(signals[block], spread, 0.0, 0.0)
+    return signals
+
 
 class RsiMomentumStrategy(StrategyBase):
   name = "rsi_momentum"
@@ -112,6 +262,32 @@ class RsiMomentumStrategy(StrategyBase):
     data.loc[sell_mask, "signal_reason"] = "RSI exited overbought zone"
     return data
 
+  def stream(self) -> StrategyStream:
+    return RsiMomentumStream(self)
+
+  @classmethod
+  def evaluate_batch(
+    cls, df: pd.DataFrame, param_sets: Sequence[Dict[str, float]]
+  ) -> np.ndarray:
+    """Price changes are computed once; each distinct period gets one RSI row
+    shared by all oversold/overbought thresholds."""
+    period, oversold, overbought = cls._batch_params(
+      param_sets, "period", "oversold", "overbought"
+    )
+    close = df["close"].to_numpy(dtype=np.float64)
+    periods, period_rows = np.unique(period.astype(int), return_inverse=True)
+    rsi = rsi_matrix(close, periods)
+
+    signals = np.zeros((len(param_sets), len(close)), dtype=np.int8)
+    for block in cls._batch_blocks(len(param_sets), len(close)):
+      cls._crossings(
+        signals[block],
+        rsi[period_rows[block]],
+        oversold[block, None],
+        overbought[block, None],
+      )
+    return signals
+
 
 class StrategyFactory:
   _registry: Dict[str, Type[StrategyBase]] = {
@@ -121,11 +297,14 @@ class StrategyFactory:
 
   @classmethod
   def create(cls, name: str, params: Dict[str, float] | None = None) -> StrategyBase:
+    return cls.get(name)(params)
+
+  @classmethod
+  def get(cls, name: str) -> Type[StrategyBase]:
     try:
-      strategy_cls = cls._registry[name]
+      return cls._registry[name]
     except KeyError as exc:
       raise ValueError(f"Unknown strategy: {name}") from exc
-    return strategy_cls(params)
 
   @classmethod
   def catalog(cls) -> List[StrategyDefinition]:
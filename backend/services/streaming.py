@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from .candle_buffer import CandleRingBuffer
+from .market_data import MarketDataService
+from .portfolio import PortfolioManager
+from .strategies import StrategyBase, StrategyFactory, StrategyStream
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[..., Awaitable[None]]
+
+
+class SymbolStream:
+  """Pseudo-live candle generator and strategy state for a single symbol.
+
+  All per-tick work in ``tick`` is constant time (one ring-buffer append and
+  one incremental update per strategy), so many streams can share one event
+  loop. Loading and warming history is pushed to a worker thread.
+  """
+
+  def __init__(
+    self,
+    symbol: str,
+    strategies: Dict[str, StrategyBase],
+    portfolio_manager: PortfolioManager,
+    publish: Publisher,
+    interval: float = settings.stream_interval,
+    window: int = settings.stream_window,
+    trade_strategy: str = "sma_ema",
+    trade_units: int = settings.default_units,
+  ):
+    self.symbol = symbol
+    self.strategies = strategies
+    self.portfolio_manager = portfolio_manager
+    self.publish = publish
+    self.interval = interval
+    self.trade_strategy = trade_strategy
+    self.trade_units = trade_units
+    self.candles = CandleRingBuffer(capacity=window)
+    self.strategy_streams: Dict[str, StrategyStream] = {}
+    # Latest full market_data snapshot and its delta from the previous tick
+    self.state: Optional[Dict[str, Any]] = None
+    self.delta: Optional[Dict[str, Any]] = None
+    self.task: Optional[asyncio.Task] = None
+    self._rng = np.random.default_rng()
+
+  @property
+  def running(self) -> bool:
+    return self.task is not None and not self.task.done()
+
+  def prime(self) -> None:
+    """Load history into the buffer and warm each strategy (blocking)."""
+    try:
+      history = MarketDataService.load_dataframe(self.symbol)
+    except Exception as exc:  # noqa: BLE001 - fall back to synthetic prices
+      logger.warning("No history for %s, streaming from scratch: %s", self.symbol, exc)
+      history = None
+
+    self.candles.clear()
+    self.strategy_streams = {}
+    if history is not None and not history.empty:
+      self.candles.extend_from_frame(history)
+    for name, strategy in self.strategies.items():
+      stream = strategy.stream()
+      if history is not None and not history.empty:
+        stream.warm(history)
+      self.strategy_streams[name] = stream
+
+  def next_candle(self) -> Dict[str, Any]:
+    """Generate next candle based on last price with some randomness."""
+    base_price = 150.0 if self.candles.empty else self.candles.last("close")
+    rng = self._rng
+
+    change_percent = rng.normal(0, 0.02)  # 2% volatility
+    close = base_price * (1 + change_percent)
+
+    high_low_range = abs(change_percent) * base_price * 2
+    high = max(base_price, close) + rng.uniform(0, high_low_range)
+    low = min(base_price, close) - rng.uniform(0, high_low_range)
+    open_ = base_price + rng.uniform(-high_low_range / 2, high_low_range / 2)
+    volume = int(1_000_000 * rng.uniform(0.5, 2.0))
+
+    candle = {
+      "timestamp": datetime.now(timezone.utc),
+      "open": float(open_),
+      "high": float(high),
+      "low": float(low),
+      "close": float(close),
+      "volume": volume,
+    }
+    self.candles.append(**candle)
+    return candle
+
+  def tick(self) -> List[Dict[str, Any]]:
+    """Advance one candle and return the messages to publish for it."""
+    candle = self.next_candle()
+    messages: List[Dict[str, Any]] = []
+
+    signals: Dict[str, int] = {}
+    for name, stream in self.strategy_streams.items():
+      try:
+        result = stream.update(candle)
+      except Exception:  # noqa: BLE001 - one bad strategy must not stop the feed
+        logger.exception("Strategy %s failed on %s", name, self.symbol)
+        signals[name] = 0
+        continue
+      signals[name] = result["signal"]
+      payload = StrategyBase.build_signal_payload(result["signal"], result["signal_reason"])
+      if payload:
+        messages.append(
+          {
+            "type": "signal",
+            "symbol": self.symbol,
+            "strategy": name,
+            "timestamp": candle["timestamp"].isoformat(),
+            "price": candle["close"],
+            **payload,
+          }
+        )
+
+    price = candle["close"]
+    trade = self.portfolio_manager.apply_signal(
+      self.symbol, signals.get(self.trade_strategy, 0), self.trade_units, price, candle["timestamp"]
+    )
+    if trade is not None:
+      messages.append(
+        {
+          "type": "trade_executed",
+          "symbol": self.symbol,
+          "trade": {
+            "symbol": trade.symbol,
+            "action": trade.action,
+            "quantity": trade.quantity,
+            "price": trade.price,
+            "timestamp": trade.timestamp.isoformat(),
+          },
+        }
+      )
+
+    summary = self.portfolio_manager.get_portfolio_summary()
+    performance = self.portfolio_manager.record_equity(summary)
+    messages.append(
+      self._market_update(
+        {
+          "timestamp": candle["timestamp"].isoformat(),
+          "open": candle["open"],
+          "high": candle["high"],
+          "low": candle["low"],
+          "close": candle["close"],
+          "volume": candle["volume"],
+        },
+        signals,
+        {
+          "cash": summary.cash,
+          "total_value": summary.total_value,
+          "total_pnl": summary.total_pnl,
+          "metrics": performance,
+        },
+      )
+    )
+    return messages
+
+  def _market_update(
+    self,
+    candle: Dict[str, Any],
+    signals: Dict[str, int],
+    portfolio: Dict[str, Any],
+  ) -> Dict[str, Any]:
+    """Record the new full state and delta; return the default market_data message.
+
+    The default message always carries the candle and signals but only
+    includes the portfolio block when it changed since the previous tick.
+    """
+    previous = self.state
+    self.state = {
+      "type": "market_data",
+      "symbol": self.symbol,
+      "candle": candle,
+      "signals": signals,
+      "portfolio": portfolio,
+    }
+
+    self.delta = {"type": "market_delta", "symbol": self.symbol, "candle": candle}
+    changed_signals = {
+      name: value
+      for name, value in signals.items()
+      if previous is None or previous["signals"].get(name) != value
+    }
+    if changed_signals:
+      self.delta["signals"] = changed_signals
+    # Running metrics move on every mark, so they ride along with a
+    # valuation change instead of counting as one
+    changed_portfolio = {
+      field: value
+      for field, value in portfolio.items()
+      if field != "metrics" and (previous is None or previous["portfolio"].get(field) != value)
+    }
+    if changed_portfolio:
+      if "metrics" in portfolio:
+        changed_portfolio["metrics"] = portfolio["metrics"]
+      self.delta["portfolio"] = changed_portfolio
+
+    if changed_portfolio:
+      return self.state
+    return {key: value for key, value in self.state.items() if key != "portfolio"}
+
+  async def run(self) -> None:
+    loop = asyncio.get_running_loop()
+    # Spread streams across the interval so hundreds of symbols don't all
+    # wake on the same loop iteration.
+    deadline = loop.time() + self._rng.uniform(0, self.interval)
+    while True:
+      await asyncio.sleep(max(0.0, deadline - loop.time()))
+      deadline += self.interval
+      try:
+        for message in self.tick():
+          if message["type"] == "market_data":
+            await self.publish(message, full=self.state, delta=self.delta)
+          else:
+            await self.publish(message)
+      except asyncio.CancelledError:
+        raise
+      except Exception:  # noqa: BLE001 - keep streaming after a bad tick
+        logger.exception("Error in streaming loop for %s", self.symbol)
+      if loop.time() > deadline:
+        # Fell behind (slow publish); skip missed ticks instead of bursting.
+        deadline = loop.time() + self.interval
+
+
+class StreamSupervisor:
+  """Runs one independent asyncio task per streamed symbol."""
+
+  def __init__(
+    self,
+    publish: Publisher,
+    portfolio_manager: PortfolioManager,
+    max_streams: int = settings.max_streams,
+  ):
+    self.publish = publish
+    self.portfolio_manager = portfolio_manager
+    self.max_streams = max_streams
+    self.streams: Dict[str, SymbolStream] = {}
+
+  def active_symbols(self) -> List[str]:
+    return sorted(symbol for symbol, stream in self.streams.items() if stream.running)
+
+  def is_streaming(self, symbol: str) -> bool:
+    stream = self.streams.get(symbol.upper())
+    return stream is not None and stream.running
+
+  async def start(self, symbol: str) -> SymbolStream:
+    symbol = symbol.upper()
+    existing = self.streams.get(symbol)
+    if existing is not None:
+      raise ValueError(f"Already streaming {symbol}")
+    if len(self.streams) >= self.max_streams:
+      raise ValueError(f"Stream limit of {self.max_streams} symbols reached")
+
+    strategies = {
+      definition.name: StrategyFactory.create(definition.name)
+      for definition in StrategyFactory.catalog()
+    }
+    stream = SymbolStream(symbol, strategies, self.portfolio_manager, self.publish)
+    # Reserve the slot before awaiting so concurrent starts can't race.
+    self.streams[symbol] = stream
+    try:
+      await asyncio.to_thread(stream.prime)
+    except BaseException:
+      self.streams.pop(symbol, None)
+      raise
+    if self.streams.get(symbol) is not stream:
+      raise ValueError(f"Streaming for {symbol} was stopped while starting")
+    stream.task = asyncio.create_task(stream.run(), name=f"stream:{symbol}")
+    stream.task.add_done_callback(lambda _task, s=symbol: self._on_done(s, stream))
+    return stream
+
+  def _on_done(self, symbol: str, stream: SymbolStream) -> None:
+    if self.streams.get(symbol) is stream:
+      del self.streams[symbol]
+
+  async def stop(self, symbol: str) -> None:
+    stream = self.streams.pop(symbol.upper(), None)
+    if stream is None:
+      raise ValueError(f"Not streaming {symbol.upper()}")
+    if stream.task is not None:
+      stream.task.cancel()
+      await asyncio.gather(stream.task, return_exceptions=True)
+
+  async def stop_all(self) -> None:
+    for symbol in list(self.streams):
+      await self.stop(symbol)
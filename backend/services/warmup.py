@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from .market_data import MarketDataService
+from .strategies import StrategyFactory
+
+logger = logging.getLogger(__name__)
+
+
+def configured_symbols() -> List[str]:
+  """``settings.warmup_symbols``, else ``supported_symbols`` from the sample config."""
+  if settings.warmup_symbols is not None:
+    return [symbol.upper() for symbol in settings.warmup_symbols]
+  try:
+    config = json.loads(settings.sample_config_path.read_text())
+    symbols = config["trading_config"]["supported_symbols"]
+  except (OSError, ValueError, KeyError) as exc:
+    logger.warning("No supported_symbols in %s: %s", settings.sample_config_path, exc)
+    symbols = [settings.default_symbol]
+  return [symbol.upper() for symbol in symbols]
+
+
+class WarmupStatus:
+  """Progress of the startup warm-up, reported by the health endpoints."""
+
+  def __init__(self):
+    self.state = "idle"  # idle -> warming -> ready
+    self.symbols: List[str] = []
+    self.loaded: List[str] = []
+    self.failed: Dict[str, str] = {}
+    self.started_at: Optional[float] = None
+    self.finished_at: Optional[float] = None
+
+  @property
+  def ready(self) -> bool:
+    return self.state == "ready"
+
+  def to_dict(self) -> Dict[str, Any]:
+    duration = None
+    if self.started_at is not None:
+      duration = (self.finished_at or time.monotonic()) - self.started_at
+    return {
+      "state": self.state,
+      "symbols": self.symbols,
+      "loaded": sorted(self.loaded),
+      "failed": self.failed,
+      "duration_seconds": duration,
+    }
+
+
+async def warm_up(symbols: List[str], status: WarmupStatus) -> WarmupStatus:
+  """Load ``symbols`` into the market data cache in parallel and precompute
+  every strategy's default indicators for them.
+
+  Failures are recorded per symbol and never abort the warm-up; the status
+  is ready once every symbol has been attempted.
+  """
+  status.state = "warming"
+  status.symbols = list(symbols)
+  status.started_at = time.monotonic()
+
+  async def warm(symbol: str) -> None:
+    try:
+      await MarketDataService.aload_dataframe(symbol)
+      for definition in StrategyFactory.catalog():
+        await MarketDataService.aevaluate(symbol, definition.name)
+    except Exception as exc:  # noqa: BLE001 - report and keep warming the rest
+      logger.warning("Warm-up failed for %s: %s", symbol, exc)
+      status.failed[symbol] = str(exc)
+    else:
+      status.loaded.append(symbol)
+
+  # Concurrency is bounded by the market data I/O pool
+  await asyncio.gather(*(warm(symbol) for symbol in symbols))
+  status.finished_at = time.monotonic()
+  status.state = "ready"
+  logger.info(
+    "Warm-up finished in %.2fs: %d loaded, %d failed",
+    status.finished_at - status.started_at,
+    len(status.loaded),
+    len(status.failed),
+  )
+  return status
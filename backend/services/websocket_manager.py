@@ -1,188 +1,167 @@
-import asyncio
-import json
-from typing import Dict, List, Set
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
-from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
 
-from .market_data import MarketDataService
-from .strategies import SMAStrategy, RSIStrategy, BollingerBandsStrategy
+from ..config import settings
+from .fanout import ClientConnection, fan_out
 from .portfolio import PortfolioManager
+from .streaming import StreamSupervisor
+
+# Message types a connection can subscribe to, per symbol
+MESSAGE_TYPES = ('market_data', 'trade_executed', 'signal', 'job')
+# Subscribed when a request names no types; job updates are opt-in
+DEFAULT_MESSAGE_TYPES = ('market_data', 'trade_executed', 'signal')
+ALL_SYMBOLS = '*'
+
+Topic = Tuple[str, str]
 
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
-        self.market_data_service = MarketDataService()
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # connection -> topics it subscribed to, and the reverse index used
+        # to route each published message to just its subscribers
+        self.subscriptions: Dict[WebSocket, Set[Topic]] = {}
+        self.topic_subscribers: Dict[Topic, Set[WebSocket]] = defaultdict(set)
         self.portfolio_manager = PortfolioManager()
-        self.strategies = {
-            'sma': SMAStrategy(),
-            'rsi': RSIStrategy(),
-            'bollinger': BollingerBandsStrategy()
-        }
-        self.is_streaming = False
-        self.current_data = pd.DataFrame()
+        self.supervisor = StreamSupervisor(self.publish, self.portfolio_manager)
         
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection"""
+    @property
+    def active_connections(self) -> Set[WebSocket]:
+        return set(self.connections)
+
+    async def connect(self, websocket: WebSocket, policy: Optional[str] = None, encoding: str = "json"):
+        """Accept new WebSocket connection and start its writer task"""
+        connection = ClientConnection(
+            websocket,
+            max_queue=settings.ws_send_queue_size,
+            policy=policy or settings.ws_slow_consumer_policy,
+            on_close=self.disconnect,
+            encoding=encoding,
+        )
         await websocket.accept()
-        self.active_connections.add(websocket)
+        self.connections[websocket] = connection
+        self.subscriptions[websocket] = set()
+        connection.start()
         
     def disconnect(self, websocket: WebSocket):
-        """Remove WebSocket connection"""
-        self.active_connections.discard(websocket)
+        """Remove WebSocket connection and all of its subscriptions"""
+        connection = self.connections.pop(websocket, None)
+        if connection is not None:
+            connection.close()
+        for topic in self.subscriptions.pop(websocket, set()):
+            self._drop_subscriber(topic, websocket)
+
+    def _drop_subscriber(self, topic: Topic, websocket: WebSocket):
+        subscribers = self.topic_subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.topic_subscribers[topic]
+
+    @staticmethod
+    def _topics(symbols: Iterable[str], types: Optional[Iterable[str]]) -> Set[Topic]:
+        types = list(types or DEFAULT_MESSAGE_TYPES)
+        unknown = set(types) - set(MESSAGE_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown message types: {sorted(unknown)}")
+        return {(symbol.upper(), message_type) for symbol in symbols for message_type in types}
+
+    def subscribe(self, websocket: WebSocket, symbols: Iterable[str], types: Optional[Iterable[str]] = None):
+        """Subscribe a connection to message types for symbols ('*' for all symbols)"""
+        topics = self._topics(symbols, types)
+        self.subscriptions.setdefault(websocket, set()).update(topics)
+        for topic in topics:
+            self.topic_subscribers[topic].add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, symbols: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None):
+        """Drop matching subscriptions; no symbols means every subscribed
+        symbol and no types every message type"""
+        current = self.subscriptions.get(websocket, set())
+        if symbols is None:
+            symbols = {symbol for symbol, _ in current}
+        topics = self._topics(symbols, types or MESSAGE_TYPES) & current
+        current -= topics
+        for topic in topics:
+            self._drop_subscriber(topic, websocket)
+
+    def subscription_summary(self, websocket: WebSocket) -> Dict[str, List[str]]:
+        summary: Dict[str, List[str]] = defaultdict(list)
+        for symbol, message_type in sorted(self.subscriptions.get(websocket, set())):
+            summary[symbol].append(message_type)
+        return dict(summary)
+
+    def subscribers(self, symbol: str, message_type: str) -> Set[WebSocket]:
+        return (
+            self.topic_subscribers.get((symbol, message_type), set())
+            | self.topic_subscribers.get((ALL_SYMBOLS, message_type), set())
+        )
+
+    def _send(self, websockets: Iterable[WebSocket], message: dict, key=None) -> int:
+        """Serialize once per encoding and enqueue the shared frame on each connection's queue.
+
+        Never awaits a socket, so one slow client cannot delay the others or
+        the streaming tick that produced the message.
+        """
+        connections = [self.connections[ws] for ws in websockets if ws in self.connections]
+        if not connections:
+            return 0
+        return fan_out(connections, message, key)
+
+    async def publish(self, message: dict, full: Optional[dict] = None, delta: Optional[dict] = None):
+        """Send a symbol message only to connections subscribed to its topic.
+
+        For market data, ``full`` is the complete snapshot and ``delta`` the
+        change since the previous tick; clients that asked for deltas or a
+        max update rate get those merged per connection instead.
+        """
+        symbol, message_type = message['symbol'], message['type']
+        recipients = self.subscribers(symbol, message_type)
+        if not recipients:
+            return
+        if message_type != 'market_data' or full is None:
+            self._send(recipients, message)
+            return
+
+        shared, tailored = [], []
+        for websocket in recipients:
+            connection = self.connections.get(websocket)
+            if connection is not None:
+                (shared if connection.shares_market_frames else tailored).append(connection)
+        if shared:
+            # Only market data snapshots may be coalesced for slow consumers
+            fan_out(shared, message, (symbol, message_type), full=full)
+        frames = {}
+        for connection in tailored:
+            connection.offer_market(symbol, full, delta or full, frames)
+
+    def configure(self, websocket: WebSocket, delta: Optional[bool] = None, max_rate: Optional[float] = None):
+        """Switch a connection to delta updates and/or cap its market data rate"""
+        self.connections[websocket].configure(delta=delta, max_rate=max_rate)
         
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
-        if self.active_connections:
-            message_str = json.dumps(message, default=str)
-            disconnected = set()
-            
-            for connection in self.active_connections:
-                try:
-                    await connection.send_text(message_str)
-                except:
-                    disconnected.add(connection)
-            
-            # Remove disconnected clients
-            self.active_connections -= disconnected
+        self._send(list(self.connections), message)
+
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """Queue a reply for one client behind anything already pending for it"""
+        self._send([websocket], message)
+
+    @property
+    def streaming_symbols(self) -> List[str]:
+        return self.supervisor.active_symbols()
     
     async def start_streaming(self, symbol: str = "AAPL"):
-        """Start streaming market data and signals"""
-        if self.is_streaming:
-            return
-            
-        self.is_streaming = True
-        
-        # Load historical data
-        historical_data = await self.market_data_service.get_historical_data(symbol)
-        self.current_data = historical_data.copy()
-        
-        # Start streaming loop
-        asyncio.create_task(self._streaming_loop(symbol))
-        
-    async def stop_streaming(self):
-        """Stop streaming market data"""
-        self.is_streaming = False
+        """Start streaming market data and signals for one symbol.
+
+        Each symbol runs in its own task; raises ValueError if the symbol is
+        already streaming or the stream limit is reached.
+        """
+        await self.supervisor.start(symbol)
         
-    async def _streaming_loop(self, symbol: str):
-        """Main streaming loop that generates pseudo-live data"""
-        while self.is_streaming:
-            try:
-                # Generate next candle (simulate live data)
-                new_candle = self._generate_next_candle()
-                
-                # Add to current data
-                self.current_data = pd.concat([self.current_data, new_candle], ignore_index=True)
-                
-                # Keep only last 1000 candles for performance
-                if len(self.current_data) > 1000:
-                    self.current_data = self.current_data.tail(1000).reset_index(drop=True)
-                
-                # Generate signals from all strategies
-                signals = {}
-                for strategy_name, strategy in self.strategies.items():
-                    try:
-                        strategy_signals = strategy.generate_signals(self.current_data)
-                        if not strategy_signals.empty:
-                            latest_signal = strategy_signals.iloc[-1]['signal']
-                            signals[strategy_name] = int(latest_signal)
-                    except Exception as e:
-                        signals[strategy_name] = 0
-                
-                # Update portfolio prices
-                current_price = float(new_candle.iloc[0]['close'])
-                self.portfolio_manager.update_position_prices({symbol: current_price})
-                
-                # Execute trades based on signals (using SMA strategy for demo)
-                sma_signal = signals.get('sma', 0)
-                if sma_signal == 1:  # Buy signal
-                    try:
-                        trade = self.portfolio_manager.execute_trade(symbol, "BUY", 10, current_price)
-                        await self.broadcast({
-                            'type': 'trade_executed',
-                            'trade': {
-                                'symbol': trade.symbol,
-                                'action': trade.action,
-                                'quantity': trade.quantity,
-                                'price': trade.price,
-                                'timestamp': trade.timestamp.isoformat()
-                            }
-                        })
-                    except Exception as e:
-                        pass  # Insufficient funds or other error
-                elif sma_signal == -1:  # Sell signal
-                    try:
-                        trade = self.portfolio_manager.execute_trade(symbol, "SELL", 10, current_price)
-                        await self.broadcast({
-                            'type': 'trade_executed',
-                            'trade': {
-                                'symbol': trade.symbol,
-                                'action': trade.action,
-                                'quantity': trade.quantity,
-                                'price': trade.price,
-                                'timestamp': trade.timestamp.isoformat()
-                            }
-                        })
-                    except Exception as e:
-                        pass  # Insufficient shares or other error
-                
-                # Broadcast market data and signals
-                await self.broadcast({
-                    'type': 'market_data',
-                    'symbol': symbol,
-                    'candle': {
-                        'timestamp': new_candle.iloc[0]['timestamp'].isoformat(),
-                        'open': float(new_candle.iloc[0]['open']),
-                        'high': float(new_candle.iloc[0]['high']),
-                        'low': float(new_candle.iloc[0]['low']),
-                        'close': float(new_candle.iloc[0]['close']),
-                        'volume': int(new_candle.iloc[0]['volume'])
-                    },
-                    'signals': signals,
-                    'portfolio': {
-                        'cash': self.portfolio_manager.cash,
-                        'total_value': self.portfolio_manager.get_portfolio_summary().total_value,
-                        'total_pnl': self.portfolio_manager.get_portfolio_summary().total_pnl
-                    }
-                })
-                
-                # Wait for next update (simulate 1-second intervals)
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                print(f"Error in streaming loop: {e}")
-                await asyncio.sleep(1)
-    
-    def _generate_next_candle(self) -> pd.DataFrame:
-        """Generate next candle based on last price with some randomness"""
-        if self.current_data.empty:
-            # Generate initial candle
-            base_price = 150.0
+    async def stop_streaming(self, symbol: str = None):
+        """Stop streaming one symbol, or every symbol when none is given"""
+        if symbol is None:
+            await self.supervisor.stop_all()
         else:
-            base_price = self.current_data.iloc[-1]['close']
-        
-        # Generate random price movement
-        change_percent = np.random.normal(0, 0.02)  # 2% volatility
-        new_close = base_price * (1 + change_percent)
-        
-        # Generate OHLC
-        high_low_range = abs(change_percent) * base_price * 2
-        new_high = max(base_price, new_close) + np.random.uniform(0, high_low_range)
-        new_low = min(base_price, new_close) - np.random.uniform(0, high_low_range)
-        new_open = base_price + np.random.uniform(-high_low_range/2, high_low_range/2)
-        
-        # Generate volume
-        base_volume = 1000000
-        volume_change = np.random.uniform(0.5, 2.0)
-        new_volume = int(base_volume * volume_change)
-        
-        return pd.DataFrame([{
-            'timestamp': datetime.now(),
-            'open': new_open,
-            'high': new_high,
-            'low': new_low,
-            'close': new_close,
-            'volume': new_volume
-        }])
+            await self.supervisor.stop(symbol)
@@ -0,0 +1,129 @@
+"""Wire encodings for ``/ws`` frames, negotiated with ``/ws?encoding=...``.
+
+``json`` (default)
+  Text frames, ``json.dumps(message, default=str)``.
+``msgpack``
+  Binary frames holding the same message structure packed with msgpack.
+``binary`` / ``binary32``
+  ``market_data`` messages become fixed-layout binary frames (little endian)
+  with float64 / float32 price fields; every other message type is still
+  sent as a JSON text frame, so clients can dispatch on the frame type::
+
+    B      frame type (1 = market_data)
+    B      flags (bit 0: float32 prices, bit 1: portfolio block present)
+    B      symbol length n, followed by n ASCII bytes
+    q      candle timestamp, epoch milliseconds (UTC for naive times;
+           live candles are stamped in UTC)
+    5 x f  open, high, low, close, volume (f4 or f8)
+    B      signal count m, followed by m signal entries ordered by
+           strategy name, each:
+             B  name length k, followed by k ASCII bytes
+             b  signal value (-1/0/1)
+    3 x d  cash, total_value, total_pnl (only when flag bit 1 is set)
+"""
+from __future__ import annotations
+
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Union
+
+ENCODINGS = ("json", "msgpack", "binary", "binary32")
+
+FRAME_MARKET_DATA = 1
+FLAG_FLOAT32 = 0x01
+FLAG_PORTFOLIO = 0x02
+
+_HEADER = struct.Struct("<BBB")
+_CANDLE64 = struct.Struct("<q5d")
+_CANDLE32 = struct.Struct("<q5f")
+_PORTFOLIO = struct.Struct("<3d")
+
+Frame = Union[str, bytes]
+
+
+def _msgpack():
+  try:
+    import msgpack
+  except ImportError as exc:
+    raise RuntimeError(
+      "msgpack is required for the msgpack encoding; install backend requirements."
+    ) from exc
+  return msgpack
+
+
+def json_bytes(payload: Any) -> bytes:
+  """Compact JSON as UTF-8 bytes; uses orjson (much faster on large float
+  lists) when it is installed, otherwise the standard library."""
+  try:
+    import orjson
+  except ImportError:
+    return json.dumps(payload, default=str).encode()
+  return orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def validate_encoding(encoding: str) -> str:
+  if encoding not in ENCODINGS:
+    raise ValueError(f"Unknown encoding: {encoding}")
+  if encoding == "msgpack":
+    _msgpack()
+  return encoding
+
+
+def _to_epoch_ms(value: Any) -> int:
+  if isinstance(value, str):
+    value = datetime.fromisoformat(value)
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=timezone.utc)
+  return int(value.timestamp() * 1000)
+
+
+def _default(value: Any) -> Any:
+  if isinstance(value, datetime):
+    return value.isoformat()
+  return str(value)
+
+
+def _encode_signals(signals: Dict[str, int]) -> bytes:
+  parts = [struct.pack("<B", len(signals))]
+  for name in sorted(signals):
+    encoded = name.encode("ascii")
+    parts.append(struct.pack(f"<B{len(encoded)}sb", len(encoded), encoded, int(signals[name])))
+  return b"".join(parts)
+
+
+def encode_market_data(message: Dict[str, Any], float32: bool = False) -> bytes:
+  symbol = message["symbol"].encode("ascii")
+  candle = message["candle"]
+  signals = message.get("signals") or {}
+  portfolio = message.get("portfolio")
+
+  flags = (FLAG_FLOAT32 if float32 else 0) | (FLAG_PORTFOLIO if portfolio else 0)
+  layout = _CANDLE32 if float32 else _CANDLE64
+  parts = [
+    _HEADER.pack(FRAME_MARKET_DATA, flags, len(symbol)),
+    symbol,
+    layout.pack(
+      _to_epoch_ms(candle["timestamp"]),
+      candle["open"],
+      candle["high"],
+      candle["low"],
+      candle["close"],
+      candle["volume"],
+    ),
+    _encode_signals(signals),
+  ]
+  if portfolio:
+    parts.append(
+      _PORTFOLIO.pack(portfolio["cash"], portfolio["total_value"], portfolio["total_pnl"])
+    )
+  return b"".join(parts)
+
+
+def encode(message: Dict[str, Any], encoding: str = "json") -> Frame:
+  """Serialize one message for the given encoding (text or binary frame)."""
+  if encoding == "msgpack":
+    return _msgpack().packb(message, default=_default, use_bin_type=True)
+  if encoding in ("binary", "binary32") and message.get("type") == "market_data":
+    return encode_market_data(message, float32=encoding == "binary32")
+  return json.dumps(message, default=str)
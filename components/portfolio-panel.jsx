@@ -4,7 +4,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/com
 import { TrendingUp, TrendingDown, Wallet, PieChart } from "lucide-react"
 
 export default function PortfolioPanel({ portfolio = {} }) {
-  const { cash = 0, total_value = 0, total_pnl = 0, positions = [] } = portfolio
+  const { cash = 0, total_value = 0, total_pnl = 0, positions = [], metrics } = portfolio
 
   const pnlPercentage = total_value > 0 ? (total_pnl / (total_value - total_pnl)) * 100 : 0
 
@@ -45,6 +45,23 @@ export default function PortfolioPanel({ portfolio = {} }) {
               </div>
             </div>
           </div>
+
+          {metrics && (
+            <div className="grid grid-cols-2 gap-2 text-sm">
+              <span className="text-muted-foreground">Sharpe</span>
+              <span className="text-right font-medium">{metrics.sharpe_ratio?.toFixed(2)}</span>
+              <span className="text-muted-foreground">Max drawdown</span>
+              <span className="text-right font-medium">{metrics.max_drawdown?.toFixed(2)}%</span>
+              <span className="text-muted-foreground">Win rate</span>
+              <span className="text-right font-medium">
+                {metrics.win_rate?.toFixed(1)}% of {metrics.trades}
+              </span>
+              <span className="text-muted-foreground">Profit factor</span>
+              <span className="text-right font-medium">
+                {metrics.profit_factor == null ? "—" : metrics.profit_factor.toFixed(2)}
+              </span>
+            </div>
+          )}
         </CardContent>
       </Card>
 
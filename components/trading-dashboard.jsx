@@ -135,7 +135,8 @@ export default function TradingDashboard() {
         if (message.type === "market_data") {
           setMarketData((prev) => [...prev.slice(-999), message.candle])
           setSignals(message.signals || {})
-          setPortfolio(message.portfolio || portfolio)
+          // Ticks only carry the portfolio when it changed
+          if (message.portfolio) setPortfolio(message.portfolio)
         } else if (message.type === "trade_executed") {
           setTrades((prev) => [message.trade, ...prev])
           loadPortfolio() // Refresh portfolio
@@ -230,6 +231,7 @@ export default function TradingDashboard() {
           days: 30,
           initial_cash: 100000,
           strategy_params: getStrategyParams(),
+          max_points: 500,
         }),
         signal: AbortSignal.timeout(30000),
       })
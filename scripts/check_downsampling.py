@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Add repository root to path so the backend package imports resolve
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.downsampling import METHODS, downsample
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that downsample() keeps at most max_points sorted rows, end points included"
+    )
+    parser.add_argument('--max-points', type=int, default=64, help="Check every max_points from 3 to this")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    failures = 0
+    for method in METHODS:
+        checked = 0
+        for n in (1, 2, 3, 4, 5, 7, 10, 100, 1001):
+            y = np.cumsum(rng.normal(0, 1, n))
+            for k in range(3, args.max_points + 1):
+                picks = downsample(y, k, method)
+                valid = (
+                    len(picks) <= k
+                    and np.all(np.diff(picks) > 0)
+                    and picks[0] == 0
+                    and picks[-1] == n - 1
+                )
+                if not valid:
+                    failures += 1
+                    print(f"{method} n={n} max_points={k}: {len(picks)} points {picks[:10]}")
+                checked += 1
+        print(f"{method}: {checked} series/max_points combinations checked")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add repository root to path so the backend package imports resolve
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.event_backtest import CostModel, EventDrivenBacktestEngine
+from backend.services.portfolio import PortfolioManager
+from backend.services.strategies import StrategyFactory
+from backend.services.streaming import SymbolStream
+
+from check_strategy_parity import parameter_sets, random_walk
+
+SYMBOL = 'PARITY'
+COSTS = (CostModel(), CostModel(commission=0.001, slippage=0.0005))
+
+
+class ReplayStream(SymbolStream):
+    """SymbolStream fed from a frame instead of random candles"""
+
+    def __init__(self, data, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = iter(data.itertuples())
+
+    def next_candle(self):
+        row = next(self.rows)
+        candle = {
+            'timestamp': row.Index.to_pydatetime(),
+            'open': row.open,
+            'high': row.high,
+            'low': row.low,
+            'close': row.close,
+            'volume': row.volume,
+        }
+        self.candles.append(**candle)
+        return candle
+
+
+async def discard(*args, **kwargs):
+    pass
+
+
+def live_replay(data, name, params, costs, units):
+    """Trades and per-bar cash/equity from SymbolStream.tick"""
+    portfolio = PortfolioManager(100000.0, costs.commission, costs.slippage)
+    strategy = StrategyFactory.create(name, params)
+    stream = ReplayStream(data, SYMBOL, {name: strategy}, portfolio, discard, trade_strategy=name, trade_units=units)
+    stream.strategy_streams = {name: strategy.stream()}
+    cash = np.empty(len(data))
+    equity = np.empty(len(data))
+    for bar, close in enumerate(data['close'].tolist()):
+        stream.tick()
+        position = portfolio.positions.get(SYMBOL)
+        cash[bar] = portfolio.cash
+        equity[bar] = portfolio.cash + (position.quantity * close if position is not None else 0.0)
+    trades = [(t.timestamp, t.action, t.quantity, t.price, t.commission) for t in portfolio.trades]
+    return trades, cash, equity
+
+
+def engine_replay(data, name, params, costs, units, replay):
+    engine = EventDrivenBacktestEngine(100000.0, costs, units, SYMBOL, replay=replay)
+    engine.run_backtest(data, name, **params)
+    trades = [(f.timestamp, f.side, f.quantity, f.price, f.commission) for f in engine.fills]
+    return trades, engine.equity_curve.cash, engine.equity
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that both event backtest replays trade exactly like SymbolStream.tick"
+    )
+    parser.add_argument('--bars', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--units', type=int, default=10)
+    parser.add_argument('--bench-bars', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    data = random_walk(args.bars, args.seed)
+    failures = 0
+    for entry in StrategyFactory.catalog():
+        param_sets = parameter_sets(StrategyFactory.get(entry.name))
+        checked = 0
+        for params in param_sets:
+            for costs in COSTS:
+                expected = live_replay(data, entry.name, params, costs, args.units)
+                for replay in ('fast', 'stream'):
+                    trades, cash, equity = engine_replay(data, entry.name, params, costs, args.units, replay)
+                    if trades != expected[0] or not (
+                        np.array_equal(cash, expected[1]) and np.array_equal(equity, expected[2])
+                    ):
+                        failures += 1
+                        print(f"{entry.name} {params} {costs.to_dict()} {replay}: "
+                              f"{len(trades)} trades vs {len(expected[0])} live")
+                checked += 1
+        print(f"{entry.name}: {checked} parameter/cost combinations checked")
+
+    if args.bench_bars:
+        bench = random_walk(args.bench_bars, args.seed)
+        for entry in StrategyFactory.catalog():
+            engine = EventDrivenBacktestEngine(100000.0, COSTS[1], args.units, SYMBOL)
+            started = time.perf_counter()
+            engine.run_backtest(bench, entry.name)
+            elapsed = time.perf_counter() - started
+            print(f"{entry.name}: fast replay {args.bench_bars / elapsed:,.0f} bars/s "
+                  f"({len(engine.fills)} fills)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
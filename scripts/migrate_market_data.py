@@ -0,0 +1,57 @@
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add repository root to path so the backend package imports resolve
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.config import settings
+from backend.services.columnar_store import ColumnarStore, import_csv_files, import_sqlite
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import per-symbol CSVs and the SQLite market_data table into the columnar store"
+    )
+    parser.add_argument('--csv-dir', type=Path, default=settings.data_dir,
+                        help="Directory holding {SYMBOL}.csv files")
+    parser.add_argument('--sqlite', type=Path, default=settings.data_dir / 'trading.db',
+                        help="SQLite database written by generate_sample_data.py")
+    parser.add_argument('--table', default='market_data')
+    parser.add_argument('--store-dir', type=Path,
+                        default=settings.store_dir or settings.data_dir / 'store')
+    parser.add_argument('--partition', choices=['year', 'month'], default=settings.store_partition)
+    args = parser.parse_args()
+
+    store = ColumnarStore(args.store_dir, partition=args.partition)
+    counts = {}
+
+    csv_files = sorted(args.csv_dir.glob('*.csv'))
+    if csv_files:
+        print(f"Importing {len(csv_files)} CSV files from {args.csv_dir}...")
+        counts.update(import_csv_files(store, csv_files))
+
+    if args.sqlite.exists():
+        print(f"Importing table {args.table} from {args.sqlite}...")
+        # SQLite rows are upserted over the CSV rows for the same timestamps
+        try:
+            imported = import_sqlite(store, args.sqlite, args.table)
+        except sqlite3.OperationalError as exc:
+            print(f"Skipping {args.sqlite}: {exc}")
+            imported = {}
+        for symbol, rows in imported.items():
+            counts[symbol] = counts.get(symbol, 0) + rows
+
+    if not counts:
+        print("Nothing to import")
+        return
+    for symbol in sorted(counts):
+        print(f"{symbol:<8} {counts[symbol]:>10} rows written, "
+              f"{store.rows(symbol):>10} stored, {len(store.partitions(symbol))} partitions")
+    print(f"Store written to {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
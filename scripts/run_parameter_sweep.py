@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+# Add repository root to path so the backend package imports resolve
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.market_data import MarketDataService
+from backend.services.optimization import expand_grid, run_sweep
+
+
+def parse_parameter(text):
+    """Parse 'name=start:stop[:step]' or 'name=v1,v2,...'"""
+    name, _, values = text.partition('=')
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected name=values, got {text!r}")
+    if ':' in values:
+        parts = [float(v) for v in values.split(':')]
+        spec = {'start': parts[0], 'stop': parts[1]}
+        if len(parts) > 2:
+            spec['step'] = parts[2]
+    else:
+        spec = [float(v) for v in values.split(',')]
+    return name, spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-search strategy parameters")
+    parser.add_argument('--symbol', default='AAPL')
+    parser.add_argument('--strategy', default='sma_ema')
+    parser.add_argument('--param', action='append', type=parse_parameter, default=[],
+                        help="name=start:stop[:step] or name=v1,v2 (repeatable)")
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    parser.add_argument('--initial-cash', type=float, default=100000)
+    parser.add_argument('--rank-by', default='total_return')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', help="Optional CSV path for the full ranked table")
+    args = parser.parse_args()
+
+    grid = dict(args.param)
+    if not grid:
+        parser.error("at least one --param is required")
+
+    data = MarketDataService.slice_dataframe(args.symbol, args.start, args.end)
+    print(f"Sweeping {len(expand_grid(grid))} combinations of {args.strategy} on {args.symbol}...")
+    rows = run_sweep(data, args.strategy, grid, args.initial_cash, args.rank_by, args.workers)
+
+    table = pd.DataFrame(
+        [{'rank': row['rank'], **row['parameters'], **row['metrics']} for row in rows]
+    )
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Results saved to {args.output}")
+    print(table.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+
+# Add repository root to path so the backend package imports resolve
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.backtesting import BacktestEngine
+from backend.services.market_data import MarketDataService
+from backend.services.monte_carlo import METHODS, monte_carlo
+from backend.services.optimization import walk_forward
+from backend.services.warmup import configured_symbols
+from run_parameter_sweep import parse_parameter
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Walk-forward and Monte Carlo robustness report across symbols"
+    )
+    parser.add_argument('--symbols', nargs='*',
+                        help="Defaults to the warm-up symbols (sample config supported_symbols)")
+    parser.add_argument('--strategy', default='sma_ema')
+    parser.add_argument('--param', action='append', type=parse_parameter, default=[],
+                        help="name=start:stop[:step] or name=v1,v2 (repeatable)")
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    parser.add_argument('--train-days', type=int, default=365)
+    parser.add_argument('--test-days', type=int, default=90)
+    parser.add_argument('--step-days', type=int)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--initial-cash', type=float, default=100000)
+    parser.add_argument('--rank-by', default='total_return')
+    parser.add_argument('--method', choices=METHODS, default='returns')
+    parser.add_argument('--simulations', type=int, default=1000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help="Optional JSON path for the full report")
+    args = parser.parse_args()
+
+    grid = dict(args.param)
+    if not grid:
+        parser.error("at least one --param is required")
+
+    report = {}
+    for symbol in args.symbols or configured_symbols():
+        data = MarketDataService.slice_dataframe(symbol, args.start, args.end)
+        try:
+            folds = walk_forward(
+                data, args.strategy, grid, args.train_days, args.test_days, args.step_days,
+                args.anchored, args.initial_cash, args.rank_by, args.workers,
+            )
+            # Resample the full-period run with the most recent fold's winner
+            params = folds['folds'][-1]['parameters']
+            result = BacktestEngine(args.initial_cash).run_backtest(data, args.strategy, **params)
+            simulation = monte_carlo(
+                result, args.initial_cash, args.method, args.simulations, args.seed, args.workers
+            )
+        except ValueError as exc:
+            print(f"{symbol}: skipped ({exc})")
+            continue
+
+        report[symbol] = {'walk_forward': folds, 'monte_carlo': simulation}
+        summary = folds['summary']
+        print(
+            f"{symbol}: {summary['folds']} folds, out-of-sample {summary['out_of_sample_return']:.2f}%, "
+            f"efficiency {'n/a' if summary['efficiency'] is None else format(summary['efficiency'], '.2f')}, "
+            f"P(loss) {simulation['probability_of_loss']:.1%}, "
+            f"median drawdown {simulation['max_drawdown']['p50']:.2f}%"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2, default=str)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()